@@ -1,40 +1,76 @@
-from build_pipelines.builder.CoreBuilder import CoreBuilder
-from build_pipelines.builder.SchnetModuleBuilder import SchnetModuleBuilder
-from build_pipelines.builder.SchnetModelBuilder import SchnetModelBuilder
+from __future__ import annotations
+
+from typing import Optional, TYPE_CHECKING
+
 from build_pipelines.path_management.CorePathDistribution import CorePathDistribution
-from build_pipelines.builder.TrainerBuilder import TrainerBuilder
 from processing_pipeline.ends.RunFinisher import RunFinisher
+from processing_pipeline.PathManager import CSV_FORMAT
 from processing_pipeline.ends.RunInitializer import RunInitializer
+from processing_pipeline.ends.RunSpec import RunSpec
+
+if TYPE_CHECKING:
+    from build_pipelines.builder.CoreBuilder import CoreBuilder
+
+
+def build_worker_run_initializer(root_store_path: str, db_path: str, recipe: dict) -> RunInitializer:
+    """
+    Builds the adapters of a recipe in a new CoreManager, used by the worker processes of RunInitializer.run_many.
+
+    :param root_store_path: The root path for storing data.
+    :param db_path: The path to the database.
+    :param recipe: The recipe of the adapters, see CoreBuilder.get_recipe.
+    :return: The run initializer holding the built adapters.
+    """
+    core_manager = CoreManager(root_store_path, db_path)
+    core_manager.core_builder.build_from_recipe(recipe)
+    core_manager.update_adapters()
+    return core_manager.run_initializer
 
 
 class CoreManager:
     """
-    Manages the core components of the pipeline, including builders and initializers.
+    Manages the core components of the pipeline, including builders and initializers. The builders import
+    schnetpack, torch and pytorch_lightning, so they are only created on first access to the core builder, processes
+    that only run, query or save existing runs do not pay for these imports.
     """
 
-    def __init__(self, root_store_path: str, db_path: str):
+    def __init__(self, root_store_path: str, db_path: str, writer_workers: int = 0, table_format: str = CSV_FORMAT,
+                 render_workers: int = 0):
         """
         Initialize the CoreManager with the specified root store path and database path.
 
         :param root_store_path: The root path for storing data.
         :param db_path: The path to the database.
+        :param writer_workers: The number of background threads writing run artifacts, 0 writes synchronously.
+        :param table_format: The format run tables are saved in, CSV_FORMAT or ARROW_FORMAT.
+        :param render_workers: The number of processes rendering run figures, 0 renders on the writing thread.
         """
-        self._path_distribution = CorePathDistribution(root_store_path, db_path)
-        model_builder = SchnetModelBuilder()
-        module_builder = SchnetModuleBuilder(self._path_distribution.db_saver)
-        trainer_builder = TrainerBuilder(self._path_distribution.trainer_saver)
-
-        self._core_builder = CoreBuilder(model_builder, module_builder, trainer_builder)
-        self._run_finisher = RunFinisher(self._path_distribution.metrics_saver)
-        self._run_initializer = RunInitializer(self._run_finisher)
+        self._root_store_path = root_store_path
+        self._db_path = db_path
+        self._path_distribution = CorePathDistribution(root_store_path, db_path, writer_workers, table_format,
+                                                       render_workers)
+        self._core_builder: Optional[CoreBuilder] = None
+        self._run_finisher = RunFinisher(self._path_distribution.metrics_saver, self._path_distribution.run_catalog)
+        self._run_initializer = RunInitializer(self._run_finisher, self._path_distribution.prediction_path)
+        self._run_initializer.set_worker_factory(self._worker_factory)
 
     @property
-    def core_builder(self):
+    def core_builder(self) -> CoreBuilder:
         """
-        Get the core builder.
+        Get the core builder, creating it and importing the builders on first access.
 
         :return: The core builder.
         """
+        if self._core_builder is None:
+            from build_pipelines.builder.CoreBuilder import CoreBuilder
+            from build_pipelines.builder.SchnetModelBuilder import SchnetModelBuilder
+            from build_pipelines.builder.SchnetModuleBuilder import SchnetModuleBuilder
+            from build_pipelines.builder.TrainerBuilder import TrainerBuilder
+
+            model_builder = SchnetModelBuilder()
+            module_builder = SchnetModuleBuilder(self._path_distribution.db_saver)
+            trainer_builder = TrainerBuilder(self._path_distribution.trainer_saver)
+            self._core_builder = CoreBuilder(model_builder, module_builder, trainer_builder)
         return self._core_builder
 
     @property
@@ -50,6 +86,8 @@ class CoreManager:
         """
         Update the adapters for models, modules, and trainers in the run initializer.
         """
+        if self._core_builder is None:
+            return
         for name, adapter in self._core_builder.get_model_adapters().items():
             self._run_initializer.add_model(adapter)
 
@@ -58,3 +96,26 @@ class CoreManager:
 
         for name, adapter in self._core_builder.get_trainer_adapters().items():
             self._run_initializer.add_trainer(adapter)
+
+    def close(self):
+        """
+        Finishes the runs of the station pipeline and waits until the artifacts of all runs are written. Artifacts
+        still pending in the background writer are lost if the process exits without closing the CoreManager.
+
+        :raises BaseException: The first error raised by a station of the pipeline or by a background write.
+        """
+        try:
+            self._run_initializer.close_pipeline()
+        finally:
+            self._run_finisher.close()
+
+    def _worker_factory(self, spec: RunSpec):
+        """
+        Returns the function and arguments that build the adapters of a run in a worker process of run_many.
+
+        :param spec: The specification of the run.
+        :return: build_worker_run_initializer and its arguments.
+        :raises KeyError: If an adapter of the spec was not built by the core builder.
+        """
+        recipe = self.core_builder.get_recipe(spec.model, spec.module, spec.trainer)
+        return build_worker_run_initializer, (self._root_store_path, self._db_path, recipe)
@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEF_MOLECULES = 16
+DEF_ATOMS = 20
+DEF_STEPS = 50
+DEF_WARMUP_STEPS = 5
+DEF_THREADS = 4
+DEF_SEED = 0
+BOX_SIZE = 6.0
+ELEMENTS = (1, 6, 7, 8)
+
+RESULT_FORMAT = "{mode}: first step {first_step_s:.3f}s, {median_step_ms:.2f}ms per step, speedup {speedup:.2f}x"
+
+
+def create_batch(molecules: int, atoms: int, cutoff: float, seed: int) -> Dict:
+    """
+    Creates one batch of random molecules with neighbor lists.
+
+    :param molecules: The number of molecules of the batch.
+    :param atoms: The number of atoms of every molecule.
+    :param cutoff: The cutoff radius of the neighbor list.
+    :param seed: The seed of the random structures.
+    :return: The batched inputs of the network.
+    """
+    import numpy as np
+    import schnetpack.transform as trn
+    from ase import Atoms
+    from schnetpack.interfaces import AtomsConverter
+
+    rng = np.random.default_rng(seed)
+    structures = [Atoms(numbers=rng.choice(ELEMENTS, atoms), positions=rng.uniform(0, BOX_SIZE, (atoms, 3)))
+                  for _ in range(molecules)]
+    converter = AtomsConverter(neighbor_list=trn.ASENeighborList(cutoff=cutoff))
+    return converter(structures)
+
+
+def measure_mode(mode: str, batch: Dict, steps: int, warmup_steps: int, cache_dir: str) -> Dict:
+    """
+    Measures the latency of training steps, forward, backward and optimizer step, of a SchnetNN in one mode.
+
+    :param mode: The compile mode of the network.
+    :param batch: The batched inputs.
+    :param steps: The number of measured steps.
+    :param warmup_steps: The number of steps before the measurement, the first one includes compilation.
+    :param cache_dir: The compile cache directory.
+    :return: A dictionary with the duration of the first step and the median step latency.
+    """
+    import torch
+
+    from schnet_integration.legacy.MolProperty import MolProperty
+    from schnet_integration.legacy.SchnetNN import DEF_OPTIMIZER, SchnetNN
+
+    torch.manual_seed(DEF_SEED)
+    model = SchnetNN({}, {MolProperty.TOTAL_ENERGY: (1,)}, compile_mode=mode, compile_cache_dir=cache_dir)
+    network = model.network
+    optimizer = DEF_OPTIMIZER(network.parameters())
+    output_key = MolProperty.TOTAL_ENERGY.value
+
+    def step():
+        inputs = {key: value.clone() for key, value in batch.items()}
+        optimizer.zero_grad()
+        network(inputs)[output_key].square().mean().backward()
+        optimizer.step()
+
+    durations: List[float] = []
+    for _ in range(warmup_steps + steps):
+        start = time.perf_counter()
+        step()
+        durations.append(time.perf_counter() - start)
+    measured = durations[warmup_steps:]
+    return {"mode": mode, "effective_mode": getattr(network, "mode", mode), "first_step_s": durations[0],
+            "median_step_ms": statistics.median(measured) * 1000}
+
+
+def main():
+    """
+    Command line entry point, prints the step latency of every mode and optionally writes it as JSON.
+    """
+    from schnet_integration.CompiledNetwork import COMPILE_MODES, EAGER_MODE
+    from schnet_integration.legacy.SchnetNN import DEF_CUTOFF
+
+    parser = argparse.ArgumentParser(description="Compare the per-step latency of compiled and eager SchnetNN.")
+    parser.add_argument("--modes", nargs="+", default=list(COMPILE_MODES), choices=COMPILE_MODES)
+    parser.add_argument("--molecules", type=int, default=DEF_MOLECULES, help="Molecules per batch.")
+    parser.add_argument("--atoms", type=int, default=DEF_ATOMS, help="Atoms per molecule.")
+    parser.add_argument("--steps", type=int, default=DEF_STEPS, help="Measured training steps per mode.")
+    parser.add_argument("--warmup-steps", type=int, default=DEF_WARMUP_STEPS, help="Steps before measuring.")
+    parser.add_argument("--threads", type=int, default=DEF_THREADS, help="Torch threads.")
+    parser.add_argument("--cache-dir", help="Compile cache directory, by default a fresh temporary directory.")
+    parser.add_argument("--output", help="Path of a JSON file the results are written to.")
+    arguments = parser.parse_args()
+
+    import torch
+    torch.set_num_threads(arguments.threads)
+    cache_dir = arguments.cache_dir or tempfile.mkdtemp(prefix="compile_latency_")
+    batch = create_batch(arguments.molecules, arguments.atoms, DEF_CUTOFF, DEF_SEED)
+
+    results = [measure_mode(mode, batch, arguments.steps, arguments.warmup_steps, cache_dir)
+               for mode in arguments.modes]
+    eager = next((result for result in results if result["mode"] == EAGER_MODE), results[0])
+    for result in results:
+        result["speedup"] = eager["median_step_ms"] / result["median_step_ms"]
+        print(RESULT_FORMAT.format(**result))
+
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump({"threads": arguments.threads, "molecules": arguments.molecules, "atoms": arguments.atoms,
+                       "results": results}, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
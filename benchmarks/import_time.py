@@ -0,0 +1,85 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEF_REPEATS = 5
+# Entry points and their import budgets in seconds, measured in fresh interpreters
+DEF_BUDGETS = {
+    "CoreManager": 1.5,
+    "example_run": 1.5,
+    "build_pipelines.path_management.RunCatalog": 1.5,
+}
+# Dependencies that only the code building or running models may import
+HEAVY_MODULES = ("torch", "pytorch_lightning", "torchmetrics", "schnetpack", "matplotlib", "seaborn")
+
+MEASURE_CODE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted({{name.split(".")[0] for name in sys.modules}})}}))
+"""
+
+RESULT_FORMAT = "{module}: {seconds:.3f}s (budget {budget:.3f}s){heavy}"
+HEAVY_FORMAT = ", heavy imports: {modules}"
+
+
+def measure_import(module: str, repeats: int = DEF_REPEATS) -> Dict:
+    """
+    Measures the import time of a module in fresh interpreters, so no module is cached from an earlier import.
+
+    :param module: The name of the module.
+    :param repeats: The number of interpreters, the fastest import is reported.
+    :return: A dictionary with the fastest import time and the heavy modules the import loaded.
+    """
+    measurements = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", MEASURE_CODE.format(module=module)], cwd=REPO_ROOT,
+                                check=True, capture_output=True, text=True).stdout
+        measurements.append(json.loads(output.strip().splitlines()[-1]))
+    loaded = set(measurements[0]["modules"])
+    return {"seconds": min(measurement["seconds"] for measurement in measurements),
+            "heavy": [module_name for module_name in HEAVY_MODULES if module_name in loaded]}
+
+
+def check_budgets(budgets: Dict[str, float], repeats: int = DEF_REPEATS) -> List[str]:
+    """
+    Measures all entry points and prints their import times.
+
+    :param budgets: A dictionary mapping module names to their budgets in seconds.
+    :param repeats: The number of interpreters per module.
+    :return: The modules exceeding their budget or importing heavy dependencies.
+    """
+    failures = []
+    for module, budget in budgets.items():
+        result = measure_import(module, repeats)
+        heavy = HEAVY_FORMAT.format(modules=", ".join(result["heavy"])) if result["heavy"] else ""
+        print(RESULT_FORMAT.format(module=module, seconds=result["seconds"], budget=budget, heavy=heavy))
+        if result["seconds"] > budget or result["heavy"]:
+            failures.append(module)
+    return failures
+
+
+def main():
+    """
+    Command line entry point, exits with status 1 if an entry point exceeds its import budget.
+    """
+    parser = argparse.ArgumentParser(description="Check the import time of the pipeline entry points.")
+    parser.add_argument("--repeats", type=int, default=DEF_REPEATS, help="Fresh interpreters per entry point.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Factor applied to all budgets, e.g. for slow CI.")
+    arguments = parser.parse_args()
+
+    budgets = {module: budget * arguments.scale for module, budget in DEF_BUDGETS.items()}
+    failures = check_budgets(budgets, arguments.repeats)
+    if failures:
+        print(f"Import budget exceeded: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
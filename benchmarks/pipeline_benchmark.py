@@ -0,0 +1,295 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_db import DEF_MAX_ATOMS, DEF_MIN_ATOMS, DEF_PROPERTIES, DEF_SEED, DB_FORMAT, \
+    create_synthetic_db
+
+DEF_MOLECULES = 500
+DEF_NUM_TRAIN = 300
+DEF_NUM_VAL = 100
+DEF_BATCH_SIZE = 32
+DEF_EPOCHS = 2
+DEF_THREADS = 4
+DEF_CUTOFF = 5.0
+DEF_TOLERANCE = 0.15
+DB_NAME = "synthetic"
+MODULE_NAME = "benchmark_module"
+MODEL_NAME = "benchmark_model"
+TRAINER_NAME = "benchmark_trainer"
+
+STAGE_FORMAT = "{stage}_s"
+STATION_FORMAT = "{process}.{station}_s"
+# Throughput metrics, all other metrics are durations or memory where lower values are better
+HIGHER_IS_BETTER = frozenset({"train_molecules_per_s", "test_molecules_per_s"})
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+RSS_DIVISOR = 1024 * 1024 if sys.platform == "darwin" else 1024
+
+RESULT_FORMAT = "{metric:<40} {value:>12.3f}"
+COMPARISON_FORMAT = "{metric:<40} {value:>12.3f} {baseline:>12.3f} {change:>+8.1%}{flag}"
+REGRESSION_FLAG = "  REGRESSION"
+
+
+def peak_rss_mb() -> float:
+    """
+    Returns the peak resident set size of the process so far.
+
+    :return: The peak RSS in MiB.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / RSS_DIVISOR
+
+
+@contextmanager
+def timed_methods(methods: Sequence[Tuple[type, str]], totals: Dict[str, float], calls: Dict[str, int]):
+    """
+    Measures the time spent in methods of classes while the context is active. The methods are wrapped on their
+    classes and restored afterwards, so the measured code is the code of the pipeline. Inherited methods are wrapped
+    on the given class only.
+
+    :param methods: Pairs of a class and the name of a method.
+    :param totals: A dictionary the seconds spent per "Class.method" are added to.
+    :param calls: A dictionary the number of calls per "Class.method" are added to.
+    """
+    def timed(method, label):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                totals[label] += time.perf_counter() - start
+                calls[label] += 1
+        return wrapper
+
+    originals = []
+    for owner, name in methods:
+        original = getattr(owner, name)
+        label = f"{owner.__name__}.{name}"
+        totals.setdefault(label, 0.0)
+        calls.setdefault(label, 0)
+        originals.append((owner, name, original, name in vars(owner)))
+        setattr(owner, name, timed(original, label))
+    try:
+        yield
+    finally:
+        for owner, name, original, own in originals:
+            if own:
+                setattr(owner, name, original)
+            else:
+                delattr(owner, name)
+
+
+def run_stations(run_initializer, model_adapter, module_adapter, trainer_adapter, process) -> Dict[str, float]:
+    """
+    Executes a run through the RunInitializer station by station and measures every station.
+
+    :param run_initializer: The RunInitializer of the CoreManager.
+    :param model_adapter: The model adapter of the run.
+    :param module_adapter: The module adapter of the run.
+    :param trainer_adapter: The trainer adapter of the run.
+    :param process: The ProcessType of the run.
+    :return: A dictionary mapping station class names to their duration in seconds.
+    """
+    packet = run_initializer.build_run(model_adapter, module_adapter, trainer_adapter, process)
+    durations = {}
+    while packet is not None and packet.has_next_step():
+        station = type(packet.next_station).__name__
+        start = time.perf_counter()
+        packet = packet.step()
+        durations[station] = time.perf_counter() - start
+    return durations
+
+
+def run_benchmark(db_root: str, store_root: str, num_train: int, num_val: int, batch_size: int, epochs: int,
+                  module_kwargs: Optional[Dict] = None) -> Dict[str, float]:
+    """
+    Runs the CoreManager and RunInitializer path on a database: loading the database, building the module, model
+    and trainer, a train run and a test run. Train and test runs are saved like any other run. Building the module
+    prepares and sets up its data module, this part is reported as module_setup and not included in module_build.
+
+    :param db_root: The directory of the database.
+    :param store_root: The directory runs and trainer logs are stored in.
+    :param num_train: The number of training molecules.
+    :param num_val: The number of validation molecules, the remaining molecules of the database are tested.
+    :param batch_size: The batch size of all phases.
+    :param epochs: The number of training epochs.
+    :param module_kwargs: Additional module keyword arguments, e.g. the dataset backend.
+    :return: A dictionary mapping metric names to values.
+    """
+    import schnetpack.transform as trn
+    from schnetpack.data import AtomsDataModule
+
+    from CoreManager import CoreManager
+    from schnet_integration.ArrayAtomsData import ArrayAtomsDataModule
+    from processing_pipeline.core_elements.ModelLogging import ModelLoggingConnector
+    from processing_pipeline.core_elements.TrainerLogging import DataFrameLogger
+    from processing_pipeline.description_enums import ProcessType
+    from schnet_integration.legacy.GeometrySchnetDB import ARRAY_BACKEND, SHARED_ARRAY_BACKEND, GeometrySchnetDB
+    from schnet_integration.legacy.MolProperty import MolProperty
+
+    metrics = {}
+
+    def measure(stage, function):
+        start = time.perf_counter()
+        result = function()
+        metrics[STAGE_FORMAT.format(stage=stage)] = time.perf_counter() - start
+        return result
+
+    core_manager = measure("core_manager", lambda: CoreManager(store_root, db_root))
+    core_builder = measure("builder_import", lambda: core_manager.core_builder)
+    measure("db_load", lambda: GeometrySchnetDB.load_existing(DB_NAME + DB_FORMAT, db_root))
+
+    module_config = {"selected_properties": [MolProperty.TOTAL_ENERGY], "batch_size": batch_size,
+                     "num_train": num_train, "num_val": num_val,
+                     "transforms": [trn.ASENeighborList(cutoff=DEF_CUTOFF), trn.CastTo32()],
+                     **(module_kwargs or {})}
+    # The methods of the class the module builder creates are timed, subclass methods call the inherited ones
+    module_class = AtomsDataModule
+    if module_config.get("dataset_backend") in (ARRAY_BACKEND, SHARED_ARRAY_BACKEND):
+        module_class = ArrayAtomsDataModule
+    setup_seconds: Dict[str, float] = {}
+    with timed_methods([(module_class, "prepare_data"), (module_class, "setup")], setup_seconds, {}):
+        module_adapter = measure("module_build", lambda: core_builder.build_module(DB_NAME, MODULE_NAME,
+                                                                                     module_config))
+    metrics[STAGE_FORMAT.format(stage="module_setup")] = sum(setup_seconds.values())
+    metrics[STAGE_FORMAT.format(stage="module_build")] -= metrics[STAGE_FORMAT.format(stage="module_setup")]
+    num_test = len(module_adapter.module.test_dataset)
+
+    model_adapter = measure("model_build", lambda: core_builder.build_model(
+        MODEL_NAME, DB_NAME, {"additional_input_keys": [], "prediction_keys": [MolProperty.TOTAL_ENERGY]}))
+    trainer_adapter = measure("trainer_build", lambda: core_builder.build_trainer(
+        TRAINER_NAME, {"max_epochs": epochs, "accelerator": "cpu", "enable_progress_bar": False,
+                       "enable_model_summary": False}))
+    core_manager.update_adapters()
+    metrics["setup_peak_rss_mb"] = peak_rss_mb()
+
+    run_initializer = core_manager.run_initializer
+    logging_seconds: Dict[str, float] = {}
+    logging_calls: Dict[str, int] = {}
+    with timed_methods([(DataFrameLogger, "log_metrics"), (ModelLoggingConnector, "batch_start")],
+                       logging_seconds, logging_calls):
+        train_stations = run_stations(run_initializer, model_adapter, module_adapter, trainer_adapter,
+                                      ProcessType.TRAIN)
+    test_stations = run_stations(run_initializer, model_adapter, module_adapter, trainer_adapter, ProcessType.TEST)
+    core_manager.close()
+
+    for process, stations in ((ProcessType.TRAIN, train_stations), (ProcessType.TEST, test_stations)):
+        for station, seconds in stations.items():
+            metrics[STATION_FORMAT.format(process=process.value, station=station)] = seconds
+
+    train_seconds = train_stations["TrainingStation"]
+    test_seconds = test_stations["TestingStation"]
+    metrics["train_molecules_per_s"] = (num_train + num_val) * epochs / train_seconds
+    metrics["test_molecules_per_s"] = num_test / test_seconds
+    logged_batches = logging_calls[f"{ModelLoggingConnector.__name__}.batch_start"]
+    metrics["logging_ms_per_step"] = sum(logging_seconds.values()) * 1000 / max(1, logged_batches)
+    metrics["logging_share_of_training"] = sum(logging_seconds.values()) / train_seconds
+    metrics["peak_rss_mb"] = peak_rss_mb()
+    return metrics
+
+
+def compare(metrics: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """
+    Compares metrics against a baseline and prints both.
+
+    :param metrics: The measured metrics.
+    :param baseline: The metrics of the baseline.
+    :param tolerance: The relative change that is still accepted, e.g. 0.15 for 15%.
+    :return: The names of the metrics that regressed by more than the tolerance.
+    """
+    regressions = []
+    for metric, value in metrics.items():
+        reference = baseline.get(metric)
+        if not reference:
+            print(RESULT_FORMAT.format(metric=metric, value=value))
+            continue
+        change = value / reference - 1
+        regressed = change < -tolerance if metric in HIGHER_IS_BETTER else change > tolerance
+        if regressed:
+            regressions.append(metric)
+        print(COMPARISON_FORMAT.format(metric=metric, value=value, baseline=reference, change=change,
+                                       flag=REGRESSION_FLAG if regressed else ""))
+    return regressions
+
+
+def main():
+    """
+    Command line entry point. Generates a synthetic database unless one is given, runs the benchmark, writes the
+    results as JSON and exits with status 1 if a metric regressed against the baseline.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline end to end on a synthetic database.")
+    parser.add_argument("--molecules", type=int, default=DEF_MOLECULES, help="Molecules of the generated database.")
+    parser.add_argument("--min-atoms", type=int, default=DEF_MIN_ATOMS, help="Smallest generated molecule.")
+    parser.add_argument("--max-atoms", type=int, default=DEF_MAX_ATOMS, help="Largest generated molecule.")
+    parser.add_argument("--properties", nargs="+", default=list(DEF_PROPERTIES), help="Generated properties.")
+    parser.add_argument("--db-root", help="Directory with an existing synthetic.db, skips the generation.")
+    parser.add_argument("--num-train", type=int, default=DEF_NUM_TRAIN, help="Training molecules.")
+    parser.add_argument("--num-val", type=int, default=DEF_NUM_VAL, help="Validation molecules.")
+    parser.add_argument("--batch-size", type=int, default=DEF_BATCH_SIZE, help="Batch size.")
+    parser.add_argument("--epochs", type=int, default=DEF_EPOCHS, help="Training epochs.")
+    parser.add_argument("--threads", type=int, default=DEF_THREADS, help="Torch threads.")
+    parser.add_argument("--dataset-backend", help="Dataset backend of the module, by default the module default.")
+    parser.add_argument("--neighbor-list-cache", action="store_true", help="Cache the neighbor lists.")
+    parser.add_argument("--work-dir", help="Directory of the database and the stored runs, kept after the run.")
+    parser.add_argument("--output", help="Path of the JSON file the results are written to.")
+    parser.add_argument("--baseline", help="Path of a results JSON file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=DEF_TOLERANCE, help="Accepted relative regression.")
+    arguments = parser.parse_args()
+
+    import torch
+    torch.set_num_threads(arguments.threads)
+
+    work_dir = arguments.work_dir or tempfile.mkdtemp(prefix="pipeline_benchmark_")
+    db_root = arguments.db_root
+    generation_seconds = None
+    if db_root is None:
+        db_root = os.path.join(work_dir, "dbs")
+        start = time.perf_counter()
+        create_synthetic_db(os.path.join(db_root, DB_NAME + DB_FORMAT), arguments.molecules, arguments.min_atoms,
+                            arguments.max_atoms, arguments.properties, DEF_SEED, overwrite=True)
+        generation_seconds = time.perf_counter() - start
+    store_root = tempfile.mkdtemp(prefix="store_", dir=work_dir)
+
+    module_kwargs = {"neighbor_list_cache": arguments.neighbor_list_cache}
+    if arguments.dataset_backend is not None:
+        module_kwargs["dataset_backend"] = arguments.dataset_backend
+    try:
+        metrics = run_benchmark(db_root, store_root, arguments.num_train, arguments.num_val, arguments.batch_size,
+                                arguments.epochs, module_kwargs)
+    finally:
+        if arguments.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {"config": {**{key: value for key, value in vars(arguments).items()
+                             if key not in ("output", "baseline", "work_dir", "db_root")},
+                          "generation_s": generation_seconds},
+               "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                               "torch": torch.__version__, "cpu_count": os.cpu_count()},
+               "metrics": metrics}
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    baseline = {}
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["metrics"]
+    regressions = compare(metrics, baseline, arguments.tolerance)
+    if regressions:
+        print(f"Regressions beyond {arguments.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
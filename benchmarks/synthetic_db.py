@@ -0,0 +1,149 @@
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEF_MOLECULES = 1000
+DEF_MIN_ATOMS = 9
+DEF_MAX_ATOMS = 21
+DEF_PROPERTIES = ("total_energy", "forces")
+DEF_SEED = 0
+DB_FORMAT = ".db"
+WRITE_CHUNK_SIZE = 1000
+
+ELEMENTS = (1, 6, 7, 8)
+# Per element energies in kcal/mol, the synthetic energy is their sum plus a harmonic pair term
+ELEMENT_ENERGIES = {1: -313.5, 6: -23761.0, 7: -34255.0, 8: -47116.0}
+PAIR_CONSTANT = 0.5
+PAIR_DISTANCE = 1.5
+# Edge of the box per cube root of the number of atoms in Angstrom, keeps the density independent of the size
+BOX_SCALE = 1.6
+KINETIC_ENERGY_SCALE = 5.0
+
+DB_EXISTS_MSG = "The database {path} already exists, pass overwrite to replace it."
+UNSUPPORTED_PROPERTY_MSG = "Unsupported property {prop}, supported properties are {properties}."
+
+
+def property_units() -> Dict:
+    """
+    Returns the units of the properties the generator can create.
+
+    :return: A dictionary mapping MolProperty to Units.
+    """
+    from schnet_integration.legacy.MolProperty import MolProperty
+    from schnet_integration.legacy.Units import Units
+
+    return {MolProperty.TOTAL_ENERGY: Units.KCALPERMOL, MolProperty.POTENTIAL_ENERGY: Units.KCALPERMOL,
+            MolProperty.KINETIC_ENERGY: Units.KCALPERMOL, MolProperty.FORCES: Units.KCALPERMOLANGSTROM}
+
+
+def create_molecule(rng, atoms: int) -> Dict:
+    """
+    Creates one random molecule. The potential energy and the forces are consistent, the forces are the negative
+    gradient of the energy, so models trained on the database have a learnable target.
+
+    :param rng: The numpy random generator.
+    :param atoms: The number of atoms.
+    :return: A dictionary with the numbers, positions and properties of the molecule.
+    """
+    import numpy as np
+
+    from schnet_integration.legacy.MolProperty import MolProperty
+
+    numbers = rng.choice(ELEMENTS, atoms)
+    positions = rng.uniform(0, BOX_SCALE * atoms ** (1 / 3), (atoms, 3))
+
+    differences = positions[:, None, :] - positions[None, :, :]
+    distances = np.linalg.norm(differences, axis=-1)
+    np.fill_diagonal(distances, PAIR_DISTANCE)
+    stretch = distances - PAIR_DISTANCE
+    pair_energy = 0.25 * PAIR_CONSTANT * np.sum(stretch ** 2)
+    forces = -PAIR_CONSTANT * np.sum((stretch / distances)[:, :, None] * differences, axis=1)
+
+    potential_energy = sum(ELEMENT_ENERGIES[number] for number in numbers) + pair_energy
+    kinetic_energy = rng.gamma(atoms, KINETIC_ENERGY_SCALE / atoms)
+    values = {MolProperty.TOTAL_ENERGY: np.array([potential_energy + kinetic_energy]),
+              MolProperty.POTENTIAL_ENERGY: np.array([potential_energy]),
+              MolProperty.KINETIC_ENERGY: np.array([kinetic_energy]),
+              MolProperty.FORCES: forces}
+    return {"numbers": numbers, "positions": positions, "properties": values}
+
+
+def create_synthetic_db(path: str, molecules: int = DEF_MOLECULES, min_atoms: int = DEF_MIN_ATOMS,
+                        max_atoms: int = DEF_MAX_ATOMS, properties: Sequence[str] = DEF_PROPERTIES,
+                        seed: int = DEF_SEED, overwrite: bool = False) -> str:
+    """
+    Creates an ASE database of random molecules that the pipeline can load like a real database.
+
+    :param path: The path of the database file.
+    :param molecules: The number of molecules.
+    :param min_atoms: The smallest number of atoms of a molecule.
+    :param max_atoms: The largest number of atoms of a molecule.
+    :param properties: The values of the MolProperties stored per molecule.
+    :param seed: The seed of the random molecules.
+    :param overwrite: True to replace an existing database.
+    :return: The path of the database.
+    :raises FileExistsError: If the database exists and overwrite is False.
+    :raises ValueError: If a property is not supported.
+    """
+    import numpy as np
+    from ase import Atoms
+    from schnetpack.data import ASEAtomsData
+
+    from schnet_integration.legacy.MolProperty import MolProperty
+    from schnet_integration.legacy.Units import Units
+
+    units = property_units()
+    selected = [MolProperty(prop) for prop in properties]
+    for prop in selected:
+        if prop not in units:
+            raise ValueError(UNSUPPORTED_PROPERTY_MSG.format(prop=prop.value,
+                                                             properties=[unit.value for unit in units]))
+    if os.path.exists(path):
+        if not overwrite:
+            raise FileExistsError(DB_EXISTS_MSG.format(path=path))
+        os.remove(path)
+    db_dir = os.path.dirname(path)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+
+    db = ASEAtomsData.create(datapath=path, distance_unit=Units.ANGSTROM.value,
+                             property_unit_dict={prop.value: units[prop].value for prop in selected})
+    rng = np.random.default_rng(seed)
+    for start in range(0, molecules, WRITE_CHUNK_SIZE):
+        atoms_list = []
+        property_list = []
+        for _ in range(min(WRITE_CHUNK_SIZE, molecules - start)):
+            molecule = create_molecule(rng, int(rng.integers(min_atoms, max_atoms + 1)))
+            atoms_list.append(Atoms(numbers=molecule["numbers"], positions=molecule["positions"]))
+            property_list.append({prop.value: molecule["properties"][prop] for prop in selected})
+        db.add_systems(property_list=property_list, atoms_list=atoms_list)
+    return path
+
+
+def main():
+    """
+    Command line entry point, creates a synthetic database and prints its path and size.
+    """
+    parser = argparse.ArgumentParser(description="Create a synthetic molecular ASE database.")
+    parser.add_argument("--db-root", required=True, help="Directory of the database.")
+    parser.add_argument("--name", default="synthetic", help="Name of the database, without the .db suffix.")
+    parser.add_argument("--molecules", type=int, default=DEF_MOLECULES, help="Number of molecules.")
+    parser.add_argument("--min-atoms", type=int, default=DEF_MIN_ATOMS, help="Smallest molecule size.")
+    parser.add_argument("--max-atoms", type=int, default=DEF_MAX_ATOMS, help="Largest molecule size.")
+    parser.add_argument("--properties", nargs="+", default=list(DEF_PROPERTIES), help="Stored properties.")
+    parser.add_argument("--seed", type=int, default=DEF_SEED, help="Seed of the random molecules.")
+    parser.add_argument("--overwrite", action="store_true", help="Replace an existing database.")
+    arguments = parser.parse_args()
+
+    path = create_synthetic_db(os.path.join(arguments.db_root, arguments.name + DB_FORMAT), arguments.molecules,
+                               arguments.min_atoms, arguments.max_atoms, arguments.properties, arguments.seed,
+                               arguments.overwrite)
+    print(json.dumps({"path": path, "bytes": os.path.getsize(path)}))
+
+
+if __name__ == "__main__":
+    main()
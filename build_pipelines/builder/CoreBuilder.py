@@ -1,11 +1,21 @@
+from typing import Dict
+
 from build_pipelines.builder.SchnetModuleBuilder import SchnetModuleBuilder
 from build_pipelines.builder.SchnetModelBuilder import SchnetModelBuilder
 from build_pipelines.builder.TrainerBuilder import TrainerBuilder
 
+RECIPE_MODEL = "model"
+RECIPE_MODULE = "module"
+RECIPE_TRAINER = "trainer"
+RECIPE_NAME = "name"
+RECIPE_DB = "db"
+RECIPE_KWARGS = "kwargs"
+
 
 class CoreBuilder:
     """
-    CoreBuilder is responsible for constructing models, modules, and trainers using the provided builders.
+    CoreBuilder is responsible for constructing models, modules, and trainers using the provided builders. The
+    arguments of every build are recorded as recipe, so the same adapters can be built again in another process.
     """
 
     def __init__(self, model_builder: SchnetModelBuilder, module_builder: SchnetModuleBuilder,
@@ -24,6 +34,7 @@ class CoreBuilder:
         self._model_adapters = {}
         self._module_adapters = {}
         self._trainer_adapters = {}
+        self._recipes: Dict[str, Dict[str, dict]] = {RECIPE_MODEL: {}, RECIPE_MODULE: {}, RECIPE_TRAINER: {}}
 
     def build_model(self, name, db_manager_name, kwargs):
         """
@@ -34,6 +45,8 @@ class CoreBuilder:
         :param kwargs: Additional parameters for the model.
         :return: The built model adapter.
         """
+        self._recipes[RECIPE_MODEL][name] = {RECIPE_NAME: name, RECIPE_DB: db_manager_name,
+                                             RECIPE_KWARGS: dict(kwargs)}
         db_manager = self._module_builder.get_schnet_manager(db_manager_name)
         model_adapter = self._model_builder.load_with_parameters_and_example_module(name, db_manager, kwargs)
         self._model_adapters[name] = model_adapter
@@ -48,6 +61,8 @@ class CoreBuilder:
         :param kwargs: Additional parameters for the module.
         :return: The built module adapter.
         """
+        self._recipes[RECIPE_MODULE][module_name] = {RECIPE_NAME: module_name, RECIPE_DB: db_name,
+                                                     RECIPE_KWARGS: dict(kwargs)}
         module_adapter = self._module_builder.load_from_name(db_name, module_name, kwargs)
         self._module_adapters[module_name] = module_adapter
         return module_adapter
@@ -60,10 +75,38 @@ class CoreBuilder:
         :param kwargs: Additional parameters for the trainer.
         :return: The built trainer adapter.
         """
+        self._recipes[RECIPE_TRAINER][name] = {RECIPE_NAME: name, RECIPE_KWARGS: dict(kwargs)}
         trainer_adapter = self._trainer_builder.from_parameters(name, kwargs)
         self._trainer_adapters[name] = trainer_adapter
         return trainer_adapter
 
+    def get_recipe(self, model: str, module: str, trainer: str) -> dict:
+        """
+        Returns the recipe of a model, module and trainer, the arguments they were built with. The builders modify
+        the keyword arguments they are given, the recipe holds copies of the arguments as passed.
+
+        :param model: The name of the model.
+        :param module: The name of the module.
+        :param trainer: The name of the trainer.
+        :return: The recipe, picklable if the keyword arguments are picklable.
+        :raises KeyError: If one of the adapters was not built by this CoreBuilder.
+        """
+        return {RECIPE_MODEL: self._recipes[RECIPE_MODEL][model], RECIPE_MODULE: self._recipes[RECIPE_MODULE][module],
+                RECIPE_TRAINER: self._recipes[RECIPE_TRAINER][trainer]}
+
+    def build_from_recipe(self, recipe: dict):
+        """
+        Builds the module, model and trainer of a recipe.
+
+        :param recipe: The recipe returned by get_recipe.
+        """
+        module = recipe[RECIPE_MODULE]
+        model = recipe[RECIPE_MODEL]
+        trainer = recipe[RECIPE_TRAINER]
+        self.build_module(module[RECIPE_DB], module[RECIPE_NAME], dict(module[RECIPE_KWARGS]))
+        self.build_model(model[RECIPE_NAME], model[RECIPE_DB], dict(model[RECIPE_KWARGS]))
+        self.build_trainer(trainer[RECIPE_NAME], dict(trainer[RECIPE_KWARGS]))
+
     def get_model_adapters(self):
         """
         Returns the dictionary of model adapters.
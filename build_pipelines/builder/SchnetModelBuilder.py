@@ -1,6 +1,7 @@
 import pytorch_lightning
 import torchmetrics
 
+from processing_pipeline.ContentHash import canonical_hash, describe_config
 from processing_pipeline.core_elements.ModelAdapter import ModelAdapter
 from processing_pipeline.core_elements.ModelLogging import ModelLoggingConnector
 from processing_pipeline.description_enums import Column
@@ -28,13 +29,16 @@ class SchnetModelBuilder:
 
     def load_with_parameters_and_example_module(self, name: str, db_manager: GeometrySchnetDB, kwargs) -> ModelAdapter:
         """
-        Loads a model with the given parameters and example module, and returns a ModelAdapter.
+        Loads a model with the given parameters and example module, and returns a ModelAdapter. The configuration
+        hash of the adapter covers the parameters and the content of the database.
 
         :param name: The name of the model.
         :param db_manager: An instance of GeometrySchnetDB to manage database interactions.
         :param kwargs: Additional parameters for the model.
         :return: An instance of ModelAdapter.
         """
+        config = describe_config(kwargs)
+        config_hash = canonical_hash({"kwargs": config, "db": db_manager.get_content_hash()})
         property_dimensions = db_manager.get_attribute_dimensions()
         additional_input_keys_list = kwargs["additional_input_keys"]
         prediction_keys_list = kwargs["prediction_keys"]
@@ -50,6 +54,8 @@ class SchnetModelBuilder:
         task: pytorch_lightning.LightningModule = model.build_and_return_task(model_logging_connector)
         model_logging_connector.set_pl_module(task)
         model_adapter = ModelAdapter(task, model_logging_connector, name)
+        model_adapter.config_hash = config_hash
+        model_adapter.config = config
         self._model_adapter[name] = model_adapter
         return model_adapter
 
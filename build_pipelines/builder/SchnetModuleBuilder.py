@@ -1,8 +1,10 @@
 import os
 
 from build_pipelines.path_management.DBSaver import DBSaver
+from processing_pipeline.ContentHash import canonical_hash, describe_config
 from processing_pipeline.core_elements.ModuleAdapter import ModuleAdapter
-from schnet_integration.legacy.GeometrySchnetDB import GeometrySchnetDB
+from schnet_integration.DatasetSplit import DEF_SPLIT_SEED, get_split_key
+from schnet_integration.legacy.GeometrySchnetDB import DEF_NUM_TRAIN, DEF_NUM_VAL, GeometrySchnetDB
 
 DB_FORMAT = ".db"
 SPLIT_FORMAT = ".npz"
@@ -51,7 +53,10 @@ class SchnetModuleBuilder:
 
     def load_module(self, db_name: str, db_path: str, module_name: str, kwargs):
         """
-        Loads a module from the given database path and module name.
+        Loads a module from the given database path and module name. By default the split is pinned: modules with the
+        same database content, split sizes and split_seed reuse one split file. Passing pin_split=False creates a new
+        split per build. Only modules with a pinned split get a configuration hash, it covers the parameters, the
+        content of the database and the split.
 
         :param db_name: The name of the database.
         :param db_path: The path to the database.
@@ -64,19 +69,37 @@ class SchnetModuleBuilder:
         if db_path not in self._db_managers:
             self._db_managers[db_path] = GeometrySchnetDB.load_existing(db_file_name, db_dir_path)
 
-        kwargs["split_path"] = self._db_saver.get_split_path(db_name, module_name, SPLIT_FORMAT)
+        config_hash = None
+        if kwargs.pop("pin_split", True):
+            kwargs.setdefault("split_seed", DEF_SPLIT_SEED)
+            db_hash = self._db_managers[db_path].get_content_hash()
+            split_key = get_split_key(db_hash, kwargs.get("num_train", DEF_NUM_TRAIN),
+                                      kwargs.get("num_val", DEF_NUM_VAL), kwargs["split_seed"],
+                                      kwargs.get("num_test"))
+            config_hash = canonical_hash({"kwargs": describe_config(kwargs), "db": db_hash, "split": split_key})
+            kwargs["split_path"] = self._db_saver.get_split_path(db_name, module_name, SPLIT_FORMAT, split_key)
+        else:
+            kwargs["split_path"] = self._db_saver.get_split_path(db_name, module_name, SPLIT_FORMAT)
+        config = describe_config(kwargs)
         schnet_module = self._db_managers[db_path].create_schnet_module(**kwargs)
         self._db_modules[module_name] = schnet_module
         module_adapter = ModuleAdapter(schnet_module, {}, module_name)
+        module_adapter.config_hash = config_hash
+        module_adapter.config = config
+        module_adapter.dataset_hash = self._db_managers[db_path].get_content_hash()
         self._db_module_adapter[module_name] = module_adapter
         return module_adapter
 
     def get_schnet_manager(self, db_manager: str):
         """
-        Returns the Schnet manager for the given database manager name.
+        Returns the Schnet manager for the given database manager name, loading the database if no module was built
+        from it yet.
 
         :param db_manager: The name of the database manager.
         :return: An instance of GeometrySchnetDB.
         """
         db_path = self._db_saver.get_path_from_name(db_manager, DB_FORMAT)
+        if db_path not in self._db_managers:
+            db_dir_path, db_file_name = os.path.split(db_path)
+            self._db_managers[db_path] = GeometrySchnetDB.load_existing(db_file_name, db_dir_path)
         return self._db_managers[db_path]
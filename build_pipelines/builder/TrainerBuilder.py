@@ -1,9 +1,17 @@
-from pytorch_lightning import Trainer
+from datetime import timedelta
+
+from pytorch_lightning import Callback, Trainer
+from pytorch_lightning.callbacks import ModelCheckpoint
 from pytorch_lightning.loggers import TensorBoardLogger
 
 from build_pipelines.path_management.TrainerSaver import TrainerSaver
+from processing_pipeline.ContentHash import canonical_hash, describe_config
 from processing_pipeline.core_elements.TrainerAdapter import TrainerAdapter
-from processing_pipeline.core_elements.TrainerLogging import DataFrameLogger
+from processing_pipeline.core_elements.TrainerLogging import DataFrameLogger, LoggerStateCallback
+
+# Checkpoints are written by wall time, so their cost stays bounded for short and long epochs alike
+CHECKPOINT_INTERVAL_KEY = "checkpoint_interval_minutes"
+DEF_CHECKPOINT_INTERVAL_MINUTES = 15.0
 
 
 class TrainerBuilder:
@@ -29,21 +37,40 @@ class TrainerBuilder:
 
     def from_parameters(self, name: str, kwargs) -> TrainerAdapter:
         """
-        Constructs a TrainerAdapter using the provided parameters.
+        Constructs a TrainerAdapter using the provided parameters. The trainer checkpoints the run every
+        checkpoint_interval_minutes of training time, including the logs of the DataFrameLogger, so an interrupted run
+        resumes where it stopped. The configuration hash of the adapter covers the parameters except the checkpoint
+        interval, which does not change the results.
 
         :param name: The name of the trainer.
-        :param kwargs: Additional parameters for the trainer.
+        :param kwargs: Additional parameters for the trainer, checkpoint_interval_minutes sets the interval between
+        checkpoints, None disables checkpointing.
         :return: An instance of TrainerAdapter.
         """
+        config = describe_config(kwargs)
+        config_hash = canonical_hash({key: value for key, value in config.items() if key != CHECKPOINT_INTERVAL_KEY})
         tb_logger: TensorBoardLogger = TensorBoardLogger(save_dir=self._trainer_manager.tb_logger_path)
         trainer_logger: DataFrameLogger = DataFrameLogger()
         loggers = [trainer_logger, tb_logger]
 
         kwargs["logger"] = loggers
 
+        interval = kwargs.pop(CHECKPOINT_INTERVAL_KEY, DEF_CHECKPOINT_INTERVAL_MINUTES)
+        checkpoint = None
+        if interval is not None:
+            callbacks = kwargs.get("callbacks") or []
+            if isinstance(callbacks, Callback):
+                callbacks = [callbacks]
+            checkpoint = ModelCheckpoint(train_time_interval=timedelta(minutes=interval), save_top_k=0,
+                                         save_last=True)
+            kwargs["callbacks"] = [*callbacks, checkpoint, LoggerStateCallback(trainer_logger)]
+
         trainer: Trainer = Trainer(**kwargs)
 
-        trainer_adapter: TrainerAdapter = TrainerAdapter(trainer, trainer_logger, name)
+        trainer_adapter: TrainerAdapter = TrainerAdapter(trainer, trainer_logger, name, checkpoint,
+                                                         self._trainer_manager.checkpoint_path)
+        trainer_adapter.config_hash = config_hash
+        trainer_adapter.config = config
         return trainer_adapter
 
     def from_max_epoch_number(self, name: str, max_epoch_number: int) -> TrainerAdapter:
@@ -0,0 +1,165 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, List, Optional
+
+DEF_WRITER_WORKERS = 4
+DEF_MAX_PENDING_WRITES = 16
+WRITER_THREAD_PREFIX = "artifact-writer"
+
+WRITER_CLOSED_MSG = "The artifact writer is already closed."
+
+
+class ArtifactWriteReport:
+    """
+    ArtifactWriteReport documents the outcome and latency of writing one artifact.
+    """
+
+    def __init__(self, name: str, latency: float, error: Optional[BaseException] = None):
+        """
+        Initializes the ArtifactWriteReport.
+
+        :param name: The name of the written artifact.
+        :param latency: The time in seconds it took to serialize and write the artifact.
+        :param error: The error raised while writing, None if the write succeeded.
+        """
+        self._name = name
+        self._latency = latency
+        self._error = error
+
+    @property
+    def name(self) -> str:
+        """
+        Returns the name of the written artifact.
+
+        :return: The name of the artifact.
+        """
+        return self._name
+
+    @property
+    def latency(self) -> float:
+        """
+        Returns the write latency in seconds.
+
+        :return: The write latency.
+        """
+        return self._latency
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        """
+        Returns the error raised while writing.
+
+        :return: The error, or None if the write succeeded.
+        """
+        return self._error
+
+    def __repr__(self):
+        """
+        Get the string representation of the ArtifactWriteReport.
+
+        :return: The string representation of the ArtifactWriteReport.
+        """
+        return f"ArtifactWriteReport({self._name}, {self._latency:.4f}s, {self._error!r})"
+
+
+def timed_write(name: str, write: Callable[[], None]) -> ArtifactWriteReport:
+    """
+    Executes a write and measures its latency. Errors are caught and stored in the report.
+
+    :param name: The name of the artifact.
+    :param write: A callable performing the serialization and the write.
+    :return: The report of the write.
+    """
+    start = time.perf_counter()
+    error = None
+    try:
+        write()
+    except Exception as write_error:
+        error = write_error
+    return ArtifactWriteReport(name, time.perf_counter() - start, error)
+
+
+class AsyncArtifactWriter:
+    """
+    AsyncArtifactWriter executes artifact writes on a background thread pool. The number of writes in flight is
+    bounded, submitting blocks while the bound is reached, so the memory held by queued artifacts stays bounded. Write
+    errors are reported to on_done and raised by the next flush or close.
+    """
+
+    def __init__(self, workers: int = DEF_WRITER_WORKERS, max_pending: int = DEF_MAX_PENDING_WRITES):
+        """
+        Initializes the AsyncArtifactWriter.
+
+        :param workers: The number of writer threads.
+        :param max_pending: The maximum number of submitted writes that are not finished yet.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=WRITER_THREAD_PREFIX)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._pending_condition = threading.Condition()
+        self._errors: List[BaseException] = []
+        self._closed = False
+
+    def submit(self, name: str, write: Callable[[], None], on_done: Callable[[ArtifactWriteReport], None]):
+        """
+        Submits a write to the background threads.
+
+        :param name: The name of the artifact.
+        :param write: A callable performing the serialization and the write.
+        :param on_done: A callable receiving the ArtifactWriteReport once the write finished.
+        :raises RuntimeError: If the writer is already closed.
+        """
+        if self._closed:
+            raise RuntimeError(WRITER_CLOSED_MSG)
+        self._slots.acquire()
+        with self._pending_condition:
+            self._pending += 1
+
+        def finish(done_future: Future):
+            report = done_future.result()
+            try:
+                on_done(report)
+            finally:
+                self._slots.release()
+                with self._pending_condition:
+                    if report.error is not None:
+                        self._errors.append(report.error)
+                    self._pending -= 1
+                    self._pending_condition.notify_all()
+
+        self._executor.submit(timed_write, name, write).add_done_callback(finish)
+
+    def flush(self):
+        """
+        Waits until all submitted writes are finished and their reports were delivered.
+
+        :raises BaseException: The first error raised by a write since the last flush.
+        """
+        with self._pending_condition:
+            self._pending_condition.wait_for(lambda: self._pending == 0)
+        self._raise_errors()
+
+    def close(self):
+        """
+        Waits until all submitted writes are finished and stops the writer threads.
+
+        :raises BaseException: The first error raised by a write since the last flush.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        with self._pending_condition:
+            self._pending_condition.wait_for(lambda: self._pending == 0)
+        self._executor.shutdown(wait=True)
+        self._raise_errors()
+
+    def _raise_errors(self):
+        """
+        Raises the first collected error and clears the collected errors.
+        """
+        with self._pending_condition:
+            errors = self._errors
+            self._errors = []
+        if errors:
+            raise errors[0]
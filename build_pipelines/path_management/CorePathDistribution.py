@@ -1,11 +1,14 @@
 import os.path
 
 from build_pipelines.path_management.DBSaver import DBSaver
+from build_pipelines.path_management.RunCatalog import RunCatalog, CATALOG_FILE_NAME
 from build_pipelines.path_management.RunSaver import RunSaver
 from build_pipelines.path_management.TrainerSaver import TrainerSaver
+from processing_pipeline.PathManager import CSV_FORMAT
 
 TRAINER_SAVE_FOLDER = "tb_logger"
 METRICS_FOLDER = "metrics"
+PREDICTIONS_FOLDER = "predictions"
 
 
 class CorePathDistribution:
@@ -13,21 +16,29 @@ class CorePathDistribution:
     CorePathDistribution is responsible for managing paths for storing trainers, metrics, and databases.
     """
 
-    def __init__(self, store_root, db_root):
+    def __init__(self, store_root, db_root, writer_workers: int = 0, table_format: str = CSV_FORMAT,
+                 render_workers: int = 0):
         """
         Initializes the CorePathDistribution with the given store and database roots.
 
         :param store_root: The root directory for storing trainers and metrics.
         :param db_root: The root directory for storing databases.
+        :param writer_workers: The number of background writer threads of the RunSaver, 0 writes synchronously.
+        :param table_format: The format the RunSaver writes run tables in, CSV or Arrow table bundles.
+        :param render_workers: The number of processes the RunSaver renders figures in, 0 renders on the writing
+        thread.
         """
         self._store_root = store_root
         self._db_root = db_root
 
         self._trainer_path = os.path.join(self._store_root, TRAINER_SAVE_FOLDER)
         self._metrics_path = os.path.join(self._store_root, METRICS_FOLDER)
-        self._metrics_saver = RunSaver(self._metrics_path)
+        self._prediction_path = os.path.join(self._store_root, PREDICTIONS_FOLDER)
+        self._metrics_saver = RunSaver(self._metrics_path, writer_workers, table_format=table_format,
+                                      render_workers=render_workers)
         self._trainer_saver = TrainerSaver(self._trainer_path)
         self._db_saver = DBSaver(self._db_root)
+        self._run_catalog = RunCatalog(os.path.join(self._store_root, CATALOG_FILE_NAME))
 
     @property
     def tb_logger_path(self):
@@ -38,6 +49,15 @@ class CorePathDistribution:
         """
         return self._trainer_path
 
+    @property
+    def prediction_path(self):
+        """
+        Returns the path predict runs write their predictions to.
+
+        :return: The path for predictions.
+        """
+        return self._prediction_path
+
     @property
     def metrics_saver(self):
         """
@@ -64,3 +84,12 @@ class CorePathDistribution:
         :return: An instance of DBSaver.
         """
         return self._db_saver
+
+    @property
+    def run_catalog(self):
+        """
+        Returns the RunCatalog indexing the saved runs.
+
+        :return: An instance of RunCatalog.
+        """
+        return self._run_catalog
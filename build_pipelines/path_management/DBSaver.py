@@ -1,6 +1,9 @@
+import os
+
 from processing_pipeline.PathManager import PathManager
 
 SPLIT_FILE_FORMAT = "{split}_{name}"
+PINNED_SPLIT_FILE_FORMAT = "split_{key}{split}"
 
 
 class DBSaver:
@@ -38,16 +41,20 @@ class DBSaver:
         """
         return self._path_manager.get_highest_version_file(name, db_format)
 
-    def get_split_path(self, db_name, module_name, split_file_format):
+    def get_split_path(self, db_name, module_name, split_file_format, split_key=None):
         """
         Creates and retrieves the path for a split file based on the database name, module name, and split file format.
+        With a split key the path is shared by all modules with the same split, so an existing split is reused.
 
         :param db_name: The name of the database.
         :param module_name: The name of the module.
         :param split_file_format: The format of the split file.
+        :param split_key: The key of a pinned split, None creates a new version per module build.
         :return: The path to the created split file.
         """
         module_dir = self._path_manager.get_dir_if_exists_or_create(db_name)
+        if split_key is not None:
+            return os.path.join(module_dir, PINNED_SPLIT_FILE_FORMAT.format(key=split_key, split=split_file_format))
         module_dir_manager = PathManager(module_dir)
 
         file_name = SPLIT_FILE_FORMAT.format(split=split_file_format, name=module_name)
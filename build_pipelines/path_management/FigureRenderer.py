@@ -0,0 +1,94 @@
+import os
+import pickle
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from pickle import PicklingError
+from typing import Optional
+
+from processing_pipeline.PathManager import DIR_EXISTS
+
+DEF_RENDER_WORKERS = 2
+RENDER_START_METHOD = "spawn"
+
+RENDERER_CLOSED_MSG = "The figure renderer is already closed."
+
+
+def render_to_file(figure, path: str):
+    """
+    Renders a figure spec, or saves a figure, to an image file. Existing files are not overwritten, as by
+    PathManager.save_fig.
+
+    :param figure: A FigureSpec or any object with a savefig method.
+    :param path: The path of the image file.
+    :raises FileExistsError: If the file already exists.
+    """
+    if os.path.exists(path):
+        raise FileExistsError(DIR_EXISTS.format(name=os.path.basename(path)))
+    figure.savefig(path)
+
+
+def render_pickled(payload: bytes, path: str):
+    """
+    Renders a figure pickled by FigureRenderer.submit to an image file.
+
+    :param payload: The pickled figure.
+    :param path: The path of the image file.
+    """
+    render_to_file(pickle.loads(payload), path)
+
+
+class FigureRenderer:
+    """
+    FigureRenderer renders figure specs to image files in a pool of worker processes, so rendering runs in parallel
+    and off the critical path of the pipeline. Specs that cannot be pickled are rendered in the calling process.
+    """
+
+    def __init__(self, workers: int = DEF_RENDER_WORKERS):
+        """
+        Initializes the FigureRenderer.
+
+        :param workers: The number of rendering processes.
+        """
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=get_context(RENDER_START_METHOD))
+
+    def submit(self, figure, path: str) -> Optional[Future]:
+        """
+        Submits a figure to be rendered to the given path. The figure is pickled here, so only figures that can not
+        be sent to a worker are left to be rendered by wait, errors of the rendering itself are raised by wait.
+
+        :param figure: A FigureSpec or any object with a savefig method.
+        :param path: The path of the image file.
+        :return: A future that completes when the image file is written, None if the figure can not be pickled.
+        :raises RuntimeError: If the renderer is already closed.
+        """
+        if self._executor is None:
+            raise RuntimeError(RENDERER_CLOSED_MSG)
+        try:
+            payload = pickle.dumps(figure)
+        except (PicklingError, AttributeError, TypeError):
+            return None
+        return self._executor.submit(render_pickled, payload, path)
+
+    @staticmethod
+    def wait(future: Optional[Future], figure, path: str):
+        """
+        Waits for a submitted rendering, or renders the figure in the calling process if it could not be sent to a
+        worker.
+
+        :param future: The future returned by submit.
+        :param figure: The submitted figure.
+        :param path: The path of the image file.
+        :raises FileExistsError: If the file already exists.
+        """
+        if future is None:
+            render_to_file(figure, path)
+            return
+        future.result()
+
+    def close(self):
+        """
+        Waits until all submitted figures are rendered and stops the worker processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,380 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from build_pipelines.path_management.RunSaver import get_df_name, load_run_tables, TABLE_BUNDLE_NAME
+from processing_pipeline.PathManager import CSV_FORMAT, ARROW_FORMAT, FILE_FORMAT
+from processing_pipeline.StationProfiling import profile_metrics
+from processing_pipeline.StructuredLogging import json_default
+from processing_pipeline.description_enums import AbstractionLevel, Column, PacketAnnotation
+from processing_pipeline.packets.VisualizedRun import VisualizedRun
+
+CATALOG_FILE_NAME = "run_catalog.sqlite"
+CONNECT_TIMEOUT = 30.0
+
+EPOCH_TABLE_PREFIX = "tab_epoch_"
+METRIC_NAME_FORMAT = "{table}_{column}"
+RUN_DIR_PATTERN = r"{model}_(\w+?)_(\d+)"
+# Step and epoch counters are not metrics
+NON_METRIC_COLUMNS = {Column.EPOCH.value, Column.GLOBAL_STEP.value, Column.BATCH_IDX.value}
+
+HYPERPARAMETER_PATH_FORMAT = "$.{path}"
+
+UNKNOWN_COMMAND_MSG = "Unknown command {command}."
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    model TEXT NOT NULL,
+    module TEXT,
+    trainer TEXT,
+    process TEXT NOT NULL,
+    run_dir TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL,
+    hyperparameters TEXT,
+    artifacts TEXT,
+    run_key TEXT,
+    checkpoint TEXT
+);
+CREATE TABLE IF NOT EXISTS run_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS runs_model ON runs(model);
+CREATE INDEX IF NOT EXISTS runs_module_process ON runs(module, process, created_at);
+CREATE INDEX IF NOT EXISTS run_metrics_name ON run_metrics(name, value);
+"""
+# Catalogs created before runs were memoized lack these columns, they are added when the catalog is opened
+MIGRATED_COLUMNS = {"run_key": "TEXT", "checkpoint": "TEXT"}
+SELECT_RUN_COLUMNS = "PRAGMA table_info(runs)"
+ADD_RUN_COLUMN = "ALTER TABLE runs ADD COLUMN {column} {type}"
+CREATE_RUN_KEY_INDEX = "CREATE INDEX IF NOT EXISTS runs_run_key ON runs(run_key, created_at)"
+
+INSERT_RUN = """
+INSERT INTO runs (model, module, trainer, process, run_dir, created_at, hyperparameters, artifacts, run_key,
+    checkpoint)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(run_dir) DO UPDATE SET model = excluded.model, module = excluded.module, trainer = excluded.trainer,
+    process = excluded.process, created_at = excluded.created_at, hyperparameters = excluded.hyperparameters,
+    artifacts = excluded.artifacts, run_key = excluded.run_key, checkpoint = excluded.checkpoint
+"""
+SELECT_RUN_BY_KEY = "SELECT * FROM runs WHERE run_key = ? ORDER BY created_at DESC LIMIT 1"
+DELETE_METRICS = "DELETE FROM run_metrics WHERE run_id = ?"
+INSERT_METRIC = "INSERT OR REPLACE INTO run_metrics (run_id, name, value) VALUES (?, ?, ?)"
+SELECT_RUN_ID = "SELECT id FROM runs WHERE run_dir = ?"
+SELECT_RUN_DIRS = "SELECT id, run_dir FROM runs"
+DELETE_RUN = "DELETE FROM runs WHERE id = ?"
+UPDATE_RUN_DIR = "UPDATE OR IGNORE runs SET run_dir = ? WHERE id = ?"
+SELECT_METRICS = "SELECT name, value FROM run_metrics WHERE run_id = ?"
+SELECT_BEST_PER_MODEL = """
+SELECT id, model, module, trainer, process, run_dir, created_at, value FROM (
+    SELECT runs.*, run_metrics.value AS value,
+        ROW_NUMBER() OVER (PARTITION BY runs.model ORDER BY run_metrics.value {order}) AS position
+    FROM runs JOIN run_metrics ON run_metrics.run_id = runs.id
+    WHERE run_metrics.name = ? AND run_metrics.value IS NOT NULL {process_filter}
+) WHERE position = 1 ORDER BY model
+"""
+
+
+def final_metrics_from_tables(tables: Dict[str, pd.DataFrame]) -> Dict[str, float]:
+    """
+    Extracts the final metrics of a run from the last row of each of its epoch tables.
+
+    :param tables: A dictionary mapping table names to DataFrames.
+    :return: A dictionary mapping metric names, e.g. "trainer_test_mae", to their final values.
+    """
+    metrics = {}
+    for name, df in tables.items():
+        if not name.startswith(EPOCH_TABLE_PREFIX) or df is None or len(df) == 0:
+            continue
+        table = name.removeprefix(EPOCH_TABLE_PREFIX)
+        last_row = df.iloc[-1]
+        for column, value in last_row.items():
+            column_name = column.value if isinstance(column, Column) else str(column)
+            if column_name in NON_METRIC_COLUMNS or pd.isna(value):
+                continue
+            try:
+                metrics[METRIC_NAME_FORMAT.format(table=table, column=column_name)] = float(value)
+            except (TypeError, ValueError):
+                continue
+    return metrics
+
+
+class RunCatalog:
+    """
+    RunCatalog indexes saved runs in a local SQLite database, so runs can be queried without scanning the metrics
+    directories.
+    """
+
+    def __init__(self, catalog_path: str):
+        """
+        Initializes the RunCatalog and creates the database schema if necessary.
+
+        :param catalog_path: The path of the SQLite database file.
+        """
+        self._catalog_path = catalog_path
+        catalog_dir = os.path.dirname(catalog_path)
+        if catalog_dir and not os.path.exists(catalog_dir):
+            os.makedirs(catalog_dir, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.executescript(SCHEMA)
+            existing_columns = {row["name"] for row in connection.execute(SELECT_RUN_COLUMNS)}
+            for column, column_type in MIGRATED_COLUMNS.items():
+                if column not in existing_columns:
+                    connection.execute(ADD_RUN_COLUMN.format(column=column, type=column_type))
+            connection.execute(CREATE_RUN_KEY_INDEX)
+
+    @property
+    def catalog_path(self) -> str:
+        """
+        Returns the path of the SQLite database file.
+
+        :return: The path of the catalog.
+        """
+        return self._catalog_path
+
+    def record_run(self, run: VisualizedRun, run_dir: str, artifact_paths: List[str]) -> int:
+        """
+        Records a saved run with its hyperparameters, final metrics and artifact paths. The hyperparameters are the
+        parameters the model, module and trainer were built with and the metadata of the run. The run key and final
+        checkpoint annotated on the run are recorded, so identical runs can be loaded instead of executed. The
+        station profiles annotated on the run are recorded as metrics.
+
+        :param run: The saved VisualizedRun.
+        :param run_dir: The directory the run was saved to.
+        :param artifact_paths: The paths of the artifacts of the run.
+        :return: The id of the run in the catalog.
+        """
+        tables = {get_df_name(key): run.get_df(key) for key in run.get_df_keys()
+                  if key.abstraction_level is AbstractionLevel.EPOCH}
+        hyperparameters = {"model_config": run.model_adapter.config, "module_config": run.module_adapter.config,
+                           "trainer_config": run.trainer_adapter.config,
+                           "model_metadata": _metadata_to_dict(run.model_metadata),
+                           "module_metadata": _metadata_to_dict(run.module_metadata),
+                           "trainer_metadata": _metadata_to_dict(run.trainer_metadata)}
+        return self._insert(run.model_adapter.name, run.module_adapter.name, run.trainer_adapter.name,
+                            run.process_type.value, run_dir, time.time(), hyperparameters, artifact_paths,
+                            {**final_metrics_from_tables(tables),
+                             **profile_metrics(run.get_annotation(PacketAnnotation.PROFILE))},
+                            run.get_annotation(PacketAnnotation.RUN_KEY),
+                            run.get_annotation(PacketAnnotation.CHECKPOINT))
+
+    def find_run_by_key(self, run_key: str) -> Optional[dict]:
+        """
+        Finds the newest run recorded with the given run key.
+
+        :param run_key: The run key.
+        :return: The run row as dictionary, or None if no run has the key.
+        """
+        with closing(self._connect()) as connection:
+            row = connection.execute(SELECT_RUN_BY_KEY, (run_key,)).fetchone()
+        return None if row is None else _decode_run(row)
+
+    def find_runs(self, model: Optional[str] = None, module: Optional[str] = None, trainer: Optional[str] = None,
+                  process: Optional[str] = None, since: Optional[float] = None,
+                  hyperparameters: Optional[Dict[str, Any]] = None) -> List[dict]:
+        """
+        Finds runs matching all given filters, newest first.
+
+        :param model: The name of the model adapter.
+        :param module: The name of the module adapter.
+        :param trainer: The name of the trainer adapter.
+        :param process: The process type, e.g. "test".
+        :param since: Only runs created at or after this Unix timestamp.
+        :param hyperparameters: A dictionary mapping dotted hyperparameter paths, e.g. "model_config.n_atom_basis", to
+        the values they must have.
+        :return: A list of run rows as dictionaries.
+        """
+        conditions = []
+        parameters = []
+        for column, value in (("model", model), ("module", module), ("trainer", trainer), ("process", process)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            parameters.append(since)
+        for path, value in (hyperparameters or {}).items():
+            conditions.append("json_extract(hyperparameters, ?) = ?")
+            parameters.extend([HYPERPARAMETER_PATH_FORMAT.format(path=path), value])
+
+        query = "SELECT * FROM runs"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY created_at DESC"
+        with closing(self._connect()) as connection:
+            return [_decode_run(row) for row in connection.execute(query, parameters)]
+
+    def best_per_model(self, metric: str, minimize: bool = True, process: Optional[str] = None) -> List[dict]:
+        """
+        Finds the best run of every model for the given final metric.
+
+        :param metric: The name of the metric, e.g. "trainer_test_mae".
+        :param minimize: True if lower values are better.
+        :param process: Only consider runs of this process type.
+        :return: A list of run rows with the metric value, one per model.
+        """
+        process_filter = "AND runs.process = ?" if process is not None else ""
+        query = SELECT_BEST_PER_MODEL.format(order="ASC" if minimize else "DESC", process_filter=process_filter)
+        parameters = [metric] if process is None else [metric, process]
+        with closing(self._connect()) as connection:
+            return [dict(row) for row in connection.execute(query, parameters)]
+
+    def get_metrics(self, run_id: int) -> Dict[str, float]:
+        """
+        Returns the final metrics of a run.
+
+        :param run_id: The id of the run in the catalog.
+        :return: A dictionary mapping metric names to values.
+        """
+        with closing(self._connect()) as connection:
+            return {name: value for name, value in connection.execute(SELECT_METRICS, (run_id,))}
+
+    def rebuild(self, metrics_root: str) -> int:
+        """
+        Indexes the run directories below the metrics root that are not in the catalog yet and removes entries whose
+        directory no longer exists. Module and trainer names are unknown for runs indexed this way. Catalogs written
+        before paths were stored absolute can contain relative directories, they are made absolute if they exist
+        relative to the working directory and kept otherwise, their base directory is unknown.
+
+        :param metrics_root: The root directory of the RunSaver, containing one directory per model.
+        :return: The number of newly indexed runs.
+        """
+        with closing(self._connect()) as connection, connection:
+            known_dirs = {}
+            for run_id, run_dir in connection.execute(SELECT_RUN_DIRS).fetchall():
+                if os.path.isdir(run_dir):
+                    known_dirs[os.path.abspath(run_dir)] = run_id
+                    if not os.path.isabs(run_dir):
+                        connection.execute(UPDATE_RUN_DIR, (os.path.abspath(run_dir), run_id))
+                elif os.path.isabs(run_dir):
+                    connection.execute(DELETE_RUN, (run_id,))
+
+        indexed = 0
+        for model in sorted(os.listdir(metrics_root)):
+            model_dir = os.path.join(metrics_root, model)
+            if not os.path.isdir(model_dir):
+                continue
+            pattern = re.compile(RUN_DIR_PATTERN.format(model=re.escape(model)))
+            for entry in sorted(os.listdir(model_dir)):
+                run_dir = os.path.join(model_dir, entry)
+                match = pattern.fullmatch(entry)
+                if match is None or not os.path.isdir(run_dir) or os.path.abspath(run_dir) in known_dirs:
+                    continue
+                artifact_paths = [os.path.join(run_dir, name) for name in sorted(os.listdir(run_dir))]
+                self._insert(model, None, None, match.group(1), run_dir, os.path.getmtime(run_dir), None,
+                             artifact_paths, final_metrics_from_tables(_read_epoch_tables(run_dir)))
+                indexed += 1
+        return indexed
+
+    def _insert(self, model, module, trainer, process, run_dir, created_at, hyperparameters, artifact_paths,
+                metrics: Dict[str, float], run_key: Optional[str] = None, checkpoint: Optional[str] = None) -> int:
+        """
+        Inserts or updates a run and its metrics. Paths are stored as absolute paths, so the catalog can be used
+        from any working directory.
+
+        :return: The id of the run in the catalog.
+        """
+        run_dir = os.path.abspath(run_dir)
+        artifact_paths = [os.path.abspath(path) for path in artifact_paths]
+        if checkpoint is not None:
+            checkpoint = os.path.abspath(checkpoint)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(INSERT_RUN, (model, module, trainer, process, run_dir, created_at,
+                                            json.dumps(hyperparameters, default=json_default),
+                                            json.dumps(artifact_paths), run_key, checkpoint))
+            run_id = connection.execute(SELECT_RUN_ID, (run_dir,)).fetchone()[0]
+            connection.execute(DELETE_METRICS, (run_id,))
+            connection.executemany(INSERT_METRIC, [(run_id, name, value) for name, value in metrics.items()])
+        return run_id
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens a connection to the catalog. Every operation uses its own connection, so the catalog can be used from
+        several threads and processes.
+
+        :return: The SQLite connection.
+        """
+        connection = sqlite3.connect(self._catalog_path, timeout=CONNECT_TIMEOUT)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA foreign_keys=ON")
+        return connection
+
+
+def _metadata_to_dict(metadata):
+    """
+    Converts run metadata into a JSON friendly structure.
+
+    :param metadata: The metadata, a DataFrame or any other object.
+    :return: The metadata as dictionary of lists if it is a DataFrame, otherwise unchanged.
+    """
+    if isinstance(metadata, pd.DataFrame):
+        return {column.value if isinstance(column, Column) else str(column): values
+                for column, values in metadata.to_dict("list").items()}
+    return metadata
+
+
+def _decode_run(row: sqlite3.Row) -> dict:
+    """
+    Converts a run row into a dictionary and decodes its JSON columns.
+
+    :param row: The run row.
+    :return: The run as dictionary.
+    """
+    run = dict(row)
+    for column in ("hyperparameters", "artifacts"):
+        if run[column] is not None:
+            run[column] = json.loads(run[column])
+    return run
+
+
+def _read_epoch_tables(run_dir: str) -> Dict[str, pd.DataFrame]:
+    """
+    Reads the epoch tables of a saved run, from CSV files or from a table bundle.
+
+    :param run_dir: The directory of the run.
+    :return: A dictionary mapping table names to DataFrames.
+    """
+    if os.path.exists(os.path.join(run_dir, FILE_FORMAT.format(name=TABLE_BUNDLE_NAME, type=ARROW_FORMAT))):
+        tables = load_run_tables(run_dir)
+        return {name: df for name, df in tables.items() if name.startswith(EPOCH_TABLE_PREFIX)}
+
+    return {entry.removesuffix(CSV_FORMAT): pd.read_csv(os.path.join(run_dir, entry))
+            for entry in os.listdir(run_dir)
+            if entry.startswith(EPOCH_TABLE_PREFIX) and entry.endswith(CSV_FORMAT)}
+
+
+def main():
+    """
+    Command line interface of the run catalog.
+    """
+    parser = argparse.ArgumentParser(description="Query or rebuild the run catalog.")
+    parser.add_argument("command", choices=["rebuild", "best"])
+    parser.add_argument("--catalog", required=True, help="Path of the SQLite catalog file.")
+    parser.add_argument("--metrics-root", help="Metrics directory of the RunSaver, required for rebuild.")
+    parser.add_argument("--metric", help="Metric name for best, e.g. trainer_test_mae.")
+    parser.add_argument("--maximize", action="store_true", help="Higher metric values are better.")
+    arguments = parser.parse_args()
+
+    catalog = RunCatalog(arguments.catalog)
+    if arguments.command == "rebuild":
+        print(json.dumps({"indexed": catalog.rebuild(arguments.metrics_root)}))
+    elif arguments.command == "best":
+        for row in catalog.best_per_model(arguments.metric, minimize=not arguments.maximize):
+            print(json.dumps(row))
+    else:
+        raise ValueError(UNKNOWN_COMMAND_MSG.format(command=arguments.command))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,29 @@
-from typing import List
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import pandas as pd
 
+from build_pipelines.path_management.AsyncArtifactWriter import AsyncArtifactWriter, DEF_MAX_PENDING_WRITES, \
+    timed_write
+from build_pipelines.path_management.FigureRenderer import FigureRenderer
 from processing_pipeline.RunDatasetKeys import DFKey, FigKey
-from processing_pipeline.PathManager import PathManager
+from processing_pipeline.PathManager import PathManager, CSV_FORMAT, ARROW_FORMAT, FILE_FORMAT, PNG_FORMAT
+from processing_pipeline.TableBundle import load_table_bundle
+from processing_pipeline.description_enums import AbstractionLevel, Column, DataOrigin, ProcessPhase
 from processing_pipeline.packets.VisualizedRun import VisualizedRun
 
 FIGURE_FORMAT = "fig_{abstraction_level}_{data_origin}_{figure}_{phase}"
 DF_FORMAT = "tab_{abstraction_level}_{data_origin}_{phase}"
 
+TABLE_BUNDLE_NAME = "tables"
+
 NAME_SEPARATOR = "_"
 
+TABLE_FORMATS = (CSV_FORMAT, ARROW_FORMAT)
+# CSV headers of Column enums are their string representation, e.g. "Column.MAE"
+CSV_COLUMN_PREFIX = "Column."
+UNKNOWN_TABLE_FORMAT_MSG = "Unknown table format {table_format}, supported formats are {formats}."
+
 
 def store_df(path_manager: PathManager, data: pd.DataFrame, name: str):
     """
@@ -36,6 +49,94 @@ def store_fig(path_manager: PathManager, fig, name: str):
         path_manager.save_fig(name, fig)
 
 
+def store_tables(path_manager: PathManager, tables: Dict[str, pd.DataFrame], name: str):
+    """
+    Stores several DataFrames in one table bundle using the provided PathManager.
+
+    :param path_manager: An instance of PathManager to manage the storage path.
+    :param tables: A dictionary mapping table names to DataFrames.
+    :param name: The name of the bundle file.
+    """
+    tables = {table_name: data for table_name, data in tables.items() if data is not None and len(data) > 0}
+    if tables:
+        path_manager.save_table_bundle(name, tables)
+
+
+def get_artifact_path(path_manager: PathManager, name: str, file_format: str) -> str:
+    """
+    Generates the path of an artifact in the directory of the given PathManager.
+
+    :param path_manager: The PathManager of the run directory.
+    :param name: The name of the artifact.
+    :param file_format: The file format of the artifact.
+    :return: The path of the artifact.
+    """
+    return os.path.join(path_manager.root, FILE_FORMAT.format(name=name, type=file_format))
+
+
+def get_df_name(key: DFKey) -> str:
+    """
+    Generates the artifact name of a DataFrame of a run.
+
+    :param key: The key of the DataFrame.
+    :return: The name of the DataFrame artifact.
+    """
+    return DF_FORMAT.format(abstraction_level=key.abstraction_level.value, data_origin=key.data_origin.value,
+                            phase=key.phase.value)
+
+
+def load_run_tables(run_dir: str, keys: Optional[Iterable[DFKey | str]] = None,
+                    columns: Optional[Iterable[str | Column]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Loads the tables of a run saved in the Arrow table format. Only the requested tables and columns are read.
+
+    :param run_dir: The directory of the run.
+    :param keys: DFKeys or table names of the tables to load, None loads all tables.
+    :param columns: The column names or Column enums to load, None loads all columns.
+    :return: A dictionary mapping table names to DataFrames.
+    :raises KeyError: If a requested table is not saved, or has none of the requested columns.
+    """
+    names = None
+    if keys is not None:
+        names = [get_df_name(key) if isinstance(key, DFKey) else key for key in keys]
+    path = os.path.join(run_dir, FILE_FORMAT.format(name=TABLE_BUNDLE_NAME, type=ARROW_FORMAT))
+    return load_table_bundle(path, names, columns)
+
+
+def load_run_dfs(run_dir: str) -> Dict[DFKey, pd.DataFrame]:
+    """
+    Loads all tables of a saved run, from a table bundle or from CSV files, keyed like the DataFrames of the run.
+
+    :param run_dir: The directory of the run.
+    :return: A dictionary mapping DFKey to DataFrames with Column enums as column labels.
+    """
+    keys = {get_df_name(key): key for key in (DFKey(origin, abstraction, phase) for origin in DataOrigin
+                                              for abstraction in AbstractionLevel for phase in ProcessPhase)}
+    if os.path.exists(os.path.join(run_dir, FILE_FORMAT.format(name=TABLE_BUNDLE_NAME, type=ARROW_FORMAT))):
+        return {keys[name]: df for name, df in load_run_tables(run_dir).items() if name in keys}
+
+    dfs = {}
+    for entry in os.listdir(run_dir):
+        name = entry.removesuffix(CSV_FORMAT)
+        if entry.endswith(CSV_FORMAT) and name in keys:
+            df = pd.read_csv(os.path.join(run_dir, entry))
+            dfs[keys[name]] = df.rename(columns=_restore_csv_column)
+    return dfs
+
+
+def _restore_csv_column(label: str):
+    """
+    Restores the Column enum of a CSV header.
+
+    :param label: The header of the column.
+    :return: The Column enum, or the header if it does not name one.
+    """
+    member = label.removeprefix(CSV_COLUMN_PREFIX)
+    if label.startswith(CSV_COLUMN_PREFIX) and member in Column.__members__:
+        return Column[member]
+    return label
+
+
 def get_naming(run: VisualizedRun):
     """
     Generates a naming string for the run based on its model adapter name and process type.
@@ -53,37 +154,122 @@ class RunSaver:
     RunSaver is responsible for saving visualized runs, including their data frames and figures.
     """
 
-    def __init__(self, root_path: str):
+    def __init__(self, root_path: str, writer_workers: int = 0, max_pending_writes: int = DEF_MAX_PENDING_WRITES,
+                 table_format: str = CSV_FORMAT, render_workers: int = 0):
         """
         Initializes the RunSaver with the given root path.
 
         :param root_path: The root directory for storing runs.
+        :param writer_workers: The number of background writer threads, 0 writes synchronously on the caller's
+        thread.
+        :param max_pending_writes: The maximum number of artifacts waiting to be written in asynchronous mode.
+        :param table_format: CSV_FORMAT writes one CSV per table, ARROW_FORMAT writes all tables of a run into one
+        compressed Arrow table bundle.
+        :param render_workers: The number of processes rendering figures in parallel, 0 renders figures on the
+        writing thread.
+        :raises ValueError: If the table format is not supported.
         """
+        if table_format not in TABLE_FORMATS:
+            raise ValueError(UNKNOWN_TABLE_FORMAT_MSG.format(table_format=table_format, formats=TABLE_FORMATS))
         self.runs = []
         self.path_manager = PathManager(root_path)
+        self._table_format = table_format
+        self._writer: Optional[AsyncArtifactWriter] = None
+        if writer_workers > 0:
+            self._writer = AsyncArtifactWriter(writer_workers, max_pending_writes)
+        self._renderer: Optional[FigureRenderer] = None
+        if render_workers > 0:
+            self._renderer = FigureRenderer(render_workers)
 
-    def save(self, run: VisualizedRun):
+    def save(self, run: VisualizedRun) -> Tuple[str, List[str]]:
         """
-        Saves the visualized run's data frames and figures to the appropriate paths.
+        Saves the visualized run's data frames and figures to the appropriate paths. Every write is reported to the
+        run with its latency. In asynchronous mode errors are reported to the run and raised by the next flush or close,
+        otherwise they are raised.
 
         :param run: An instance of VisualizedRun to be saved.
+        :return: The directory of the run and the paths of the artifacts that are written.
         """
         path_manager = self.get_run_path_manager(run)
+        artifact_paths = []
 
         df_key_list: List[DFKey] = run.get_df_keys()
-        for key in df_key_list:
-            df = run.get_df(key)
-            name = DF_FORMAT.format(abstraction_level=key.abstraction_level.value, data_origin=key.data_origin.value,
-                                    phase=key.phase.value)
-            store_df(path_manager, df, name)
+        if self._table_format == ARROW_FORMAT:
+            tables = {get_df_name(key): run.get_df(key) for key in df_key_list}
+            self._write(run, TABLE_BUNDLE_NAME, lambda: store_tables(path_manager, tables, TABLE_BUNDLE_NAME))
+            artifact_paths.append(get_artifact_path(path_manager, TABLE_BUNDLE_NAME, ARROW_FORMAT))
+        else:
+            for key in df_key_list:
+                df = run.get_df(key)
+                name = get_df_name(key)
+                self._write(run, name, lambda data=df, df_name=name: store_df(path_manager, data, df_name))
+                if df is not None and len(df) > 0:
+                    artifact_paths.append(get_artifact_path(path_manager, name, CSV_FORMAT))
 
         fig_key_list: List[FigKey] = run.figure_keys
-        for key in fig_key_list:
-            fig = run.get_figure(key)
-            name = FIGURE_FORMAT.format(abstraction_level=key.abstraction_level.value,
+        figures = {FIGURE_FORMAT.format(abstraction_level=key.abstraction_level.value,
                                         data_origin=key.data_origin.value,
-                                        figure=key.column.value, phase=key.phase.value)
-            store_fig(path_manager, fig, name)
+                                        figure=key.column.value, phase=key.phase.value): run.get_figure(key)
+                   for key in fig_key_list}
+        if self._renderer is not None:
+            # All figures are submitted before waiting for the first one, so they are rendered in parallel
+            renderings = {}
+            for name, fig in figures.items():
+                if fig is not None:
+                    path = get_artifact_path(path_manager, name, PNG_FORMAT)
+                    renderings[name] = (self._renderer.submit(fig, path), fig, path)
+            for name, rendering in renderings.items():
+                self._write(run, name, lambda r=rendering: FigureRenderer.wait(*r))
+                artifact_paths.append(rendering[2])
+        else:
+            for name, fig in figures.items():
+                self._write(run, name, lambda figure=fig, fig_name=name: store_fig(path_manager, figure, fig_name))
+                if fig is not None:
+                    artifact_paths.append(get_artifact_path(path_manager, name, PNG_FORMAT))
+
+        return path_manager.root, artifact_paths
+
+    def flush(self):
+        """
+        Waits until all artifacts submitted to the background writer are written.
+
+        :raises BaseException: The first error raised by a background write since the last flush.
+        """
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self):
+        """
+        Waits until all artifacts are written and stops the background writer and the rendering processes.
+
+        :raises BaseException: The first error raised by a background write since the last flush.
+        """
+        writer = self._writer
+        self._writer = None
+        try:
+            if writer is not None:
+                writer.close()
+        finally:
+            if self._renderer is not None:
+                self._renderer.close()
+                self._renderer = None
+
+    def _write(self, run: VisualizedRun, name: str, write):
+        """
+        Executes or submits one artifact write and reports it to the run.
+
+        :param run: The run the artifact belongs to.
+        :param name: The name of the artifact.
+        :param write: A callable performing the write.
+        """
+        if self._writer is not None:
+            self._writer.submit(name, write, run.add_write_report)
+            return
+
+        report = timed_write(name, write)
+        run.add_write_report(report)
+        if report.error is not None:
+            raise report.error
 
     def get_run_path_manager(self, run: VisualizedRun) -> PathManager:
         """
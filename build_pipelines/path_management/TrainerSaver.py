@@ -1,3 +1,8 @@
+import os
+
+CHECKPOINT_FOLDER = "checkpoints"
+
+
 class TrainerSaver:
     """
     TrainerSaver is responsible for managing paths related to trainer logs.
@@ -28,3 +33,12 @@ class TrainerSaver:
         :return: The name of the TensorBoard logger directory.
         """
         return "tb_logger"
+
+    @property
+    def checkpoint_path(self):
+        """
+        Returns the root directory of the run checkpoints, every run checkpoints into its own subdirectory.
+
+        :return: The root directory for checkpoints.
+        """
+        return os.path.join(self._root, CHECKPOINT_FOLDER)
@@ -0,0 +1,135 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+from processing_pipeline.FileLock import FileLock, write_atomic
+
+DEF_MIN_EPOCHS = 1
+DEF_REDUCTION_FACTOR = 3
+LOCK_SUFFIX = ".lock"
+
+STATE_RUNGS = "rungs"
+STATE_PRUNED = "pruned"
+
+INVALID_BUDGET_MSG = "Invalid budget, min_epochs {min_epochs} must be positive and at most max_epochs {max_epochs}."
+INVALID_REDUCTION_FACTOR_MSG = "The reduction factor must be at least 2, got {reduction_factor}."
+
+
+class AshaPruner:
+    """
+    AshaPruner implements asynchronous successive halving. Trials report their validation metric at the rungs
+    min_epochs * reduction_factor^k. A trial continues past a rung only if its value is among the best
+    1 / reduction_factor of all values reported at that rung so far. Decisions are made when a trial reaches a rung,
+    without waiting for other trials. The state is kept in a JSON file under a file lock, so trials running in
+    different processes share it.
+    """
+
+    def __init__(self, state_path: str, max_epochs: int, min_epochs: int = DEF_MIN_EPOCHS,
+                 reduction_factor: int = DEF_REDUCTION_FACTOR, minimize: bool = True):
+        """
+        Initializes the AshaPruner.
+
+        :param state_path: The path of the state file shared by all trials of a sweep.
+        :param max_epochs: The full budget of a trial.
+        :param min_epochs: The budget of the first rung.
+        :param reduction_factor: The factor between rung budgets, 1 / reduction_factor of the trials are promoted.
+        :param minimize: True if lower metric values are better.
+        :raises ValueError: If the budget or reduction factor is invalid.
+        """
+        if min_epochs < 1 or min_epochs > max_epochs:
+            raise ValueError(INVALID_BUDGET_MSG.format(min_epochs=min_epochs, max_epochs=max_epochs))
+        if reduction_factor < 2:
+            raise ValueError(INVALID_REDUCTION_FACTOR_MSG.format(reduction_factor=reduction_factor))
+        self._state_path = state_path
+        self._lock_path = state_path + LOCK_SUFFIX
+        self._max_epochs = max_epochs
+        self._min_epochs = min_epochs
+        self._reduction_factor = reduction_factor
+        self._minimize = minimize
+
+    @property
+    def rungs(self) -> List[int]:
+        """
+        Returns the epochs at which trials are compared, the full budget is not a rung.
+
+        :return: The rung epochs in ascending order.
+        """
+        rungs = []
+        epochs = self._min_epochs
+        while epochs < self._max_epochs:
+            rungs.append(epochs)
+            epochs *= self._reduction_factor
+        return rungs
+
+    def report(self, trial: str, epochs: int, value: Optional[float]) -> bool:
+        """
+        Reports the metric of a trial after the given number of epochs and decides if the trial continues.
+
+        :param trial: The name of the trial.
+        :param epochs: The number of finished epochs.
+        :param value: The validation metric, None if it was not logged.
+        :return: True if the trial continues, False if it is pruned.
+        """
+        if epochs not in self.rungs or value is None:
+            return True
+
+        with FileLock(self._lock_path):
+            state = self._read_state()
+            rung_values: Dict[str, float] = state[STATE_RUNGS].setdefault(str(epochs), {})
+            rung_values[trial] = value
+            continues = self._is_promoted(trial, rung_values)
+            if not continues:
+                state[STATE_PRUNED][trial] = epochs
+            write_atomic(self._state_path, json.dumps(state))
+        return continues
+
+    def reset(self):
+        """
+        Removes the rung values and pruned trials of earlier sweeps, so new trials are only compared with each other.
+        """
+        with FileLock(self._lock_path):
+            write_atomic(self._state_path, json.dumps(self._empty_state()))
+
+    def pruned_trials(self) -> Dict[str, int]:
+        """
+        Returns the pruned trials.
+
+        :return: A dictionary mapping the names of pruned trials to the epochs they were pruned at.
+        """
+        with FileLock(self._lock_path):
+            return self._read_state()[STATE_PRUNED]
+
+    def _is_promoted(self, trial: str, rung_values: Dict[str, float]) -> bool:
+        """
+        Checks if a trial is among the best values of a rung. A rung only prunes once reduction_factor trials reached
+        it, so the first trials of a sweep are not compared against too few others.
+
+        :param trial: The name of the trial.
+        :param rung_values: A dictionary mapping trial names to their values at the rung.
+        :return: True if the trial is promoted.
+        """
+        if len(rung_values) < self._reduction_factor:
+            return True
+        promoted = len(rung_values) // self._reduction_factor
+        ranking = sorted(rung_values, key=rung_values.get, reverse=not self._minimize)
+        return trial in ranking[:promoted]
+
+    def _read_state(self) -> dict:
+        """
+        Reads the state file, called with the file lock held.
+
+        :return: The state with the rung values and the pruned trials.
+        """
+        if not os.path.exists(self._state_path):
+            return self._empty_state()
+        with open(self._state_path) as state_file:
+            return json.load(state_file)
+
+    @staticmethod
+    def _empty_state() -> dict:
+        """
+        Creates the state of a sweep without reported values.
+
+        :return: The empty state.
+        """
+        return {STATE_RUNGS: {}, STATE_PRUNED: {}}
@@ -0,0 +1,76 @@
+import logging
+from typing import Optional
+
+from pytorch_lightning import Callback, LightningModule, Trainer
+
+from build_pipelines.sweep.AshaPruner import AshaPruner
+from processing_pipeline.StructuredLogging import get_logger, log_event
+from processing_pipeline.core_elements.AdapterDataKeys import AdapterDataKey
+from processing_pipeline.core_elements.TrainerLogging import DataFrameLogger
+from processing_pipeline.description_enums import AbstractionLevel, Column, ProcessPhase
+
+VALIDATION_EPOCH_KEY = AdapterDataKey(AbstractionLevel.EPOCH, ProcessPhase.VALIDATION)
+
+LOGGER = get_logger("sweep")
+
+
+class PruningCallback(Callback):
+    """
+    PruningCallback reports the validation metric logged by the DataFrameLogger of the trainer to the pruner after
+    every training epoch the validation loop ran in, e.g. only every n-th epoch with check_val_every_n_epoch, and
+    stops the trainer when the pruner prunes the trial. A pruned trial finishes like any other run, with the epochs it
+    trained.
+    """
+
+    def __init__(self, pruner: AshaPruner, trial: str, metric: Column = Column.MAE):
+        """
+        Initializes the PruningCallback.
+
+        :param pruner: The pruner shared by the trials of a sweep.
+        :param trial: The name of the trial.
+        :param metric: The validation epoch metric the trials are compared by.
+        """
+        self._pruner = pruner
+        self._trial = trial
+        self._metric = metric
+        self.pruned_at: Optional[int] = None
+        self._validated_epoch: Optional[int] = None
+
+    def on_validation_epoch_end(self, trainer: Trainer, pl_module: LightningModule):
+        """
+        Records the epoch the validation loop ran in, the sanity check before training is not an epoch.
+
+        :param trainer: The trainer of the trial.
+        :param pl_module: The trained model.
+        """
+        if not trainer.sanity_checking:
+            self._validated_epoch = trainer.current_epoch
+
+    def on_train_epoch_end(self, trainer: Trainer, pl_module: LightningModule):
+        """
+        Reports the validation metric of the finished epoch, the validation loop already ran and was logged. Epochs
+        without validation are not reported, the logged metric would be the one of an earlier epoch.
+
+        :param trainer: The trainer of the trial.
+        :param pl_module: The trained model.
+        """
+        if self._validated_epoch != trainer.current_epoch:
+            return
+        value = self._latest_value(trainer)
+        epochs = trainer.current_epoch + 1
+        if not self._pruner.report(self._trial, epochs, value):
+            self.pruned_at = epochs
+            trainer.should_stop = True
+            log_event(LOGGER, logging.INFO, "trial_pruned", trial=self._trial, epochs=epochs, value=value)
+
+    def _latest_value(self, trainer: Trainer) -> Optional[float]:
+        """
+        Reads the latest validation metric from the DataFrameLogger of the trainer.
+
+        :param trainer: The trainer of the trial.
+        :return: The latest value, or None if the trainer has no DataFrameLogger or the metric was not logged.
+        """
+        for logger in trainer.loggers:
+            if isinstance(logger, DataFrameLogger):
+                return logger.latest_metric(VALIDATION_EPOCH_KEY, self._metric)
+        return None
@@ -0,0 +1,170 @@
+import math
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+EMPTY_CHOICE_MSG = "A choice needs at least one value."
+INVALID_RANGE_MSG = "Invalid range [{low}, {high}] for {distribution}."
+
+
+class Distribution(ABC):
+    """
+    Abstract base class of the distribution a hyperparameter is sampled from.
+    """
+
+    @abstractmethod
+    def sample(self, rng: np.random.Generator) -> Any:
+        """
+        Samples one value.
+
+        :param rng: The random generator of the sweep.
+        :return: The sampled value.
+        """
+        pass
+
+
+class Choice(Distribution):
+    """
+    Samples uniformly from a list of values.
+    """
+
+    def __init__(self, values: Sequence):
+        """
+        Initializes the Choice.
+
+        :param values: The values to choose from.
+        :raises ValueError: If no values are given.
+        """
+        if len(values) == 0:
+            raise ValueError(EMPTY_CHOICE_MSG)
+        self.values = list(values)
+
+    def sample(self, rng: np.random.Generator) -> Any:
+        """
+        Samples one of the values.
+
+        :param rng: The random generator of the sweep.
+        :return: The sampled value.
+        """
+        return self.values[int(rng.integers(len(self.values)))]
+
+
+class Uniform(Distribution):
+    """
+    Samples floats uniformly from [low, high].
+    """
+
+    def __init__(self, low: float, high: float):
+        """
+        Initializes the Uniform distribution.
+
+        :param low: The lower bound.
+        :param high: The upper bound.
+        :raises ValueError: If the bounds are not ordered.
+        """
+        if low > high:
+            raise ValueError(INVALID_RANGE_MSG.format(low=low, high=high, distribution=type(self).__name__))
+        self.low = low
+        self.high = high
+
+    def sample(self, rng: np.random.Generator) -> float:
+        """
+        Samples one float.
+
+        :param rng: The random generator of the sweep.
+        :return: The sampled float.
+        """
+        return float(rng.uniform(self.low, self.high))
+
+
+class LogUniform(Distribution):
+    """
+    Samples floats whose logarithm is uniform on [log(low), log(high)], e.g. for learning rates.
+    """
+
+    def __init__(self, low: float, high: float):
+        """
+        Initializes the LogUniform distribution.
+
+        :param low: The positive lower bound.
+        :param high: The upper bound.
+        :raises ValueError: If the bounds are not positive and ordered.
+        """
+        if low <= 0 or low > high:
+            raise ValueError(INVALID_RANGE_MSG.format(low=low, high=high, distribution=type(self).__name__))
+        self.low = low
+        self.high = high
+
+    def sample(self, rng: np.random.Generator) -> float:
+        """
+        Samples one float.
+
+        :param rng: The random generator of the sweep.
+        :return: The sampled float.
+        """
+        return float(math.exp(rng.uniform(math.log(self.low), math.log(self.high))))
+
+
+class IntUniform(Distribution):
+    """
+    Samples integers uniformly from [low, high], both bounds included.
+    """
+
+    def __init__(self, low: int, high: int):
+        """
+        Initializes the IntUniform distribution.
+
+        :param low: The lower bound.
+        :param high: The upper bound, included.
+        :raises ValueError: If the bounds are not ordered.
+        """
+        if low > high:
+            raise ValueError(INVALID_RANGE_MSG.format(low=low, high=high, distribution=type(self).__name__))
+        self.low = low
+        self.high = high
+
+    def sample(self, rng: np.random.Generator) -> int:
+        """
+        Samples one integer.
+
+        :param rng: The random generator of the sweep.
+        :return: The sampled integer.
+        """
+        return int(rng.integers(self.low, self.high + 1))
+
+
+class SearchSpace:
+    """
+    SearchSpace maps hyperparameter names, e.g. the keyword arguments of SchnetNN, to the distributions they are
+    sampled from. Values that are not distributions are passed to every trial unchanged.
+    """
+
+    def __init__(self, parameters: Dict[str, Any]):
+        """
+        Initializes the SearchSpace.
+
+        :param parameters: A dictionary mapping parameter names to distributions or fixed values.
+        """
+        self._parameters = parameters
+
+    def sample(self, rng: np.random.Generator) -> Dict[str, Any]:
+        """
+        Samples one configuration.
+
+        :param rng: The random generator of the sweep.
+        :return: A dictionary mapping parameter names to values.
+        """
+        return {name: parameter.sample(rng) if isinstance(parameter, Distribution) else parameter
+                for name, parameter in self._parameters.items()}
+
+    def sample_many(self, number: int, seed: int) -> List[Dict[str, Any]]:
+        """
+        Samples several configurations reproducibly.
+
+        :param number: The number of configurations.
+        :param seed: The seed of the random generator.
+        :return: A list of configurations.
+        """
+        rng = np.random.default_rng(seed)
+        return [self.sample(rng) for _ in range(number)]
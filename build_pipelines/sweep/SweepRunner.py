@@ -0,0 +1,155 @@
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+from build_pipelines.sweep.AshaPruner import AshaPruner, DEF_MIN_EPOCHS, DEF_REDUCTION_FACTOR
+from build_pipelines.sweep.PruningCallback import PruningCallback
+from build_pipelines.sweep.SearchSpace import SearchSpace
+from processing_pipeline.FileLock import write_atomic
+from processing_pipeline.RunDatasetKeys import DFKey
+from processing_pipeline.description_enums import AbstractionLevel, Column, DataOrigin, ProcessPhase, ProcessType
+from processing_pipeline.ends.RunInitializer import DEF_MAX_WORKERS
+from processing_pipeline.ends.RunSpec import RunSpec
+
+DEF_TRIALS = 9
+DEF_MAX_EPOCHS = 9
+DEF_SWEEP_SEED = 0
+
+TRIAL_NAME_FORMAT = "{sweep}_trial_{index:03d}"
+PRUNER_STATE_FILE = "pruner_state.json"
+RESULT_FILE = "sweep.json"
+
+TRIAL_COMPLETED = "completed"
+TRIAL_PRUNED = "pruned"
+TRIAL_FAILED = "failed"
+
+RESULT_TRIAL = "trial"
+RESULT_CONFIG = "config"
+RESULT_STATUS = "status"
+RESULT_VALUE = "value"
+RESULT_EPOCHS = "epochs"
+RESULT_ERROR = "error"
+
+VALIDATION_EPOCH_KEY = DFKey(DataOrigin.TRAINER, AbstractionLevel.EPOCH, ProcessPhase.VALIDATION)
+
+
+class SweepRunner:
+    """
+    SweepRunner explores the hyperparameters of a model by sampling configurations from a search space. Every trial
+    gets its own model and trainer from the CoreBuilder, and all trials run concurrently through
+    RunInitializer.run_many, so every trial is saved and cataloged as a normal train run. An AshaPruner stops
+    weak trials early based on their validation metric.
+    """
+
+    def __init__(self, core_manager, name: str, sweep_dir: str, search_space: SearchSpace, db_manager_name: str,
+                 module_name: str, model_kwargs: Dict[str, Any], trainer_kwargs: Optional[Dict[str, Any]] = None,
+                 max_epochs: int = DEF_MAX_EPOCHS, min_epochs: int = DEF_MIN_EPOCHS,
+                 reduction_factor: int = DEF_REDUCTION_FACTOR, metric: Column = Column.MAE, minimize: bool = True):
+        """
+        Initializes the SweepRunner.
+
+        :param core_manager: The CoreManager whose builders and run initializer run the trials.
+        :param name: The name of the sweep, it prefixes the model and trainer names of the trials.
+        :param sweep_dir: The directory of the pruner state and the sweep results.
+        :param search_space: The search space of the model keyword arguments.
+        :param db_manager_name: The name of the database the models are built for.
+        :param module_name: The name of the already built module all trials train on.
+        :param model_kwargs: The model keyword arguments shared by all trials, sampled values take precedence.
+        :param trainer_kwargs: The trainer keyword arguments shared by all trials.
+        :param max_epochs: The full budget of a trial.
+        :param min_epochs: The budget of the first pruning rung.
+        :param reduction_factor: The factor between rung budgets, 1 / reduction_factor of the trials are promoted.
+        :param metric: The validation epoch metric the trials are compared by.
+        :param minimize: True if lower metric values are better.
+        """
+        self._core_manager = core_manager
+        self._name = name
+        self._sweep_dir = sweep_dir
+        self._search_space = search_space
+        self._db_manager_name = db_manager_name
+        self._module_name = module_name
+        self._model_kwargs = model_kwargs
+        self._trainer_kwargs = trainer_kwargs or {}
+        self._max_epochs = max_epochs
+        self._min_epochs = min_epochs
+        self._reduction_factor = reduction_factor
+        self._metric = metric
+        self._minimize = minimize
+
+    def run(self, trials: int = DEF_TRIALS, max_workers: int = DEF_MAX_WORKERS,
+            seed: int = DEF_SWEEP_SEED) -> List[dict]:
+        """
+        Samples and runs the trials, waiting until all of them finished or were pruned. The pruner state of an
+        earlier sweep in the same directory is reset, its trials carry the same names.
+
+        :param trials: The number of sampled configurations.
+        :param max_workers: The number of trials running at the same time.
+        :param seed: The seed of the configuration sampling.
+        :return: One result per trial, ordered from best to worst metric.
+        """
+        os.makedirs(self._sweep_dir, exist_ok=True)
+        pruner = AshaPruner(os.path.join(self._sweep_dir, PRUNER_STATE_FILE), self._max_epochs, self._min_epochs,
+                            self._reduction_factor, self._minimize)
+        pruner.reset()
+        configs = self._search_space.sample_many(trials, seed)
+
+        core_builder = self._core_manager.core_builder
+        specs = []
+        for index, config in enumerate(configs):
+            trial = TRIAL_NAME_FORMAT.format(sweep=self._name, index=index)
+            core_builder.build_model(trial, self._db_manager_name, {**self._model_kwargs, **config})
+            callbacks = [*self._trainer_kwargs.get("callbacks", []), PruningCallback(pruner, trial, self._metric)]
+            core_builder.build_trainer(trial, {**self._trainer_kwargs, "max_epochs": self._max_epochs,
+                                               "callbacks": callbacks})
+            specs.append(RunSpec(trial, self._module_name, trial, ProcessType.TRAIN.value))
+        self._core_manager.update_adapters()
+
+        handles = self._core_manager.run_initializer.run_many(specs, max_workers)
+        results = [self._collect(handle, config) for handle, config in zip(handles, configs)]
+        pruned = pruner.pruned_trials()
+        for result in results:
+            if result[RESULT_STATUS] == TRIAL_COMPLETED and result[RESULT_TRIAL] in pruned:
+                result[RESULT_STATUS] = TRIAL_PRUNED
+
+        results.sort(key=self._sort_key)
+        write_atomic(os.path.join(self._sweep_dir, RESULT_FILE), json.dumps(results, default=str))
+        return results
+
+    def _collect(self, handle, config: Dict[str, Any]) -> dict:
+        """
+        Waits for a trial and extracts its last validation metric.
+
+        :param handle: The RunHandle of the trial.
+        :param config: The sampled configuration of the trial.
+        :return: The result of the trial.
+        """
+        result = {RESULT_TRIAL: handle.spec.model, RESULT_CONFIG: config, RESULT_STATUS: TRIAL_COMPLETED,
+                  RESULT_VALUE: None, RESULT_EPOCHS: 0}
+        try:
+            run = handle.result()
+        except Exception as error:
+            result[RESULT_STATUS] = TRIAL_FAILED
+            result[RESULT_ERROR] = repr(error)
+            return result
+
+        if VALIDATION_EPOCH_KEY in run.get_df_keys():
+            validation = run.get_df(VALIDATION_EPOCH_KEY)
+            if self._metric in validation.columns:
+                values = validation[self._metric].dropna()
+                if len(values):
+                    result[RESULT_VALUE] = float(values.iloc[-1])
+                result[RESULT_EPOCHS] = int(validation[Column.EPOCH].max()) + 1
+        return result
+
+    def _sort_key(self, result: dict):
+        """
+        Orders results by their metric, trials without a value last.
+
+        :param result: The result of a trial.
+        :return: The sort key.
+        """
+        value = result[RESULT_VALUE]
+        if value is None or math.isnan(value):
+            return 1, 0.0
+        return 0, value if self._minimize else -value
@@ -1,9 +1,10 @@
-import schnetpack.transform as trn
-
 from CoreManager import CoreManager
 from processing_pipeline.ends.RunInitializer import RunInitializer
+from processing_pipeline.ends.RunSpec import RunSpec
+from processing_pipeline.StructuredLogging import configure_logging
 from schnet_integration.legacy.MolProperty import MolProperty
 
+import logging
 import os
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 
@@ -73,16 +74,30 @@ MODEL1 = {"name": "model1", "db_manager_name": "db1", "kwargs": {
     "additional_input_keys": [],
     "prediction_keys": [MolProperty.TOTAL_ENERGY],
 }}
-MODULE1 = {"module_name": "module1", "db_name": "db1", "kwargs": {
-    "selected_properties": [MolProperty.TOTAL_ENERGY],
-    "batch_size": 1,
-    "num_train": 4,
-    "num_val": 2,
-    "transforms": [
+
+
+def create_module1():
+    """
+    Creates the configuration of module1. The transforms import schnetpack, so they are only created when the module
+    is built.
+
+    :return: The configuration of module1.
+    """
+    import schnetpack.transform as trn
+
+    return {"module_name": "module1", "db_name": "db1", "kwargs": {
+        "selected_properties": [MolProperty.TOTAL_ENERGY],
+        "batch_size": 1,
+        "num_train": 4,
+        "num_val": 2,
+        "transforms": [
             trn.ASENeighborList(cutoff=5.),
             trn.CastTo32()
-        ]
-}}
+        ],
+        "neighbor_list_cache": True
+    }}
+
+
 TRAINER1 = {"name": "trainer1", "kwargs": {
     "max_epochs": 2
 }}
@@ -95,7 +110,7 @@ def run_1():
     core_manager = CoreManager(store_path, db_path)
     core_builder = core_manager.core_builder
 
-    core_builder.build_module(**MODULE1)
+    core_builder.build_module(**create_module1())
     core_builder.build_model(**MODEL1)
     core_builder.build_trainer(**TRAINER1)
 
@@ -103,7 +118,32 @@ def run_1():
 
     run_initializer: RunInitializer = core_manager.run_initializer
     run_initializer.run_from_str("model1", "module1", "trainer1", "test")
+    core_manager.close()
+
+
+def run_2():
+    db_path = DB_PATH
+    store_path = STORE_PATH
+
+    core_manager = CoreManager(store_path, db_path)
+    core_builder = core_manager.core_builder
+
+    core_builder.build_module(**create_module1())
+    core_builder.build_model(**MODEL1)
+    core_builder.build_trainer(**TRAINER1)
+
+    core_manager.update_adapters()
+
+    run_initializer: RunInitializer = core_manager.run_initializer
+    # The test run uses the trained model, so it runs in a batch after the train run
+    for specs in ([RunSpec("model1", "module1", "trainer1", "train")],
+                  [RunSpec("model1", "module1", "trainer1", "test")]):
+        handles = run_initializer.run_many(specs, max_workers=2)
+        for handle in handles:
+            handle.result()
+    core_manager.close()
 
 
 if __name__ == "__main__":
+    configure_logging(logging.INFO)
     run_1()
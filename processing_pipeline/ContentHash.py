@@ -0,0 +1,95 @@
+import functools
+import hashlib
+import inspect
+import json
+from enum import Enum
+
+HASH_ALGORITHM = "sha256"
+HASH_CHUNK_SIZE = 1 << 20
+# Objects are described by their attributes up to this depth, deeper objects by their type
+DEF_DESCRIBE_DEPTH = 4
+DESCRIPTION_TYPE = "type"
+DESCRIPTION_STATE = "state"
+
+UNSUPPORTED_CONFIG_MSG = ("Objects of type {type} have neither attributes nor a representation of their value and can "
+                          "not be described.")
+
+
+def file_content_hash(path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """
+    Hashes the content of a file, reading it in chunks so large databases are not loaded into memory.
+
+    :param path: The path of the file.
+    :param chunk_size: The number of bytes read at once.
+    :return: The hex digest of the content.
+    """
+    digest = hashlib.new(HASH_ALGORITHM)
+    with open(path, "rb") as hashed_file:
+        for chunk in iter(lambda: hashed_file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def canonical_hash(value) -> str:
+    """
+    Hashes a JSON serializable value independent of the order of dictionary keys.
+
+    :param value: The value to hash, non-serializable leaves are hashed by their string representation.
+    :return: The hex digest of the canonical JSON representation.
+    """
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.new(HASH_ALGORITHM, canonical.encode()).hexdigest()
+
+
+def qualified_name(value) -> str:
+    """
+    Returns the module and qualified name of a class or function.
+
+    :param value: The class or function.
+    :return: The qualified name, e.g. "torch.optim.adam.Adam".
+    """
+    return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', repr(value))}"
+
+
+def describe_config(value, depth: int = DEF_DESCRIBE_DEPTH):
+    """
+    Converts a configuration, e.g. builder keyword arguments, into a JSON serializable description for
+    canonical_hash. Enums, classes and functions are described by name, arrays by their values and other objects by
+    their type and attributes, so two transforms with different settings get different descriptions even if their
+    representations are equal. Objects without attributes are described by their representation if their type
+    defines one, the default representation holds the memory address and would differ between processes.
+
+    :param value: The configuration.
+    :param depth: The number of object levels described by their attributes, deeper objects are described by their
+    type.
+    :return: The description of the configuration.
+    :raises TypeError: If an object has neither attributes nor a representation of its value.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Enum):
+        return f"{type(value).__qualname__}.{value.name}"
+    if isinstance(value, dict):
+        return {str(describe_config(key, depth)): describe_config(item, depth) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [describe_config(item, depth) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((describe_config(item, depth) for item in value), key=str)
+    if isinstance(value, type) or inspect.isroutine(value):
+        return qualified_name(value)
+    if hasattr(value, "tolist"):
+        # Arrays and tensors are described by their values
+        return describe_config(value.tolist(), depth)
+    if isinstance(value, functools.partial):
+        return {DESCRIPTION_TYPE: qualified_name(type(value)),
+                DESCRIPTION_STATE: describe_config({"func": value.func, "args": value.args,
+                                                    "keywords": value.keywords}, depth)}
+    if hasattr(value, "__dict__"):
+        if depth <= 0:
+            return {DESCRIPTION_TYPE: qualified_name(type(value))}
+        state = describe_config(vars(value), depth - 1)
+        return {DESCRIPTION_TYPE: qualified_name(type(value)), DESCRIPTION_STATE: dict(sorted(state.items()))}
+    if type(value).__repr__ is not object.__repr__:
+        # Types with their own representation describe their value by it, e.g. torch.device
+        return repr(value)
+    raise TypeError(UNSUPPORTED_CONFIG_MSG.format(type=qualified_name(type(value))))
@@ -0,0 +1,83 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+DEF_GRID_SIZE = 1024
+DEF_CUT = 3
+KERNEL_RADIUS = 4
+SCOTT_EXPONENT = -1 / 5
+DEGENERATE_BANDWIDTH_SCALE = 1e-3
+
+
+def scott_bandwidth(values: np.ndarray) -> float:
+    """
+    Computes the Gaussian kernel bandwidth by Scott's rule, as used by seaborn's default kernel density estimate.
+
+    :param values: The finite sample values.
+    :return: The bandwidth, a small fraction of the sample magnitude for constant samples, so they stay plottable.
+    """
+    bandwidth = 0.0
+    if len(values) > 1:
+        bandwidth = float(np.std(values, ddof=1)) * len(values) ** SCOTT_EXPONENT
+    if bandwidth > 0:
+        return bandwidth
+    return max(float(np.abs(values).max()), 1.0) * DEGENERATE_BANDWIDTH_SCALE
+
+
+def binned_kde(values, grid_size: int = DEF_GRID_SIZE, bandwidth: Optional[float] = None,
+               cut: float = DEF_CUT) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Estimates a Gaussian kernel density on an evenly spaced grid. The samples are linearly binned onto the grid and
+    the bin counts are convolved with the kernel by FFT, so the cost is O(n + grid_size log grid_size) instead of
+    O(n * grid_size).
+
+    :param values: The sample values, non-finite values are ignored.
+    :param grid_size: The number of grid points.
+    :param bandwidth: The kernel bandwidth, None uses Scott's rule.
+    :param cut: The number of bandwidths the grid extends beyond the extreme samples.
+    :return: The grid points and the estimated density at each grid point, both empty for an empty sample.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return np.empty(0), np.empty(0)
+    if bandwidth is None:
+        bandwidth = scott_bandwidth(values)
+
+    low = values.min() - cut * bandwidth
+    high = values.max() + cut * bandwidth
+    grid = np.linspace(low, high, grid_size)
+    delta = grid[1] - grid[0]
+
+    # Linear binning, every sample is split between its two neighbouring grid points
+    position = (values - low) / delta
+    left = np.clip(np.floor(position).astype(np.int64), 0, grid_size - 2)
+    fraction = position - left
+    counts = (np.bincount(left, weights=1 - fraction, minlength=grid_size)
+              + np.bincount(left + 1, weights=fraction, minlength=grid_size))
+
+    half_width = min(int(np.ceil(KERNEL_RADIUS * bandwidth / delta)), grid_size - 1)
+    kernel_x = np.arange(-half_width, half_width + 1) * delta
+    kernel = np.exp(-0.5 * (kernel_x / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+
+    fft_size = 1 << int(np.ceil(np.log2(grid_size + len(kernel) - 1)))
+    convolved = np.fft.irfft(np.fft.rfft(counts, fft_size) * np.fft.rfft(kernel, fft_size), fft_size)
+    density = np.clip(convolved[half_width:half_width + grid_size], 0, None) / len(values)
+    return grid, density
+
+
+def subsample(values, budget: Optional[int], seed: int = 0) -> np.ndarray:
+    """
+    Draws a uniform sample without replacement of at most budget values, preserving their order.
+
+    :param values: The values to sample from.
+    :param budget: The maximum number of values, None keeps all values.
+    :param seed: The seed of the random generator, so repeated runs plot the same sample.
+    :return: The sampled values.
+    """
+    values = np.asarray(values)
+    if budget is None or len(values) <= budget:
+        return values
+    indices = np.random.default_rng(seed).choice(len(values), budget, replace=False)
+    indices.sort()
+    return values[indices]
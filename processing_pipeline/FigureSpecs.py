@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+
+class FigureSpec(ABC):
+    """
+    A lightweight description of a figure, holding references to the plotted data and the plot type. The figure is
+    only built when it is rendered, with the object-oriented Agg API, so no global pyplot state is involved and specs
+    can be rendered in any thread or process.
+    """
+
+    @abstractmethod
+    def draw(self, figure: Figure):
+        """
+        Draws the plot onto an empty figure.
+
+        :param figure: The figure to draw onto.
+        """
+        pass
+
+    def render(self) -> Figure:
+        """
+        Builds the figure of the spec. The caller owns the figure and has to clear it when done.
+
+        :return: The rendered matplotlib figure.
+        """
+        # matplotlib is only imported when rendering, creating and pickling specs does not need it
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        figure = Figure()
+        FigureCanvasAgg(figure)
+        self.draw(figure)
+        return figure
+
+    def savefig(self, path: str):
+        """
+        Renders the spec, saves it to the given path and releases the figure afterwards.
+
+        :param path: The path of the image file.
+        """
+        figure = self.render()
+        try:
+            figure.savefig(path)
+        finally:
+            figure.clear()
+
+
+class LinePlotSpec(FigureSpec):
+    """
+    A line plot of one column against another.
+    """
+
+    def __init__(self, x, y, label: str, x_label: str, y_label: str, title: str,
+                 visualisation_method: Optional[Callable] = None):
+        """
+        Initializes the LinePlotSpec.
+
+        :param x: The values on the x-axis.
+        :param y: The values on the y-axis.
+        :param label: The legend label of the line.
+        :param x_label: The label of the x-axis.
+        :param y_label: The label of the y-axis.
+        :param title: The title of the figure.
+        :param visualisation_method: A callable for custom visualization, taking fig, ax, x_axis, and y_axis as
+        parameters, it has to be picklable to render the spec in another process.
+        """
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.label = label
+        self.x_label = x_label
+        self.y_label = y_label
+        self.title = title
+        self.visualisation_method = visualisation_method
+
+    def draw(self, figure: Figure):
+        """
+        Draws the line plot onto an empty figure.
+
+        :param figure: The figure to draw onto.
+        """
+        ax = figure.subplots()
+        if self.visualisation_method is not None:
+            self.visualisation_method(figure, ax, self.x, self.y)
+
+        ax.plot(self.x, self.y, label=self.label)
+        ax.set_xlabel(self.x_label)
+        ax.set_ylabel(self.y_label)
+        ax.set_title(self.title)
+
+        ax.legend()
+        ax.grid(True)
+
+
+class DensityPlotSpec(FigureSpec):
+    """
+    Overlaid kernel density estimates of several samples.
+    """
+
+    def __init__(self, samples: Dict[str, np.ndarray], x_label: str, y_label: str, title: str):
+        """
+        Initializes the DensityPlotSpec.
+
+        :param samples: A dictionary mapping legend labels to the sampled values.
+        :param x_label: The label of the x-axis.
+        :param y_label: The label of the y-axis.
+        :param title: The title of the figure.
+        """
+        self.samples = {label: np.asarray(values) for label, values in samples.items()}
+        self.x_label = x_label
+        self.y_label = y_label
+        self.title = title
+
+    def draw(self, figure: Figure):
+        """
+        Draws the density plot onto an empty figure.
+
+        :param figure: The figure to draw onto.
+        """
+        import seaborn as sns
+
+        ax = figure.subplots()
+        for label, values in self.samples.items():
+            sns.kdeplot(values, ax=ax, label=label, fill=True, alpha=0.5)
+        ax.set_xlabel(self.x_label)
+        ax.set_ylabel(self.y_label)
+        ax.set_title(self.title)
+        ax.legend()
+
+
+class DensityCurvePlotSpec(FigureSpec):
+    """
+    Overlaid, precomputed density curves, so the plotted data stays small for arbitrarily large samples.
+    """
+
+    def __init__(self, curves: Dict[str, Tuple[np.ndarray, np.ndarray]], x_label: str, y_label: str, title: str):
+        """
+        Initializes the DensityCurvePlotSpec.
+
+        :param curves: A dictionary mapping legend labels to the grid points and densities of a curve.
+        :param x_label: The label of the x-axis.
+        :param y_label: The label of the y-axis.
+        :param title: The title of the figure.
+        """
+        self.curves = curves
+        self.x_label = x_label
+        self.y_label = y_label
+        self.title = title
+
+    def draw(self, figure: Figure):
+        """
+        Draws the filled density curves onto an empty figure, styled like the kernel density plot.
+
+        :param figure: The figure to draw onto.
+        """
+        ax = figure.subplots()
+        for label, (grid, density) in self.curves.items():
+            line, = ax.plot(grid, density, label=label)
+            ax.fill_between(grid, density, color=line.get_color(), alpha=0.5)
+        ax.set_xlabel(self.x_label)
+        ax.set_ylabel(self.y_label)
+        ax.set_title(self.title)
+        ax.legend()
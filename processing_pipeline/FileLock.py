@@ -0,0 +1,90 @@
+import os
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+LOCK_FILE_MODE = "a+b"
+
+
+class FileLock:
+    """
+    An exclusive inter-process lock on a lock file, usable as context manager. Every acquisition opens its own file
+    handle, so the lock also excludes threads of the same process.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initializes the FileLock.
+
+        :param path: The path of the lock file, it is created if it does not exist.
+        """
+        self._path = path
+        self._file = None
+
+    def acquire(self):
+        """
+        Blocks until the lock is acquired.
+        """
+        lock_file = open(self._path, LOCK_FILE_MODE)
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+        except BaseException:
+            lock_file.close()
+            raise
+        self._file = lock_file
+
+    def release(self):
+        """
+        Releases the lock.
+        """
+        if self._file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        """
+        Acquires the lock.
+
+        :return: The FileLock.
+        """
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Releases the lock.
+        """
+        self.release()
+
+
+def write_atomic(path: str, content: str):
+    """
+    Writes a text file atomically by writing a temporary file and replacing the target.
+
+    :param path: The path of the file.
+    :param content: The text to write.
+    """
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w") as temporary_file:
+        temporary_file.write(content)
+    os.replace(temporary_path, path)
@@ -1,4 +1,5 @@
 from abc import ABC
+from typing import Optional
 
 
 class IElementDoc(ABC):
@@ -13,6 +14,8 @@ class IElementDoc(ABC):
         :param name: The name of the element.
         """
         self._name = name
+        self._config_hash: Optional[str] = None
+        self._config = None
 
     @property
     def name(self) -> str:
@@ -22,3 +25,39 @@ class IElementDoc(ABC):
         :return: The name of the element.
         """
         return self._name
+
+    @property
+    def config_hash(self) -> Optional[str]:
+        """
+        Get the hash of the configuration the element was built from, it identifies identical runs.
+
+        :return: The configuration hash, or None if the element cannot be identified by its configuration.
+        """
+        return self._config_hash
+
+    @config_hash.setter
+    def config_hash(self, config_hash: Optional[str]):
+        """
+        Set the hash of the configuration the element was built from.
+
+        :param config_hash: The configuration hash, None if the element cannot be identified by its configuration.
+        """
+        self._config_hash = config_hash
+
+    @property
+    def config(self):
+        """
+        Get the JSON serializable description of the parameters the element was built with.
+
+        :return: The description of the parameters, or None if the element was not built from parameters.
+        """
+        return self._config
+
+    @config.setter
+    def config(self, config):
+        """
+        Set the JSON serializable description of the parameters the element was built with.
+
+        :param config: The description of the parameters.
+        """
+        self._config = config
@@ -2,6 +2,9 @@ import os
 from re import escape, search, match
 from typing import Dict, LiteralString
 
+from processing_pipeline.TableBundle import write_table_bundle, DEF_COMPRESSION
+from processing_pipeline.VersionAllocator import VersionAllocator
+
 VERSION_FORMAT = "{name}_{i}{type}"
 REGEX_TEMPLATE = r"{name}_([\d]+){type}"
 FILE_FORMAT = "{name}{type}"
@@ -11,6 +14,7 @@ FILE_NOT_FOUND = "No version found for {name} at path {path}"
 
 CSV_FORMAT = ".csv"
 PNG_FORMAT = ".png"
+ARROW_FORMAT = ".arrow"
 DIR_FORMAT = ""
 
 
@@ -25,9 +29,9 @@ class PathManager:
 
         :param root: The root directory to manage.
         """
-        if not os.path.exists(root):
-            os.makedirs(root)
+        os.makedirs(root, exist_ok=True)
         self.root = root
+        self._version_allocator = VersionAllocator(root, VERSION_FORMAT)
 
     def get_existing_subdirectory(self, name) -> LiteralString | str | bytes:
         """
@@ -64,8 +68,7 @@ class PathManager:
         :return: The path of the subdirectory.
         """
         path = os.path.join(self.root, name)
-        if not os.path.exists(path):
-            os.makedirs(path)
+        os.makedirs(path, exist_ok=True)
         return path
 
     def get_existing_file(self, name, file_format) -> str:
@@ -84,7 +87,8 @@ class PathManager:
 
     def create_version_subdirectory(self, name) -> str:
         """
-        Create a versioned subdirectory.
+        Create a versioned subdirectory. The version is allocated under a file lock and the directory is created
+        atomically, so concurrent runs never receive the same directory.
 
         :param name: The base name of the subdirectory.
         :return: The path of the created subdirectory.
@@ -93,13 +97,13 @@ class PathManager:
         def type_check(item):
             return os.path.isdir(os.path.join(self.root, item))
 
-        directory = self.get_free_version_entry(name, type_check, DIR_FORMAT)
-        os.makedirs(directory)
-        return directory
+        return self._version_allocator.allocate(name, DIR_FORMAT, True,
+                                                lambda: self.list_version_entry(name, type_check, DIR_FORMAT))
 
     def create_version_file(self, name, file_format) -> str:
         """
-        Create a versioned file.
+        Create a versioned file. The version is allocated under a file lock, so concurrent runs never receive the
+        same path.
 
         :param name: The base name of the file.
         :param file_format: The format of the file.
@@ -109,8 +113,8 @@ class PathManager:
         def type_check(item):
             return os.path.isfile(os.path.join(self.root, item))
 
-        file_path = self.get_free_version_entry(name, type_check, file_format)
-        return file_path
+        return self._version_allocator.allocate(name, file_format, False,
+                                                lambda: self.list_version_entry(name, type_check, file_format))
 
     def get_free_version_entry(self, name, type_check, file_format) -> str:
         """
@@ -213,6 +217,20 @@ class PathManager:
             raise FileExistsError(DIR_EXISTS.format(name=name))
         data.to_csv(path, index=False)
 
+    def save_table_bundle(self, name, tables, compression=DEF_COMPRESSION):
+        """
+        Save several DataFrames into one compressed Arrow table bundle.
+
+        :param name: The base name of the file.
+        :param tables: A dictionary mapping table names to DataFrames.
+        :param compression: The Arrow IPC buffer compression.
+        :raises FileExistsError: If the file already exists.
+        """
+        path = os.path.join(self.root, FILE_FORMAT.format(name=name, type=ARROW_FORMAT))
+        if os.path.exists(path):
+            raise FileExistsError(DIR_EXISTS.format(name=name))
+        write_table_bundle(path, tables, compression)
+
     def save_fig(self, name, figure):
         """
         Save a figure as a PNG file.
@@ -40,7 +40,7 @@ class FigKey(IResultDataElementDoc):
         if not isinstance(other, FigKey):
             return False
         return (self.data_origin, self.abstraction_level, self.column, self.phase) == \
-            (self.data_origin, self.abstraction_level, self.column, self.phase)
+            (other.data_origin, other.abstraction_level, other.column, other.phase)
 
     def __repr__(self):
         """
@@ -83,10 +83,10 @@ class DFKey(IResultDataSetDoc):
         :param other: The other DFKey to compare with.
         :return: True if the DFKeys are equal, False otherwise.
         """
-        if not isinstance(other, FigKey):
+        if not isinstance(other, DFKey):
             return False
         return (self.data_origin, self.abstraction_level, self.phase) == \
-            (self.data_origin, self.abstraction_level, self.phase)
+            (other.data_origin, other.abstraction_level, other.phase)
 
     def __repr__(self):
         """
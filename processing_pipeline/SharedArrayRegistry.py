@@ -0,0 +1,230 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+
+import numpy as np
+
+from processing_pipeline.FileLock import FileLock, write_atomic
+
+SEGMENT_NAME_FORMAT = "mlp_{digest}"
+SEGMENT_DIGEST_LENGTH = 20
+REFS_FILE_NAME = ".shm_refs.json"
+LOCK_FILE_NAME = ".shm.lock"
+
+REFS_HOLDERS = "holders"
+REFS_READY = "ready"
+SHARED_MEMORY_RESOURCE = "shared_memory"
+
+NOT_ATTACHED_MSG = "Array {path} is not attached in this process."
+
+
+def _is_alive(pid: int) -> bool:
+    """
+    Checks if a process is alive. On Windows os.kill would terminate the process, every holder counts as alive there,
+    segments are freed by the system once no process has them open.
+
+    :param pid: The id of the process.
+    :return: True if the process exists.
+    """
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _untrack(segment: shared_memory.SharedMemory):
+    """
+    Stops the resource tracker of this process from unlinking the segment when the process exits, the registry's
+    reference count decides when a segment is unlinked.
+
+    :param segment: The shared memory segment.
+    """
+    if os.name != "posix":
+        return
+    from multiprocessing import resource_tracker
+    try:
+        resource_tracker.unregister(segment._name, SHARED_MEMORY_RESOURCE)
+    except (AttributeError, KeyError):
+        pass
+
+
+class SharedArrayRegistry:
+    """
+    SharedArrayRegistry loads .npy arrays of one directory once per host into shared memory segments. Every process
+    attaches to the segments read-only, the holders of every segment are recorded in a reference file under a file
+    lock. A segment is unlinked when its last holder releases it, holders that died without releasing are pruned.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initializes the SharedArrayRegistry.
+
+        :param root: The directory of the arrays, it also holds the reference file.
+        """
+        self._root = root
+        self._refs_path = os.path.join(root, REFS_FILE_NAME)
+        self._lock_path = os.path.join(root, LOCK_FILE_NAME)
+        self._attached: Dict[str, Tuple[shared_memory.SharedMemory, np.ndarray]] = {}
+        self._thread_lock = threading.Lock()
+
+    def attach(self, path: str) -> np.ndarray:
+        """
+        Attaches to the shared copy of an array, loading it into shared memory if no process did before.
+
+        :param path: The path of the .npy file.
+        :return: A read-only array backed by shared memory.
+        """
+        with self._thread_lock:
+            attached = self._attached.get(path)
+            if attached is not None:
+                return attached[1]
+
+            source = np.load(path, mmap_mode="r")
+            segment_name = self._segment_name(path)
+            with FileLock(self._lock_path):
+                refs = self._read_refs()
+                entry = refs.setdefault(segment_name, {REFS_HOLDERS: [], REFS_READY: False})
+                segment = self._open_segment(segment_name, source, entry)
+                entry[REFS_READY] = True
+                if os.getpid() not in entry[REFS_HOLDERS]:
+                    entry[REFS_HOLDERS].append(os.getpid())
+                write_atomic(self._refs_path, json.dumps(refs))
+
+            array = np.ndarray(source.shape, dtype=source.dtype, buffer=segment.buf)
+            array.setflags(write=False)
+            self._attached[path] = (segment, array)
+            return array
+
+    def release(self, path: str):
+        """
+        Releases the array of this process, unlinking its segment if no other process holds it.
+
+        :param path: The path of the .npy file.
+        :raises KeyError: If the array is not attached in this process.
+        """
+        with self._thread_lock:
+            if path not in self._attached:
+                raise KeyError(NOT_ATTACHED_MSG.format(path=path))
+            segment, _ = self._attached.pop(path)
+            segment_name = self._segment_name(path)
+            with FileLock(self._lock_path):
+                refs = self._read_refs()
+                entry = refs.get(segment_name, {REFS_HOLDERS: [], REFS_READY: True})
+                holders = [pid for pid in entry[REFS_HOLDERS] if pid != os.getpid() and _is_alive(pid)]
+                try:
+                    segment.close()
+                except BufferError:
+                    # Arrays handed out are still referenced, the mapping is freed once they are collected
+                    pass
+                if holders:
+                    entry[REFS_HOLDERS] = holders
+                    refs[segment_name] = entry
+                else:
+                    refs.pop(segment_name, None)
+                    self._unlink(segment_name)
+                write_atomic(self._refs_path, json.dumps(refs))
+
+    def release_all(self):
+        """
+        Releases all arrays attached in this process.
+        """
+        for path in list(self._attached.keys()):
+            self.release(path)
+
+    def _open_segment(self, segment_name: str, source: np.ndarray, entry: dict) -> shared_memory.SharedMemory:
+        """
+        Attaches to an existing, completely loaded segment, or creates and loads it. Segments left behind partially
+        loaded or without living holders are recreated.
+
+        :param segment_name: The name of the segment.
+        :param source: The memory-mapped source array.
+        :param entry: The reference entry of the segment, called with the file lock held.
+        :return: The attached segment.
+        """
+        entry[REFS_HOLDERS] = [pid for pid in entry[REFS_HOLDERS] if _is_alive(pid)]
+        if entry[REFS_READY] and entry[REFS_HOLDERS]:
+            try:
+                segment = shared_memory.SharedMemory(name=segment_name)
+                _untrack(segment)
+                return segment
+            except FileNotFoundError:
+                pass
+
+        self._unlink(segment_name)
+        segment = shared_memory.SharedMemory(name=segment_name, create=True, size=max(source.nbytes, 1))
+        _untrack(segment)
+        np.ndarray(source.shape, dtype=source.dtype, buffer=segment.buf)[...] = source
+        return segment
+
+    def _read_refs(self) -> dict:
+        """
+        Reads the reference file, called with the file lock held.
+
+        :return: A dictionary mapping segment names to their holders and load state.
+        """
+        try:
+            with open(self._refs_path) as refs_file:
+                return json.load(refs_file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _segment_name(self, path: str) -> str:
+        """
+        Derives the host wide segment name of an array file.
+
+        :param path: The path of the .npy file.
+        :return: The name of the segment, short enough for every platform.
+        """
+        digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:SEGMENT_DIGEST_LENGTH]
+        return SEGMENT_NAME_FORMAT.format(digest=digest)
+
+    @staticmethod
+    def _unlink(segment_name: str):
+        """
+        Unlinks a segment if it exists. Opening registers the segment with the resource tracker and unlinking
+        unregisters it again, so it is not untracked here.
+
+        :param segment_name: The name of the segment.
+        """
+        try:
+            segment = shared_memory.SharedMemory(name=segment_name)
+        except FileNotFoundError:
+            return
+        segment.close()
+        segment.unlink()
+
+
+_REGISTRIES: Dict[str, SharedArrayRegistry] = {}
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def get_registry(root: str) -> SharedArrayRegistry:
+    """
+    Returns the registry of an array directory, one per process.
+
+    :param root: The directory of the arrays.
+    :return: The SharedArrayRegistry of the directory.
+    """
+    root = os.path.abspath(root)
+    with _REGISTRIES_LOCK:
+        if root not in _REGISTRIES:
+            _REGISTRIES[root] = SharedArrayRegistry(root)
+        return _REGISTRIES[root]
+
+
+@atexit.register
+def _release_registries():
+    """
+    Releases the arrays of all registries when the process exits normally.
+    """
+    for registry in list(_REGISTRIES.values()):
+        registry.release_all()
@@ -0,0 +1,171 @@
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+    import ctypes
+    from ctypes import wintypes
+
+from processing_pipeline.RunDatasetKeys import DFKey
+from processing_pipeline.description_enums import AbstractionLevel, Column, DataOrigin, ProcessPhase, ProcessType
+
+STATM_PATH = "/proc/self/statm"
+BYTES_PER_MB = 1024 * 1024
+# ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+MAXRSS_BYTES = 1 if sys.platform == "darwin" else 1024
+PROFILE_METRIC_FORMAT = "profile_{station}_{column}"
+
+PROFILE_COLUMNS = (Column.WALL_TIME, Column.CPU_TIME, Column.RSS_DELTA, Column.PEAK_RSS, Column.TRACEMALLOC_DELTA,
+                   Column.TRACEMALLOC_PEAK, Column.CONCURRENT)
+PROCESS_PHASES = {ProcessType.TRAIN: ProcessPhase.TRAIN, ProcessType.VALIDATION: ProcessPhase.VALIDATION,
+                  ProcessType.TEST: ProcessPhase.TEST, ProcessType.PREDICT: ProcessPhase.PREDICTION}
+
+# Profiles running at the same time, e.g. of the stations of the StationPipeline, share the process wide CPU time and
+# memory measurements
+_PROFILE_LOCK = threading.Lock()
+_active_profiles = 0
+_started_profiles = 0
+
+
+if resource is None:
+    class _ProcessMemoryCounters(ctypes.Structure):
+        """
+        The PROCESS_MEMORY_COUNTERS structure of the Windows process status API.
+        """
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+
+def _windows_memory_counters():
+    """
+    Reads the working set sizes of the process on Windows, where neither resource nor /proc is available.
+
+    :return: The memory counters, or None if they can not be read.
+    """
+    counters = _ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    try:
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+    except (AttributeError, OSError):
+        return None
+    return counters
+
+
+def peak_rss_mb() -> float:
+    """
+    Returns the peak resident set size of the process, the peak working set size on Windows.
+
+    :return: The peak resident set size in MB, NaN if it can not be read.
+    """
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * MAXRSS_BYTES / BYTES_PER_MB
+    counters = _windows_memory_counters()
+    return math.nan if counters is None else counters.PeakWorkingSetSize / BYTES_PER_MB
+
+
+def current_rss_mb() -> float:
+    """
+    Returns the current resident set size of the process, the working set size on Windows. Falls back to the peak
+    resident set size where /proc is not available, the deltas then only show growth of the peak.
+
+    :return: The current resident set size in MB, NaN if it can not be read.
+    """
+    if resource is None:
+        counters = _windows_memory_counters()
+        return math.nan if counters is None else counters.WorkingSetSize / BYTES_PER_MB
+    try:
+        with open(STATM_PATH) as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / BYTES_PER_MB
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+@contextmanager
+def profile_station(station: str) -> Iterator[dict]:
+    """
+    Profiles the code run inside the context. The yielded record is filled when the context exits, also if it exits
+    with an exception. The CPU time and the memory columns are process wide, so the CPU time includes the torch
+    intra-op threads of the station, DataLoader worker processes are not included. If other profiles ran at the same
+    time, e.g. stations of the StationPipeline, the record is marked concurrent, its CPU time and deltas include the
+    work of the other stations and its tracemalloc peak is NaN. The tracemalloc columns are only measured if
+    tracemalloc is tracing, otherwise they are NaN, tracing slows down allocations and is left to the caller to start.
+
+    :param station: The name of the profiled station.
+    :return: A record mapping the station and profile Columns to their values.
+    """
+    global _active_profiles, _started_profiles
+
+    record = {Column.STATION: station}
+    tracing = tracemalloc.is_tracing()
+    with _PROFILE_LOCK:
+        concurrent = _active_profiles > 0
+        _active_profiles += 1
+        _started_profiles += 1
+        started = _started_profiles
+        if tracing:
+            traced_before = tracemalloc.get_traced_memory()[0]
+            # The peak is process wide, it is only reset if no other profile is measuring it
+            if not concurrent:
+                tracemalloc.reset_peak()
+    rss_before = current_rss_mb()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record[Column.WALL_TIME] = time.perf_counter() - wall_start
+        record[Column.CPU_TIME] = time.process_time() - cpu_start
+        record[Column.RSS_DELTA] = current_rss_mb() - rss_before
+        record[Column.PEAK_RSS] = peak_rss_mb()
+        with _PROFILE_LOCK:
+            _active_profiles -= 1
+            concurrent = concurrent or _started_profiles != started
+            if tracing:
+                traced_after, traced_peak = tracemalloc.get_traced_memory()
+        record[Column.CONCURRENT] = concurrent
+        if tracing:
+            record[Column.TRACEMALLOC_DELTA] = (traced_after - traced_before) / BYTES_PER_MB
+            record[Column.TRACEMALLOC_PEAK] = math.nan if concurrent else (traced_peak - traced_before) / BYTES_PER_MB
+        else:
+            record[Column.TRACEMALLOC_DELTA] = math.nan
+            record[Column.TRACEMALLOC_PEAK] = math.nan
+
+
+def get_profile_key(process_type: ProcessType) -> DFKey:
+    """
+    Returns the key of the profile table of a run.
+
+    :param process_type: The process type of the run.
+    :return: The DFKey of the profile table.
+    """
+    return DFKey(DataOrigin.PROFILER, AbstractionLevel.GENERAL, PROCESS_PHASES[process_type])
+
+
+def profile_metrics(profiles: Optional[List[dict]]) -> Dict[str, float]:
+    """
+    Flattens the profile records of a run into metrics, so profiles can be queried across runs in the run catalog.
+
+    :param profiles: The profile records of the run, None if the run was not profiled.
+    :return: A dictionary mapping metric names, e.g. "profile_TrainingStation_wall_time_s", to their values.
+    """
+    metrics = {}
+    for record in profiles or []:
+        for column in PROFILE_COLUMNS:
+            value = record.get(column)
+            if value is None or math.isnan(value):
+                continue
+            metrics[PROFILE_METRIC_FORMAT.format(station=record[Column.STATION], column=column.value)] = float(value)
+    return metrics
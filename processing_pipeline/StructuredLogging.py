@@ -0,0 +1,152 @@
+import json
+import logging
+import sys
+import threading
+import time
+from typing import Optional, TextIO
+
+ROOT_LOGGER_NAME = "ml_pipeline"
+LOGGER_NAME_FORMAT = "{root}.{name}"
+FIELDS_ATTRIBUTE = "fields"
+SUPPRESSED_FIELD = "suppressed"
+
+DEF_LOG_LEVEL = logging.INFO
+DEF_RATE_LIMIT_INTERVAL = 1.0
+
+# The library stays silent until an application configures logging
+logging.getLogger(ROOT_LOGGER_NAME).addHandler(logging.NullHandler())
+
+# The handler installed by configure_logging, it is replaced by the next call
+_configured_handler: Optional[logging.Handler] = None
+_configure_lock = threading.Lock()
+
+
+def json_default(value):
+    """
+    Converts values that are not JSON serializable, 0-d tensors and numpy scalars become Python numbers.
+
+    :param value: The value to convert.
+    :return: A JSON serializable representation of the value.
+    """
+    if hasattr(value, "item"):
+        try:
+            return value.item()
+        except (ValueError, RuntimeError):
+            pass
+    if hasattr(value, "value"):
+        return value.value
+    return str(value)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats log records as one JSON object per line, including the structured fields of the record.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Formats the given record as JSON.
+
+        :param record: The log record.
+        :return: The JSON line.
+        """
+        entry = {"time": record.created, "level": record.levelname, "logger": record.name,
+                 "event": record.getMessage(), "site": f"{record.module}:{record.lineno}"}
+        entry.update(getattr(record, FIELDS_ATTRIBUTE, {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=json_default)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most one record per call site pass within the given interval. The number of suppressed records is added
+    to the next record of the call site that passes.
+    """
+
+    def __init__(self, interval: float = DEF_RATE_LIMIT_INTERVAL):
+        """
+        Initializes the RateLimitFilter.
+
+        :param interval: The minimum number of seconds between two records of the same call site.
+        """
+        super().__init__()
+        self._interval = interval
+        self._last_emits: dict[tuple[str, int], float] = {}
+        self._suppressed: dict[tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Decides if the record passes.
+
+        :param record: The log record.
+        :return: True if the record is emitted, False if it is suppressed.
+        """
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            last_emit = self._last_emits.get(site)
+            if last_emit is not None and now - last_emit < self._interval:
+                self._suppressed[site] = self._suppressed.get(site, 0) + 1
+                return False
+            self._last_emits[site] = now
+            suppressed = self._suppressed.pop(site, 0)
+
+        if suppressed:
+            fields = dict(getattr(record, FIELDS_ATTRIBUTE, {}))
+            fields[SUPPRESSED_FIELD] = suppressed
+            setattr(record, FIELDS_ATTRIBUTE, fields)
+        return True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Returns the logger of a pipeline component.
+
+    :param name: The name of the component.
+    :return: The logger below the pipeline root logger.
+    """
+    return logging.getLogger(LOGGER_NAME_FORMAT.format(root=ROOT_LOGGER_NAME, name=name))
+
+
+def configure_logging(level: int = DEF_LOG_LEVEL, stream: Optional[TextIO] = None,
+                      rate_limit_interval: float = DEF_RATE_LIMIT_INTERVAL) -> logging.Handler:
+    """
+    Configures the pipeline loggers to write rate limited JSON lines. Calling it again replaces the handler installed
+    by the previous call, so records are not written twice.
+
+    :param level: The minimum level of emitted records.
+    :param stream: The stream to write to, stderr by default.
+    :param rate_limit_interval: The minimum number of seconds between two records of the same call site, 0 disables
+    rate limiting.
+    :return: The installed handler.
+    """
+    handler = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    handler.setFormatter(JsonFormatter())
+    if rate_limit_interval > 0:
+        handler.addFilter(RateLimitFilter(rate_limit_interval))
+
+    global _configured_handler
+    root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+    with _configure_lock:
+        if _configured_handler is not None:
+            root_logger.removeHandler(_configured_handler)
+        root_logger.setLevel(level)
+        root_logger.addHandler(handler)
+        _configured_handler = handler
+    return handler
+
+
+def log_event(logger: logging.Logger, level: int, event: str, **fields):
+    """
+    Logs a structured event. Call sites on hot paths check logger.isEnabledFor first, so the fields are not even
+    built while the level is disabled.
+
+    :param logger: The logger to log to.
+    :param level: The level of the event.
+    :param event: The name of the event.
+    :param fields: The structured fields of the event.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={FIELDS_ATTRIBUTE: fields}, stacklevel=2)
@@ -0,0 +1,158 @@
+import json
+import os
+import struct
+from typing import Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+
+from processing_pipeline.description_enums import Column
+
+BUNDLE_MAGIC = b"MLPTAB01"
+INDEX_LENGTH_FORMAT = "<Q"
+INDEX_ENCODING = "utf-8"
+TEMPORARY_SUFFIX = ".tmp"
+
+DEF_COMPRESSION = "zstd"
+
+INDEX_TABLES = "tables"
+INDEX_OFFSET = "offset"
+INDEX_LENGTH = "length"
+INDEX_COLUMNS = "columns"
+INDEX_ENUM_COLUMNS = "enum_columns"
+
+PYARROW_MISSING_MSG = "The Arrow table bundle format requires pyarrow, install it with 'pip install pyarrow'."
+NOT_A_BUNDLE_MSG = "{path} is not a table bundle."
+TABLE_NOT_FOUND_MSG = "Table {name} not found in bundle {path}."
+COLUMNS_NOT_FOUND_MSG = "Table {name} of bundle {path} has none of the columns {columns}."
+
+# A bundle is the concatenation of one Arrow IPC file per table, followed by a JSON index of the tables, the length of
+# the index and the magic bytes:
+# MAGIC | IPC table 1 | ... | IPC table n | JSON index | index length | MAGIC
+
+
+def _import_pyarrow():
+    """
+    Imports pyarrow, which is only required for the table bundle format.
+
+    :return: The pyarrow module.
+    :raises ImportError: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError as error:
+        raise ImportError(PYARROW_MISSING_MSG) from error
+    return pyarrow
+
+
+def write_table_bundle(path: str, tables: Dict[str, pd.DataFrame], compression: Optional[str] = DEF_COMPRESSION):
+    """
+    Writes several DataFrames into one bundle file. Column enums are stored by value and restored when loading.
+
+    :param path: The path of the bundle file.
+    :param tables: A dictionary mapping table names to DataFrames.
+    :param compression: The Arrow IPC buffer compression, "zstd", "lz4" or None.
+    """
+    pa = _import_pyarrow()
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    index = {}
+
+    temporary_path = path + TEMPORARY_SUFFIX
+    with open(temporary_path, "wb") as bundle_file:
+        bundle_file.write(BUNDLE_MAGIC)
+        for name, df in tables.items():
+            enum_columns = [column.value for column in df.columns if isinstance(column, Column)]
+            named_df = df.rename(columns=lambda column: column.value if isinstance(column, Column) else str(column))
+            table = pa.Table.from_pandas(named_df, preserve_index=False)
+
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+            buffer = sink.getvalue()
+
+            index[name] = {INDEX_OFFSET: bundle_file.tell(), INDEX_LENGTH: buffer.size,
+                           INDEX_COLUMNS: table.column_names, INDEX_ENUM_COLUMNS: enum_columns}
+            bundle_file.write(buffer)
+
+        index_bytes = json.dumps({INDEX_TABLES: index}).encode(INDEX_ENCODING)
+        bundle_file.write(index_bytes)
+        bundle_file.write(struct.pack(INDEX_LENGTH_FORMAT, len(index_bytes)))
+        bundle_file.write(BUNDLE_MAGIC)
+    os.replace(temporary_path, path)
+
+
+def read_bundle_index(path: str) -> dict:
+    """
+    Reads the index of a bundle file without reading any table.
+
+    :param path: The path of the bundle file.
+    :return: A dictionary mapping table names to their offset, length and columns.
+    :raises ValueError: If the file is not a table bundle.
+    """
+    trailer_size = struct.calcsize(INDEX_LENGTH_FORMAT) + len(BUNDLE_MAGIC)
+    with open(path, "rb") as bundle_file:
+        if bundle_file.read(len(BUNDLE_MAGIC)) != BUNDLE_MAGIC:
+            raise ValueError(NOT_A_BUNDLE_MSG.format(path=path))
+        bundle_file.seek(-trailer_size, os.SEEK_END)
+        trailer = bundle_file.read(trailer_size)
+        if trailer[-len(BUNDLE_MAGIC):] != BUNDLE_MAGIC:
+            raise ValueError(NOT_A_BUNDLE_MSG.format(path=path))
+        (index_length,) = struct.unpack(INDEX_LENGTH_FORMAT, trailer[:-len(BUNDLE_MAGIC)])
+        bundle_file.seek(-trailer_size - index_length, os.SEEK_END)
+        return json.loads(bundle_file.read(index_length).decode(INDEX_ENCODING))[INDEX_TABLES]
+
+
+def list_bundle_tables(path: str) -> List[str]:
+    """
+    Lists the names of the tables in a bundle file.
+
+    :param path: The path of the bundle file.
+    :return: A list of table names.
+    """
+    return list(read_bundle_index(path).keys())
+
+
+def load_table_bundle(path: str, names: Optional[Iterable[str]] = None,
+                      columns: Optional[Iterable[Union[str, Column]]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Loads tables from a bundle file. The file is memory mapped and only the requested tables and columns are read,
+    the buffers of other columns are neither read nor decompressed.
+
+    :param path: The path of the bundle file.
+    :param names: The names of the tables to load, None loads all tables.
+    :param columns: The column names or Column enums to load, tables without one of the columns skip it, None loads
+    all columns.
+    :return: A dictionary mapping table names to DataFrames with Column enums restored as column labels.
+    :raises KeyError: If a requested table is not in the bundle, or has none of the requested columns.
+    """
+    pa = _import_pyarrow()
+    index = read_bundle_index(path)
+    if names is None:
+        names = list(index.keys())
+    if columns is not None:
+        # The columns are matched against every table, an iterator would be consumed by the first one
+        columns = [column.value if isinstance(column, Column) else column for column in columns]
+
+    tables = {}
+    with pa.memory_map(path) as source:
+        for name in names:
+            if name not in index:
+                raise KeyError(TABLE_NOT_FOUND_MSG.format(name=name, path=path))
+            entry = index[name]
+            options = None
+            if columns is not None:
+                selected = [column for column in columns if column in entry[INDEX_COLUMNS]]
+                if not selected:
+                    raise KeyError(COLUMNS_NOT_FOUND_MSG.format(name=name, path=path, columns=columns))
+                options = pa.ipc.IpcReadOptions(included_fields=[entry[INDEX_COLUMNS].index(column)
+                                                                 for column in selected])
+            reader = pa.ipc.open_file(source.read_at(entry[INDEX_LENGTH], entry[INDEX_OFFSET]), options=options)
+            table = reader.read_all()
+            if columns is not None:
+                # The read fields keep the order of the stored table, they are returned in the requested order
+                table = table.select(selected)
+
+            enum_columns = set(entry[INDEX_ENUM_COLUMNS])
+            df = table.to_pandas()
+            tables[name] = df.rename(columns=lambda column: Column(column) if column in enum_columns else column)
+    return tables
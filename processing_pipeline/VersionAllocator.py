@@ -0,0 +1,74 @@
+import os
+from typing import Callable, Dict, Optional
+
+from processing_pipeline.FileLock import FileLock, write_atomic
+
+COUNTER_FILE_FORMAT = ".{name}{type}.version"
+LOCK_FILE_FORMAT = ".{name}{type}.version.lock"
+
+
+class VersionAllocator:
+    """
+    Allocates version numbers of entries in one directory. A counter file per (name, format) stores the next version,
+    it is read and advanced under an exclusive file lock, so allocations take constant time and are safe across
+    threads and processes on one host.
+    """
+
+    def __init__(self, root: str, version_format: str):
+        """
+        Initializes the VersionAllocator.
+
+        :param root: The directory the versioned entries are created in.
+        :param version_format: The format of an entry name with the placeholders name, i and type.
+        """
+        self._root = root
+        self._version_format = version_format
+
+    def allocate(self, name: str, file_format: str, create_dir: bool,
+                 list_versions: Callable[[], Dict[int, str]]) -> str:
+        """
+        Allocates the next version of an entry.
+
+        :param name: The base name of the entry.
+        :param file_format: The format of the entry.
+        :param create_dir: True creates the entry as directory atomically, False only reserves the path.
+        :param list_versions: A callable listing the existing versions, only used once to initialize the counter.
+        :return: The path of the allocated entry.
+        """
+        counter_path = os.path.join(self._root, COUNTER_FILE_FORMAT.format(name=name, type=file_format))
+        lock_path = os.path.join(self._root, LOCK_FILE_FORMAT.format(name=name, type=file_format))
+
+        with FileLock(lock_path):
+            version = self._read_counter(counter_path)
+            if version is None:
+                versions = list_versions()
+                version = max(versions.keys()) + 1 if versions else 0
+
+            while True:
+                path = os.path.join(self._root, self._version_format.format(name=name, i=version, type=file_format))
+                if create_dir:
+                    try:
+                        os.mkdir(path)
+                        break
+                    except FileExistsError:
+                        pass
+                elif not os.path.exists(path):
+                    break
+                version += 1
+
+            write_atomic(counter_path, str(version + 1))
+        return path
+
+    @staticmethod
+    def _read_counter(counter_path: str) -> Optional[int]:
+        """
+        Reads the next version from the counter file.
+
+        :param counter_path: The path of the counter file.
+        :return: The next version, or None if there is no valid counter yet.
+        """
+        try:
+            with open(counter_path) as counter_file:
+                return int(counter_file.read().strip())
+        except (FileNotFoundError, ValueError):
+            return None
@@ -34,7 +34,7 @@ class AdapterDataKey:
         if not isinstance(other, AdapterDataKey):
             return False
         return (self._phase, self._abstraction_level) == \
-            (self._phase, self._abstraction_level)
+            (other.phase, other.abstraction_level)
 
     @property
     def abstraction_level(self) -> AbstractionLevel:
@@ -0,0 +1,178 @@
+from collections import defaultdict
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from processing_pipeline.core_elements.AdapterDataKeys import AdapterDataKey
+from processing_pipeline.description_enums import AbstractionLevel, Column, ProcessPhase
+
+DEF_INITIAL_CAPACITY = 1024
+GROWTH_FACTOR = 2
+
+INTEGER_COLUMNS = frozenset({Column.GLOBAL_STEP, Column.BATCH_IDX, Column.EPOCH})
+INTEGER_FILL = -1
+FLOAT_FILL = np.nan
+
+KEY_SEPARATOR = "/"
+
+
+def to_scalar(value: Any):
+    """
+    Converts 0-d tensors and numpy scalars to plain Python numbers.
+
+    :param value: The value to convert.
+    :return: The value as a Python number.
+    """
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+def buffers_state_dict(buffers: dict[AdapterDataKey, "ColumnarBuffer"]) -> dict[str, dict[str, list]]:
+    """
+    Converts the buffers of a logger into a state that only contains strings and lists, so it can be stored in a
+    checkpoint.
+
+    :param buffers: A dictionary mapping AdapterDataKey to ColumnarBuffer.
+    :return: A dictionary mapping the joined abstraction level and phase to the state of the buffer.
+    """
+    return {f"{key.abstraction_level.value}{KEY_SEPARATOR}{key.phase.value}": buffer.state_dict()
+            for key, buffer in buffers.items()}
+
+
+def load_buffers_state_dict(state: dict[str, dict[str, list]]) -> defaultdict[AdapterDataKey, "ColumnarBuffer"]:
+    """
+    Rebuilds the buffers of a logger from a state created by buffers_state_dict.
+
+    :param state: The state of the buffers.
+    :return: A defaultdict mapping AdapterDataKey to ColumnarBuffer.
+    """
+    buffers: defaultdict[AdapterDataKey, ColumnarBuffer] = defaultdict(ColumnarBuffer)
+    for name, buffer_state in state.items():
+        abstraction, phase = name.split(KEY_SEPARATOR)
+        buffers[AdapterDataKey(AbstractionLevel(abstraction), ProcessPhase(phase))].load_state_dict(buffer_state)
+    return buffers
+
+
+class ColumnarBuffer:
+    """
+    ColumnarBuffer stores rows of scalar values in one preallocated, typed array per Column. The arrays grow
+    geometrically, rows that do not contain a column keep the fill value of the column.
+    """
+
+    def __init__(self, initial_capacity: int = DEF_INITIAL_CAPACITY):
+        """
+        Initializes an empty ColumnarBuffer.
+
+        :param initial_capacity: The number of rows the arrays can hold before they grow the first time.
+        """
+        self._capacity = initial_capacity
+        self._length = 0
+        self._columns: dict[Column, np.ndarray] = {}
+
+    def __len__(self):
+        """
+        Returns the number of rows in the buffer.
+
+        :return: The number of rows.
+        """
+        return self._length
+
+    def append(self, row: dict[Column, Any]):
+        """
+        Appends a row to the buffer. Tensor values are converted to Python numbers, None values are skipped.
+
+        :param row: A dictionary mapping Column to a scalar value.
+        """
+        if self._length == self._capacity:
+            self._grow()
+
+        for column, value in row.items():
+            if value is None:
+                continue
+            array = self._columns.get(column)
+            if array is None:
+                array = self._add_column(column)
+            array[self._length] = to_scalar(value)
+        self._length += 1
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Creates a DataFrame from the filled part of the buffer. The columns are views on the buffer arrays.
+
+        :return: A DataFrame with one column per Column.
+        """
+        return pd.DataFrame({column: array[:self._length] for column, array in self._columns.items()}, copy=False)
+
+    def last_value(self, column: Column):
+        """
+        Returns the value of the column in the last row that contains it.
+
+        :param column: The column.
+        :return: The last value, or None if no row contains the column.
+        """
+        array = self._columns.get(column)
+        if array is None:
+            return None
+        filled = array[:self._length]
+        if column in INTEGER_COLUMNS:
+            present = np.flatnonzero(filled != INTEGER_FILL)
+        else:
+            present = np.flatnonzero(~np.isnan(filled))
+        if len(present) == 0:
+            return None
+        return filled[present[-1]].item()
+
+    def state_dict(self) -> dict[str, list]:
+        """
+        Returns the filled part of the buffer as plain lists.
+
+        :return: A dictionary mapping column values to the list of their values.
+        """
+        return {column.value: array[:self._length].tolist() for column, array in self._columns.items()}
+
+    def load_state_dict(self, state: dict[str, list]):
+        """
+        Replaces the content of the buffer with a state created by state_dict.
+
+        :param state: A dictionary mapping column values to the list of their values.
+        """
+        self._length = max((len(values) for values in state.values()), default=0)
+        self._capacity = max(self._capacity, self._length)
+        self._columns = {}
+        for name, values in state.items():
+            array = self._add_column(Column(name))
+            array[:len(values)] = values
+
+    def clear(self):
+        """
+        Removes all rows and columns from the buffer.
+        """
+        self._columns = {}
+        self._length = 0
+
+    def _add_column(self, column: Column) -> np.ndarray:
+        """
+        Adds a new column that is filled with the fill value for all existing rows.
+
+        :param column: The column to add.
+        :return: The array of the new column.
+        """
+        if column in INTEGER_COLUMNS:
+            array = np.full(self._capacity, INTEGER_FILL, dtype=np.int64)
+        else:
+            array = np.full(self._capacity, FLOAT_FILL, dtype=np.float64)
+        self._columns[column] = array
+        return array
+
+    def _grow(self):
+        """
+        Grows the capacity of all arrays by the growth factor.
+        """
+        self._capacity *= GROWTH_FACTOR
+        for column, array in self._columns.items():
+            fill = INTEGER_FILL if column in INTEGER_COLUMNS else FLOAT_FILL
+            grown = np.full(self._capacity, fill, dtype=array.dtype)
+            grown[:self._length] = array[:self._length]
+            self._columns[column] = grown
@@ -0,0 +1,129 @@
+import os
+import tempfile
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from processing_pipeline.description_enums import Column
+from processing_pipeline.core_elements.ColumnarBuffer import GROWTH_FACTOR
+
+DEF_INSTANCE_CAPACITY = 1024
+DEF_INSTANCE_DTYPE = np.float32
+INSTANCE_DTYPES = (np.float32, np.float16)
+ID_DTYPE = np.int64
+ID_FILL = -1
+
+MEMMAP_PREFIX = "instances_"
+MEMMAP_MODE = "w+"
+
+UNSUPPORTED_DTYPE_MSG = "Unsupported instance dtype {dtype}, supported dtypes are float32 and float16."
+
+
+def create_memmap(directory: Optional[str], dtype, capacity: int) -> np.memmap:
+    """
+    Creates an anonymous memory-mapped array backed by a temporary file. The file is unlinked right after mapping
+    where the platform allows it, so the disk space is released together with the last reference to the array.
+
+    :param directory: The directory of the backing file, None uses the system temporary directory.
+    :param dtype: The dtype of the array.
+    :param capacity: The number of elements of the array.
+    :return: The memory-mapped array.
+    """
+    file_descriptor, path = tempfile.mkstemp(prefix=MEMMAP_PREFIX, dir=directory)
+    os.close(file_descriptor)
+    array = np.memmap(path, dtype=dtype, mode=MEMMAP_MODE, shape=(max(capacity, 1),))
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+    return array
+
+
+class InstanceBuffer:
+    """
+    InstanceBuffer stores the instance id, target and prediction of every instance of one phase in preallocated,
+    memory-mapped arrays, so millions of instances are captured without Python objects per sample. The arrays grow
+    geometrically if the preallocated capacity is exceeded.
+    """
+
+    def __init__(self, capacity: int = DEF_INSTANCE_CAPACITY, dtype=DEF_INSTANCE_DTYPE,
+                 directory: Optional[str] = None):
+        """
+        Initializes an empty InstanceBuffer.
+
+        :param capacity: The number of instances to preallocate, usually the length of the phase's dataset.
+        :param dtype: The dtype of targets and predictions, float32 or float16.
+        :param directory: The directory of the backing files, None uses the system temporary directory.
+        :raises ValueError: If the dtype is not supported.
+        """
+        if np.dtype(dtype) not in [np.dtype(supported) for supported in INSTANCE_DTYPES]:
+            raise ValueError(UNSUPPORTED_DTYPE_MSG.format(dtype=dtype))
+        self._dtype = dtype
+        self._directory = directory
+        self._capacity = max(capacity, 1)
+        self._length = 0
+        self._ids = create_memmap(directory, ID_DTYPE, self._capacity)
+        self._targets = create_memmap(directory, dtype, self._capacity)
+        self._predictions = create_memmap(directory, dtype, self._capacity)
+
+    def __len__(self):
+        """
+        Returns the number of captured instances.
+
+        :return: The number of instances.
+        """
+        return self._length
+
+    def append(self, ids: Optional[np.ndarray], targets: np.ndarray, predictions: np.ndarray):
+        """
+        Appends the instances of one batch.
+
+        :param ids: The dataset indices of the instances, None stores ID_FILL.
+        :param targets: The flat target values.
+        :param predictions: The flat predicted values.
+        """
+        count = len(targets)
+        while self._length + count > self._capacity:
+            self._grow()
+
+        end = self._length + count
+        if ids is None:
+            self._ids[self._length:end] = ID_FILL
+        else:
+            self._ids[self._length:end] = ids
+        self._targets[self._length:end] = targets
+        self._predictions[self._length:end] = predictions
+        self._length = end
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Creates a DataFrame of the captured instances. The columns are views on the memory-mapped arrays, the buffer
+        must not be appended to while the DataFrame is in use.
+
+        :return: A DataFrame with the columns INSTANCE_ID, TARGET and PREDICTED.
+        """
+        return pd.DataFrame({Column.INSTANCE_ID: self._ids[:self._length],
+                             Column.TARGET: self._targets[:self._length],
+                             Column.PREDICTED: self._predictions[:self._length]}, copy=False)
+
+    def _grow(self):
+        """
+        Grows the capacity of all arrays by the growth factor.
+        """
+        self._capacity *= GROWTH_FACTOR
+        self._ids = self._grown(self._ids, ID_DTYPE)
+        self._targets = self._grown(self._targets, self._dtype)
+        self._predictions = self._grown(self._predictions, self._dtype)
+
+    def _grown(self, array: np.memmap, dtype) -> np.memmap:
+        """
+        Copies the filled part of an array into a new array with the current capacity.
+
+        :param array: The array to grow.
+        :param dtype: The dtype of the array.
+        :return: The grown array.
+        """
+        grown = create_memmap(self._directory, dtype, self._capacity)
+        grown[:self._length] = array[:self._length]
+        return grown
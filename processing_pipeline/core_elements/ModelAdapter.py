@@ -1,13 +1,22 @@
-from typing import Dict
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, TYPE_CHECKING
 
 import pandas as pd
-from pytorch_lightning import LightningModule
 
+from processing_pipeline.ContentHash import HASH_ALGORITHM, canonical_hash
 from processing_pipeline.ICoreElementDoc import IElementDoc
 from processing_pipeline.core_elements.AdapterDataKeys import AdapterDataKey
-from processing_pipeline.core_elements.ModelLogging import ModelLoggingConnector
 from processing_pipeline.description_enums import Column
 
+if TYPE_CHECKING:
+    from pytorch_lightning import LightningModule
+
+    from processing_pipeline.core_elements.ModelLogging import ModelLoggingConnector
+
+CHECKPOINT_STATE_KEY = "state_dict"
+
 
 class ModelAdapter(IElementDoc):
     """
@@ -53,6 +62,60 @@ class ModelAdapter(IElementDoc):
         """
         self._last_logs: dict[AdapterDataKey, pd.DataFrame] = self._model_logging_connector.get_last_logs_and_reset()
 
+    def record_training(self, run_key: str):
+        """
+        Records that the model was trained by a run. Runs with the trained model are different runs than runs with
+        the initial model, so the configuration hash continues from the key of the train run.
+
+        :param run_key: The run key of the train run.
+        """
+        if self.config_hash is not None:
+            self.config_hash = canonical_hash([self.config_hash, run_key])
+
+    def load_weights(self, checkpoint_path: str):
+        """
+        Loads the weights of a Lightning checkpoint into the model.
+
+        :param checkpoint_path: The path of the checkpoint.
+        """
+        import torch
+
+        checkpoint = torch.load(checkpoint_path, map_location="cpu", weights_only=False)
+        self.set_weights(checkpoint[CHECKPOINT_STATE_KEY])
+
+    def get_weights(self) -> dict:
+        """
+        Returns the weights of the model on the CPU, so they can be sent to another process.
+
+        :return: The state dict of the model.
+        """
+        return {key: value.detach().cpu() for key, value in self._model.state_dict().items()}
+
+    def weights_hash(self) -> str:
+        """
+        Hashes the current weights of the model, it changes whenever the model is trained or loaded with other
+        weights, also if the configuration hash stays the same.
+
+        :return: The hex digest of the names, shapes and values of the weights.
+        """
+        import torch
+
+        digest = hashlib.new(HASH_ALGORITHM)
+        for key, value in self.get_weights().items():
+            digest.update(key.encode())
+            digest.update(str(tuple(value.shape)).encode())
+            # The bytes of the values, viewed as uint8 so every dtype, e.g. bfloat16, can be converted to numpy
+            digest.update(value.contiguous().reshape(-1).view(torch.uint8).numpy().tobytes())
+        return digest.hexdigest()
+
+    def set_weights(self, state_dict: dict):
+        """
+        Loads weights into the model.
+
+        :param state_dict: The state dict of the model.
+        """
+        self._model.load_state_dict(state_dict)
+
     @property
     def last_logs(self) -> Dict[AdapterDataKey, pd.DataFrame]:
         """
@@ -1,30 +1,52 @@
+from __future__ import annotations
+
+import logging
 from collections import defaultdict
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
 import pandas as pd
-import pytorch_lightning as pl
-from torchmetrics import Metric
 
 from processing_pipeline.core_elements.AdapterDataKeys import AdapterDataKey
+from processing_pipeline.core_elements.ColumnarBuffer import ColumnarBuffer, buffers_state_dict, \
+    load_buffers_state_dict
+from processing_pipeline.core_elements.InstanceBuffer import InstanceBuffer, DEF_INSTANCE_CAPACITY, \
+    DEF_INSTANCE_DTYPE
+from processing_pipeline.StructuredLogging import get_logger, log_event
 from processing_pipeline.description_enums import Column, ProcessPhase, AbstractionLevel
 
+if TYPE_CHECKING:
+    import pytorch_lightning as pl
+    from torchmetrics import Metric
+
 LOG_FORMAT = "custom_{phase}_{abstraction}_"
 
+STATE_LOGS = "logs"
+STATE_LAST_EPOCHS = "last_epochs"
+
+LOGGER = get_logger("model_logging")
+
 
 class ModelLoggingConnector:
     """
     ModelLoggingConnector is responsible for managing the logging of model metrics during training and evaluation.
     """
 
-    def __init__(self, metrics: dict[Column, type[Metric]]):
+    def __init__(self, metrics: dict[Column, type[Metric]], instance_dtype=DEF_INSTANCE_DTYPE,
+                 instance_dir: Optional[str] = None):
         """
         Initializes the ModelLoggingConnector with the given metrics.
 
         :param metrics: A dictionary mapping Column to Metric types.
+        :param instance_dtype: The dtype instance targets and predictions are captured in, float32 or float16.
+        :param instance_dir: The directory of the memory-mapped instance files, None uses the system temporary
+        directory.
         """
         self._metrics: dict[Column, Metric] = {key: metric() for key, metric in metrics.items()}
         self._pl_module: Optional[pl.LightningModule] = None
-        self._logs: defaultdict[AdapterDataKey, list] = defaultdict(list)
+        self._logs: defaultdict[AdapterDataKey, ColumnarBuffer] = defaultdict(ColumnarBuffer)
+        self._instances: dict[ProcessPhase, InstanceBuffer] = {}
+        self._instance_dtype = instance_dtype
+        self._instance_dir = instance_dir
         self._last_epochs: dict[ProcessPhase, int] = defaultdict(lambda: -1)
 
     def set_pl_module(self, pl_module: pl.LightningModule):
@@ -35,7 +57,7 @@ class ModelLoggingConnector:
         """
         self._pl_module = pl_module
 
-    def batch_start(self, target, output, phase: ProcessPhase, batch_idx=None):
+    def batch_start(self, target, output, phase: ProcessPhase, batch_idx=None, instance_ids=None):
         """
         Logs metrics at the start of a batch.
 
@@ -43,10 +65,11 @@ class ModelLoggingConnector:
         :param output: The output values.
         :param phase: The current process phase.
         :param batch_idx: The index of the batch.
+        :param instance_ids: The dataset indices of the instances in the batch.
         """
         self.calculate_batch(target, output, phase, batch_idx)
         self.calculate_epoch(target, output, phase, batch_idx)
-        self.calculate_instance(target, output, phase, batch_idx)
+        self.calculate_instance(target, output, phase, batch_idx, instance_ids)
 
     def check_epoch(self, phase):
         """
@@ -60,11 +83,11 @@ class ModelLoggingConnector:
 
     def epoch_start(self, phase: ProcessPhase):
         """
-        Placeholder method for actions to perform at the start of an epoch.
+        Starts a new instance capture for the phase, only the instances of the last epoch are kept.
 
         :param phase: The current process phase.
         """
-        pass
+        self._instances.pop(phase, None)
 
     def calculate_batch(self, target, output, phase, batch_idx):
         """
@@ -106,16 +129,56 @@ class ModelLoggingConnector:
         """
         pass
 
-    def calculate_instance(self, target, output, phase, batch_idx):
+    def calculate_instance(self, target, output, phase, batch_idx, instance_ids=None):
         """
-        Placeholder method for calculating instance metrics.
+        Captures the target and prediction of every instance of the batch. Sanity check batches are skipped.
 
         :param target: The target values.
         :param output: The output values.
         :param phase: The current process phase.
         :param batch_idx: The index of the batch.
+        :param instance_ids: The dataset indices of the instances, they are only stored if there is one target value
+        per instance.
         """
-        pass
+        trainer = self._pl_module.trainer
+        if trainer is not None and trainer.sanity_checking:
+            return
+
+        target1 = next(iter(target.values()), None)
+        output1 = next(iter(output.values()), None)
+        if target1 is None or output1 is None:
+            return
+
+        targets = target1.detach().reshape(-1).cpu().numpy()
+        predictions = output1.detach().reshape(-1).cpu().numpy()
+        ids = None
+        if instance_ids is not None and instance_ids.numel() == len(targets):
+            ids = instance_ids.detach().reshape(-1).cpu().numpy()
+
+        buffer = self._instances.get(phase)
+        if buffer is None:
+            buffer = InstanceBuffer(self._get_dataset_size(phase), self._instance_dtype, self._instance_dir)
+            self._instances[phase] = buffer
+        buffer.append(ids, targets, predictions)
+
+    def _get_dataset_size(self, phase: ProcessPhase) -> int:
+        """
+        Determines the number of instances of the phase from the length of its dataloader's dataset.
+
+        :param phase: The current process phase.
+        :return: The number of instances, DEF_INSTANCE_CAPACITY if the dataset has no length.
+        """
+        trainer = self._pl_module.trainer
+        dataloaders = {ProcessPhase.TRAIN: lambda: trainer.train_dataloader,
+                       ProcessPhase.VALIDATION: lambda: trainer.val_dataloaders,
+                       ProcessPhase.TEST: lambda: trainer.test_dataloaders}
+        try:
+            dataloader = dataloaders[phase]()
+            if isinstance(dataloader, (list, tuple)):
+                dataloader = dataloader[0]
+            return len(dataloader.dataset)
+        except (KeyError, AttributeError, TypeError, IndexError):
+            return DEF_INSTANCE_CAPACITY
 
     def apply_metrics(self, target, output):
         """
@@ -158,9 +221,10 @@ class ModelLoggingConnector:
         epoch_dict = {epoch_prefix + key.value: value for key, value in enum_dict.items()}
         batch_dict = {batch_prefix + key.value: value for key, value in enum_dict.items()}
 
-        print(f"\n\nstep: {self._pl_module.global_step}, epoch: {self._pl_module.current_epoch}")
-        print(f"epoch_dict, model: {epoch_dict}")
-        print(f"batch_dict, model {batch_dict}")
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            log_event(LOGGER, logging.DEBUG, "model_batch_metrics", phase=phase.value,
+                      step=self._pl_module.global_step, epoch=self._pl_module.current_epoch,
+                      metrics={key.value: value for key, value in enum_dict.items()})
 
         for key, value in epoch_dict.items():
             self._pl_module.log(name=key, value=value, on_epoch=True, on_step=False, prog_bar=False)
@@ -182,14 +246,39 @@ class ModelLoggingConnector:
 
     def get_last_logs_and_reset(self) -> dict[AdapterDataKey, pd.DataFrame]:
         """
-        Retrieves the last logs and resets the internal log storage.
+        Retrieves the last logs and resets the internal log storage. Instance logs are views on memory-mapped
+        arrays, the arrays are handed over to the DataFrames and the next capture allocates new ones.
 
         :return: A dictionary mapping AdapterDataKey to DataFrame containing the last logs.
         """
-        df_log_dict = {key: pd.DataFrame(list_of_metrics_dicts) for key, list_of_metrics_dicts in self._logs.items()}
+        df_log_dict = {key: buffer.to_dataframe() for key, buffer in self._logs.items()}
+        df_log_dict.update({AdapterDataKey(AbstractionLevel.INSTANCE, phase): buffer.to_dataframe()
+                            for phase, buffer in self._instances.items() if len(buffer) > 0})
         self._logs.clear()
+        self._instances.clear()
         return df_log_dict
 
+    def state_dict(self) -> dict:
+        """
+        Returns the logs recorded so far, so a resumed training continues them. The instance captures only hold the
+        current epoch and are captured again after resuming.
+
+        :return: The state of the connector.
+        """
+        return {STATE_LOGS: buffers_state_dict(self._logs),
+                STATE_LAST_EPOCHS: {phase.value: epoch for phase, epoch in self._last_epochs.items()}}
+
+    def load_state_dict(self, state: dict):
+        """
+        Replaces the recorded logs with a state created by state_dict.
+
+        :param state: The state of the connector.
+        """
+        self._logs = load_buffers_state_dict(state[STATE_LOGS])
+        self._last_epochs.clear()
+        self._last_epochs.update({ProcessPhase(phase): epoch for phase, epoch in state[STATE_LAST_EPOCHS].items()})
+        self._instances.clear()
+
     def additional_logging(self):
         """
         Placeholder method for additional logging actions.
@@ -1,4 +1,9 @@
-from pytorch_lightning import LightningDataModule
+from __future__ import annotations
+
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pytorch_lightning import LightningDataModule
 
 from processing_pipeline.ICoreElementDoc import IElementDoc
 
@@ -20,6 +25,7 @@ class ModuleAdapter(IElementDoc):
         super().__init__(name)
         self._module = module
         self._metadata = metadata
+        self._dataset_hash: Optional[str] = None
 
     def get_meta_data(self):
         """
@@ -37,3 +43,21 @@ class ModuleAdapter(IElementDoc):
         :return: An instance of LightningDataModule.
         """
         return self._module
+
+    @property
+    def dataset_hash(self) -> Optional[str]:
+        """
+        Returns the content hash of the database the data module reads.
+
+        :return: The content hash, or None if it is not known.
+        """
+        return self._dataset_hash
+
+    @dataset_hash.setter
+    def dataset_hash(self, dataset_hash: Optional[str]):
+        """
+        Sets the content hash of the database the data module reads.
+
+        :param dataset_hash: The content hash, see file_content_hash.
+        """
+        self._dataset_hash = dataset_hash
@@ -1,10 +1,23 @@
+from __future__ import annotations
+
+import os
+from typing import Optional, TYPE_CHECKING
+
 import pandas as pd
-from pytorch_lightning import Trainer, LightningModule, LightningDataModule
 
 from processing_pipeline.ICoreElementDoc import IElementDoc
-from processing_pipeline.core_elements.TrainerLogging import DataFrameLogger
 from processing_pipeline.description_enums import Column
 
+if TYPE_CHECKING:
+    from pytorch_lightning import Trainer, LightningModule, LightningDataModule
+    from pytorch_lightning.callbacks import ModelCheckpoint
+
+    from processing_pipeline.core_elements.TrainerLogging import DataFrameLogger
+
+LAST_CHECKPOINT_FILE = "last.ckpt"
+FINAL_CHECKPOINT_FILE = "final.ckpt"
+KEYED_FINAL_CHECKPOINT_FORMAT = "final_{run_key}.ckpt"
+
 
 class TrainerAdapter(IElementDoc):
     """
@@ -12,17 +25,22 @@ class TrainerAdapter(IElementDoc):
     managing trainer logging and metadata extraction.
     """
 
-    def __init__(self, trainer: Trainer, trainer_logging: DataFrameLogger, name: str):
+    def __init__(self, trainer: Trainer, trainer_logging: DataFrameLogger, name: str,
+                 checkpoint: Optional[ModelCheckpoint] = None, checkpoint_root: Optional[str] = None):
         """
         Initializes the TrainerAdapter with the given trainer, logging connector, and name.
 
         :param trainer: An instance of Trainer representing the PyTorch Lightning trainer.
         :param trainer_logging: An instance of DataFrameLogger for logging trainer data.
         :param name: The name of the trainer adapter.
+        :param checkpoint: The checkpoint callback of the trainer, None if the trainer does not checkpoint.
+        :param checkpoint_root: The directory the runs of the trainer checkpoint into.
         """
         super().__init__(name)
         self._trainer: Trainer = trainer
         self._trainer_logging: DataFrameLogger = trainer_logging
+        self._checkpoint: Optional[ModelCheckpoint] = checkpoint
+        self._checkpoint_root: Optional[str] = checkpoint_root
 
         self._hparams = None
         self._last_logs = None
@@ -42,14 +60,51 @@ class TrainerAdapter(IElementDoc):
         self._hparams = self._trainer_logging.last_hparams
         self._last_logs = self._trainer_logging.last_logs
 
-    def train(self, model: LightningModule, datamodule: LightningDataModule):
+    def train(self, model: LightningModule, datamodule: LightningDataModule, ckpt_path: Optional[str] = None):
         """
         Trains the model using the given data module.
 
         :param model: An instance of LightningModule representing the model.
         :param datamodule: An instance of LightningDataModule representing the data module.
+        :param ckpt_path: The checkpoint to resume the training from, None starts a new training.
+        """
+        self._trainer.fit(model, datamodule, ckpt_path=ckpt_path)
+
+    def prepare_checkpoints(self, run_name: str) -> Optional[str]:
+        """
+        Points the checkpoint callback to the directory of the run and looks for a checkpoint of an interrupted
+        training of the same run.
+
+        :param run_name: The name of the run, it names the checkpoint directory.
+        :return: The path of the last checkpoint of the run, or None if the trainer does not checkpoint or the run
+        was not interrupted.
+        """
+        if self._checkpoint is None or self._checkpoint_root is None:
+            return None
+        self._checkpoint.dirpath = os.path.join(self._checkpoint_root, run_name)
+        last_checkpoint = os.path.join(self._checkpoint.dirpath, LAST_CHECKPOINT_FILE)
+        if os.path.exists(last_checkpoint):
+            return last_checkpoint
+        return None
+
+    def complete_checkpoints(self, run_key: Optional[str] = None) -> Optional[str]:
+        """
+        Marks the training of the run as completed by saving the trained weights as the final checkpoint and removing
+        the last checkpoint, so the next training of the run starts from scratch instead of resuming.
+
+        :param run_key: The run key of the run, it names the final checkpoint so trainings with other configurations
+        do not overwrite it.
+        :return: The path of the final checkpoint, or None if the trainer does not checkpoint.
         """
-        self._trainer.fit(model, datamodule)
+        if self._checkpoint is None or self._checkpoint.dirpath is None:
+            return None
+        final_name = FINAL_CHECKPOINT_FILE if run_key is None else KEYED_FINAL_CHECKPOINT_FORMAT.format(run_key=run_key)
+        final_checkpoint = os.path.join(self._checkpoint.dirpath, final_name)
+        self._trainer.save_checkpoint(final_checkpoint)
+        last_checkpoint = os.path.join(self._checkpoint.dirpath, LAST_CHECKPOINT_FILE)
+        if os.path.exists(last_checkpoint):
+            os.remove(last_checkpoint)
+        return final_checkpoint
 
     def test(self, model: LightningModule, datamodule: LightningDataModule):
         """
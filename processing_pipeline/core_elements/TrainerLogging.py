@@ -1,17 +1,45 @@
+import logging
 from argparse import Namespace
 from collections import defaultdict
 from typing import Union, Any, Optional
 
-import pandas as pd
+from pytorch_lightning import Callback
 from pytorch_lightning.loggers import Logger
 
 from processing_pipeline.core_elements.AdapterDataKeys import AdapterDataKey
+from processing_pipeline.core_elements.ColumnarBuffer import ColumnarBuffer, buffers_state_dict, \
+    load_buffers_state_dict
 from processing_pipeline.core_elements.ModelLogging import LOG_FORMAT
+from processing_pipeline.StructuredLogging import get_logger, log_event
 from processing_pipeline.description_enums import Column, ProcessPhase, AbstractionLevel
 
 EPOCH_PL_KEY = "epoch"
 NAME = "DataFrameLogger"
 
+STATE_LOGS = "logs"
+
+LOGGER = get_logger("trainer_logging")
+
+# The prefixes of all phase and abstraction combinations are fixed, so they are only formatted once
+ROUTING_PREFIXES: list[tuple[str, AdapterDataKey]] = [
+    (LOG_FORMAT.format(phase=phase.value, abstraction=abstraction.value), AdapterDataKey(abstraction, phase))
+    for phase in ProcessPhase for abstraction in AbstractionLevel]
+
+_UNRESOLVED = object()
+
+
+def resolve_route(metric_name: str) -> Optional[tuple[AdapterDataKey, Column]]:
+    """
+    Resolves the destination of a raw Lightning metric name.
+
+    :param metric_name: The name of the metric as logged by Lightning.
+    :return: The AdapterDataKey and Column of the metric, or None if the metric has no custom prefix.
+    """
+    for prefix, key in ROUTING_PREFIXES:
+        if metric_name.startswith(prefix):
+            return key, Column(metric_name.removeprefix(prefix))
+    return None
+
 
 class DataFrameLogger(Logger):
     """
@@ -26,8 +54,10 @@ class DataFrameLogger(Logger):
         super().__init__()
         self._last_hparams = None
         self._last_dfs = None
-        self.logs = defaultdict(list)
+        self.logs: defaultdict[AdapterDataKey, ColumnarBuffer] = defaultdict(ColumnarBuffer)
         self.hparams = []
+        # Maps every raw metric name seen so far to its destination, None for metrics that are not routed
+        self._routes: dict[str, Optional[tuple[AdapterDataKey, Column]]] = {}
 
     def log_metrics(self, metrics: dict[str, float], step: Optional[int] = None) -> None:
         """
@@ -41,18 +71,56 @@ class DataFrameLogger(Logger):
         else:
             epoch = metrics[EPOCH_PL_KEY]
 
-        print(f"\n\nepoch trainer: {epoch}")
-        print(f"step trainer: {step}")
-        print(f"metrics trainer: {metrics}")
-        for phase in ProcessPhase:
-            for abstraction in AbstractionLevel:
-                prefix = LOG_FORMAT.format(phase=phase.value, abstraction=abstraction.value)
-                abstraction_metrics = {Column(k.removeprefix(prefix)): v
-                                       for k, v in metrics.items() if k.startswith(prefix)}
-                if abstraction_metrics:
-                    abstraction_metrics[Column.GLOBAL_STEP] = step
-                    abstraction_metrics[Column.EPOCH] = epoch
-                    self.logs[AdapterDataKey(abstraction, phase)].append(abstraction_metrics)
+        log_event(LOGGER, logging.DEBUG, "trainer_metrics", step=step, epoch=epoch, metrics=metrics)
+        rows: dict[AdapterDataKey, dict[Column, Any]] = {}
+        for metric_name, value in metrics.items():
+            route = self._routes.get(metric_name, _UNRESOLVED)
+            if route is _UNRESOLVED:
+                route = resolve_route(metric_name)
+                self._routes[metric_name] = route
+            if route is None:
+                continue
+
+            key, column = route
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = {}
+            row[column] = value
+
+        for key, row in rows.items():
+            row[Column.GLOBAL_STEP] = step
+            row[Column.EPOCH] = epoch
+            self.logs[key].append(row)
+
+    def latest_metric(self, key: AdapterDataKey, column: Column) -> Optional[float]:
+        """
+        Returns the latest logged value of a metric, while the trainer is still running.
+
+        :param key: The phase and abstraction level of the metric.
+        :param column: The column of the metric.
+        :return: The latest value, or None if the metric was not logged yet.
+        """
+        buffer = self.logs.get(key)
+        if buffer is None:
+            return None
+        return buffer.last_value(column)
+
+    def state_dict(self) -> dict:
+        """
+        Returns the logs recorded so far, so a resumed training continues them. The hyperparameters are logged
+        again when the training resumes and are not part of the state.
+
+        :return: The state of the logger.
+        """
+        return {STATE_LOGS: buffers_state_dict(self.logs)}
+
+    def load_state_dict(self, state: dict):
+        """
+        Replaces the recorded logs with a state created by state_dict.
+
+        :param state: The state of the logger.
+        """
+        self.logs = load_buffers_state_dict(state[STATE_LOGS])
 
     def log_hyperparams(self, params: Union[dict[str, Any], Namespace], *args: Any, **kwargs: Any) -> None:
         """
@@ -68,7 +136,7 @@ class DataFrameLogger(Logger):
 
         :param status: The status of the training process.
         """
-        self._last_dfs = {key: pd.DataFrame(list_of_metrics_dicts) for key, list_of_metrics_dicts in self.logs.items()}
+        self._last_dfs = {key: buffer.to_dataframe() for key, buffer in self.logs.items()}
         self._last_hparams = self.hparams
         self.hparams.clear()
         self.logs.clear()
@@ -108,3 +176,34 @@ class DataFrameLogger(Logger):
         :return: The version of the logger.
         """
         return "0.1"
+
+
+class LoggerStateCallback(Callback):
+    """
+    LoggerStateCallback stores the logs of a DataFrameLogger in the checkpoints of the trainer and restores them when
+    the training resumes from a checkpoint, so the logs of an interrupted run stay continuous.
+    """
+
+    def __init__(self, trainer_logger: DataFrameLogger):
+        """
+        Initializes the LoggerStateCallback.
+
+        :param trainer_logger: The DataFrameLogger of the trainer.
+        """
+        self._trainer_logger = trainer_logger
+
+    def state_dict(self) -> dict:
+        """
+        Returns the state of the DataFrameLogger.
+
+        :return: The state of the logger.
+        """
+        return self._trainer_logger.state_dict()
+
+    def load_state_dict(self, state_dict: dict):
+        """
+        Restores the state of the DataFrameLogger.
+
+        :param state_dict: The state of the logger.
+        """
+        self._trainer_logger.load_state_dict(state_dict)
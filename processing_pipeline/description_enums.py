@@ -8,6 +8,7 @@ class ProcessType(Enum):
     TRAIN = "train"
     VALIDATION = "validation"
     TEST = "test"
+    PREDICT = "predict"
 
 
 class ProcessPhase(Enum):
@@ -18,6 +19,7 @@ class ProcessPhase(Enum):
     TRAIN = "train"
     VALIDATION = "validation"
     TEST = "test"
+    PREDICTION = "prediction"
 
 
 class DataOrigin(Enum):
@@ -29,6 +31,17 @@ class DataOrigin(Enum):
     TRAINER = "trainer"
     CALCULATOR = "calculator"
     VISUALISATION = "visualisation"
+    PROFILER = "profiler"
+
+
+class PacketAnnotation(Enum):
+    """
+    Enum representing the annotations a packet carries from station to station in the pipeline.
+    """
+    RUN_KEY = "run_key"
+    CHECKPOINT = "checkpoint"
+    CACHED_RUN_DIR = "cached_run_dir"
+    PROFILE = "profile"
 
 
 class AbstractionLevel(Enum):
@@ -57,6 +70,14 @@ class Column(Enum):
     TOTAL_ERROR = "total_error"
     PREDICTED = "predicted"
     TARGET = "target"
+    INSTANCE_ID = "instance_id"
+    OUTPUT = "output"
+    COUNT = "count"
+    MEAN = "mean"
+    STD = "std"
+    MIN = "min"
+    MAX = "max"
+    PATH = "path"
     LOSS = "loss"
     ACCURACY = "accuracy"
     PRECISION = "precision"
@@ -104,3 +125,11 @@ class Column(Enum):
     FEATURE_CONTOUR3D_PLOT = "feature_contour3d_plot"
     FEATURE_CONTOURF3D_PLOT = "feature_contourf3d_plot"
     FEATURE_SURFACE_PLOT = "feature_surface_plot"
+    STATION = "station"
+    WALL_TIME = "wall_time_s"
+    CPU_TIME = "cpu_time_s"
+    RSS_DELTA = "rss_delta_mb"
+    PEAK_RSS = "peak_rss_mb"
+    TRACEMALLOC_DELTA = "tracemalloc_delta_mb"
+    TRACEMALLOC_PEAK = "tracemalloc_peak_mb"
+    CONCURRENT = "concurrent"
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from processing_pipeline.packets.VisualizedRun import VisualizedRun
+
+
+class RunCollector:
+    """
+    RunCollector is an end station that keeps the finished run instead of saving it, so that it can be handed to a
+    RunFinisher in another process.
+    """
+
+    def __init__(self):
+        """
+        Initializes the RunCollector without a collected run.
+        """
+        self.run: Optional[VisualizedRun] = None
+
+    def process(self, run: VisualizedRun):
+        """
+        Collects the given run and ends the station sequence.
+
+        :param run: An instance of VisualizedRun representing the finished run.
+        """
+        assert isinstance(run, VisualizedRun)
+        self.run = run
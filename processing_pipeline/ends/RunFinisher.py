@@ -1,26 +1,110 @@
-from build_pipelines.path_management.RunSaver import RunSaver
+import os
+from typing import Optional
+
+import pandas as pd
+
+from build_pipelines.path_management.RunCatalog import RunCatalog
+from build_pipelines.path_management.RunSaver import RunSaver, load_run_dfs
+from processing_pipeline.StationProfiling import get_profile_key, profile_station
+from processing_pipeline.description_enums import PacketAnnotation, ProcessType
 from processing_pipeline.packets.VisualizedRun import VisualizedRun
 
+METADATA_KEYS = ("model_metadata", "module_metadata", "trainer_metadata")
+
 
 class RunFinisher:
     """
     RunFinisher is responsible for finalizing runs by saving them and maintaining a list of processed runs.
     """
 
-    def __init__(self, run_saver: RunSaver):
+    def __init__(self, run_saver: RunSaver, run_catalog: Optional[RunCatalog] = None):
         """
         Initializes the RunFinisher with the given RunSaver.
 
         :param run_saver: An instance of RunSaver used to save runs.
+        :param run_catalog: An instance of RunCatalog the saved runs are recorded in, None disables the catalog.
         """
         self._run_saver = run_saver
+        self._run_catalog = run_catalog
         self.runs = []
 
     def process(self, run: VisualizedRun):
         """
-        Processes the given run by saving it and adding it to the list of processed runs.
+        Processes the given run by saving it, recording it in the run catalog and adding it to the list of processed
+        runs. The profiles of the previous stations are saved as profile table of the run. The profile of saving the
+        run itself can not be part of the saved table, it is appended to the profile annotation and recorded in the
+        run catalog only.
 
         :param run: An instance of VisualizedRun representing the run to be processed.
         """
-        self._run_saver.save(run)
+        profiles = run.get_annotation(PacketAnnotation.PROFILE, [])
+        if profiles:
+            run.add_data_df(get_profile_key(run.process_type), pd.DataFrame(profiles))
+        with profile_station(type(self).__name__) as profile:
+            run_dir, artifact_paths = self._run_saver.save(run)
+        run.annotate(PacketAnnotation.PROFILE, [*profiles, profile])
+        if self._run_catalog is not None:
+            self._run_catalog.record_run(run, run_dir, artifact_paths)
         self.runs.append(run)
+
+    def finish_cached(self, run_key: str, model_adapter, module_adapter, trainer_adapter) -> Optional[VisualizedRun]:
+        """
+        Finishes a run from the saved artifacts of an identical run instead of executing it. The tables are loaded
+        from the run directory, the figures stay in the directory and are not loaded. A train run is only reused if
+        its final checkpoint exists, so the trained weights can be restored.
+
+        :param run_key: The run key of the run.
+        :param model_adapter: The model adapter of the run.
+        :param module_adapter: The module adapter of the run.
+        :param trainer_adapter: The trainer adapter of the run.
+        :return: The loaded VisualizedRun, or None if no identical run was saved.
+        """
+        if self._run_catalog is None:
+            return None
+        row = self._run_catalog.find_run_by_key(run_key)
+        if row is None or not os.path.isdir(row["run_dir"]):
+            return None
+        process_type = ProcessType(row["process"])
+        checkpoint = row["checkpoint"]
+        if process_type is ProcessType.TRAIN and (checkpoint is None or not os.path.exists(checkpoint)):
+            return None
+
+        hyperparameters = row["hyperparameters"] or {}
+        model_metadata, module_metadata, trainer_metadata = [_metadata_from_dict(hyperparameters.get(key))
+                                                             for key in METADATA_KEYS]
+        run = VisualizedRun(model_adapter, module_adapter, trainer_adapter, model_metadata, module_metadata,
+                            trainer_metadata, process_type, load_run_dfs(row["run_dir"]), {})
+        run.annotate(PacketAnnotation.RUN_KEY, run_key)
+        run.annotate(PacketAnnotation.CACHED_RUN_DIR, row["run_dir"])
+        if checkpoint is not None:
+            run.annotate(PacketAnnotation.CHECKPOINT, checkpoint)
+        self.runs.append(run)
+        return run
+
+    def flush(self):
+        """
+        Waits until all artifacts of the processed runs are written.
+
+        :raises BaseException: The first error raised by a background write since the last flush.
+        """
+        self._run_saver.flush()
+
+    def close(self):
+        """
+        Waits until all artifacts of the processed runs are written and releases the writer of the RunSaver.
+
+        :raises BaseException: The first error raised by a background write since the last flush.
+        """
+        self._run_saver.close()
+
+
+def _metadata_from_dict(metadata):
+    """
+    Restores run metadata recorded in the run catalog.
+
+    :param metadata: The recorded metadata, a dictionary of lists for DataFrames.
+    :return: The metadata as DataFrame if it was recorded as dictionary of lists, otherwise unchanged.
+    """
+    if isinstance(metadata, dict) and all(isinstance(values, list) for values in metadata.values()):
+        return pd.DataFrame(metadata)
+    return metadata
@@ -0,0 +1,74 @@
+import threading
+from typing import Optional
+
+from processing_pipeline.ends.RunSpec import RunSpec
+from processing_pipeline.packets.VisualizedRun import VisualizedRun
+
+RUN_NOT_FINISHED_MSG = "Run {spec} did not finish within {timeout} seconds."
+
+
+class RunHandle:
+    """
+    RunHandle tracks a run that is executed in the background and gives access to its finished VisualizedRun.
+    """
+
+    def __init__(self, spec: RunSpec):
+        """
+        Initializes the RunHandle for the given run specification.
+
+        :param spec: The specification of the run.
+        """
+        self._spec = spec
+        self._finished = threading.Event()
+        self._run: Optional[VisualizedRun] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def spec(self) -> RunSpec:
+        """
+        Returns the specification of the run.
+
+        :return: The run specification.
+        """
+        return self._spec
+
+    def done(self) -> bool:
+        """
+        Checks if the run has finished, either successfully or with an error.
+
+        :return: True if the run has finished, False otherwise.
+        """
+        return self._finished.is_set()
+
+    def result(self, timeout: Optional[float] = None) -> VisualizedRun:
+        """
+        Waits for the run to finish and returns the VisualizedRun that was handed to the RunFinisher.
+
+        :param timeout: The maximum number of seconds to wait, None waits indefinitely.
+        :return: The finished VisualizedRun.
+        :raises TimeoutError: If the run did not finish in time.
+        :raises BaseException: The error raised while executing or finishing the run.
+        """
+        if not self._finished.wait(timeout):
+            raise TimeoutError(RUN_NOT_FINISHED_MSG.format(spec=self._spec, timeout=timeout))
+        if self._error is not None:
+            raise self._error
+        return self._run
+
+    def set_result(self, run: VisualizedRun):
+        """
+        Marks the run as finished successfully.
+
+        :param run: The finished VisualizedRun.
+        """
+        self._run = run
+        self._finished.set()
+
+    def set_exception(self, error: BaseException):
+        """
+        Marks the run as failed.
+
+        :param error: The error raised while executing or finishing the run.
+        """
+        self._error = error
+        self._finished.set()
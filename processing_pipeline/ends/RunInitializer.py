@@ -1,40 +1,159 @@
-from processing_pipeline.description_enums import ProcessType
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+from typing import Callable, List, Optional, Tuple, TYPE_CHECKING
+
+from processing_pipeline.ContentHash import canonical_hash
+from processing_pipeline.StructuredLogging import get_logger, log_event
+from processing_pipeline.description_enums import PacketAnnotation, ProcessType
+from processing_pipeline.ends.RunCollector import RunCollector
 from processing_pipeline.ends.RunFinisher import RunFinisher
-from processing_pipeline.packets.OldRun import Run
-from processing_pipeline.core_elements.ModuleAdapter import ModuleAdapter
-from processing_pipeline.core_elements.ModelAdapter import ModelAdapter
-from processing_pipeline.core_elements.TrainerAdapter import TrainerAdapter
+from processing_pipeline.ends.RunHandle import RunHandle
+from processing_pipeline.ends.RunSpec import RunSpec
+from processing_pipeline.ends.StationPipeline import StationPipeline, DEF_QUEUE_SIZE
 from processing_pipeline.packets.StartRun import StartRun
+from processing_pipeline.packets.VisualizedRun import VisualizedRun
 from processing_pipeline.stations.CalculationStation import CalculationStation, StatisticCalculation
 from processing_pipeline.stations.InitializingStation import InitializingStation
+from processing_pipeline.stations.PredictionStation import DEF_PREDICTION_ROOT, PredictionStation
 
 from processing_pipeline.stations.ProcessStation import TestingStation, TrainingStation
 from processing_pipeline.stations.VisualisationStation import VisualisationStation
 
+if TYPE_CHECKING:
+    from processing_pipeline.core_elements.ModuleAdapter import ModuleAdapter
+    from processing_pipeline.core_elements.ModelAdapter import ModelAdapter
+    from processing_pipeline.core_elements.TrainerAdapter import TrainerAdapter
+
 # Better version of the RunInitializer without maps
 PROCESS_MAPPING = {ProcessType.TRAIN: TrainingStation, ProcessType.TEST: TestingStation}
 
+DEF_MAX_WORKERS = 2
+# Forking a process that already runs torch thread pools and the writer and logging threads can deadlock the
+# workers, they are spawned and rebuild their adapters from the build recipes of the parent process instead.
+WORKER_START_METHOD = "spawn"
+
+# Initialization and process station run on the caller's thread, the remaining stations in the pipeline
+PIPELINE_INLINE_STATIONS = 2
+
+WORKER_ANNOTATIONS_KEY = "annotations"
+WORKER_WEIGHTS_KEY = "weights"
+WORKER_CONFIG_HASH_KEY = "model_config_hash"
+
+SHARED_TRAINED_MODEL_MSG = ("The model {model} is trained by one of the runs and used by another run of the same "
+                            "batch, run the train run first and the other runs in a following batch.")
+NO_WORKER_FACTORY_MSG = ("run_many needs a worker factory to build the adapters in the worker processes, use the "
+                         "run initializer of a CoreManager or set one with set_worker_factory.")
+
+LOGGER = get_logger("run_initializer")
+
+# Maps a RunSpec to a picklable function and its arguments, calling the function in a worker process builds a
+# RunInitializer holding the adapters of the spec
+WorkerFactory = Callable[[RunSpec], Tuple[Callable[..., "RunInitializer"], tuple]]
+
+
+def get_run_key(model_adapter: ModelAdapter, module_adapter: ModuleAdapter, trainer_adapter: TrainerAdapter,
+                process: ProcessType) -> Optional[str]:
+    """
+    Computes the key that identifies a run by the configurations of its adapters and its process type. The
+    configuration hashes of the adapters already cover the database content and the split.
+
+    :param model_adapter: The model adapter of the run.
+    :param module_adapter: The module adapter of the run.
+    :param trainer_adapter: The trainer adapter of the run.
+    :param process: The process type of the run.
+    :return: The run key, or None if an adapter cannot be identified by its configuration.
+    """
+    config_hashes = [model_adapter.config_hash, module_adapter.config_hash, trainer_adapter.config_hash]
+    if any(config_hash is None for config_hash in config_hashes):
+        return None
+    return canonical_hash([*config_hashes, process.value])
+
+
+def _init_worker(threads_per_worker: Optional[int]):
+    """
+    Initializes a worker process of the multi-run executor.
+
+    :param threads_per_worker: The number of torch threads each worker may use, None keeps the torch default.
+    """
+    if threads_per_worker is not None:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+
+
+def _execute_in_worker(spec: RunSpec, build_run_initializer: Callable[..., "RunInitializer"], build_args: tuple,
+                       weights: dict, model_config_hash: Optional[str]) -> dict:
+    """
+    Executes the run described by the spec inside a worker process, without finishing it. The adapters of the run
+    are built in the worker, the model is loaded with the weights of the model of the parent process.
+
+    :param spec: The specification of the run.
+    :param build_run_initializer: The function building the RunInitializer of the worker.
+    :param build_args: The arguments of build_run_initializer.
+    :param weights: The current weights of the model of the parent process.
+    :param model_config_hash: The configuration hash of the model of the parent process.
+    :return: The picklable data of the collected VisualizedRun. For train runs it contains the trained weights and
+    the configuration hash of the trained model, the model of the parent process is not trained by the worker.
+    """
+    run_initializer = build_run_initializer(*build_args)
+    model_adapter = run_initializer._model_adapters[spec.model]
+    model_adapter.set_weights(weights)
+    model_adapter.config_hash = model_config_hash
+    run = run_initializer.collect_from_spec(spec)
+    run_data = {"model_metadata": run.model_metadata, "module_metadata": run.module_metadata,
+                "trainer_metadata": run.trainer_metadata, "process_type": run.process_type,
+                "data_dfs": {key: run.get_df(key) for key in run.get_df_keys()},
+                "figures": {key: run.get_figure(key) for key in run.figure_keys},
+                WORKER_ANNOTATIONS_KEY: run.annotations}
+    if run.process_type is ProcessType.TRAIN:
+        run_data[WORKER_WEIGHTS_KEY] = run.model_adapter.get_weights()
+        run_data[WORKER_CONFIG_HASH_KEY] = run.model_adapter.config_hash
+    return run_data
+
 
 class RunInitializer:
     """
     RunInitializer is responsible for initializing and managing the execution of runs in the processing pipeline.
     """
 
-    def __init__(self, run_finisher: RunFinisher):
+    def __init__(self, run_finisher: RunFinisher, prediction_root: str = DEF_PREDICTION_ROOT, resume: bool = True):
         """
         Initializes the RunInitializer with the given RunFinisher.
 
         :param run_finisher: An instance of RunFinisher used to finalize runs.
+        :param prediction_root: The directory predict runs write their predictions to.
+        :param resume: True to resume interrupted train runs from their last checkpoint, False to train them from
+        scratch.
         """
         self.run_finisher = run_finisher
+        self._process_mapping = {**PROCESS_MAPPING, ProcessType.TRAIN: partial(TrainingStation, resume),
+                                 ProcessType.PREDICT: partial(PredictionStation, prediction_root)}
 
         self._model_adapters = {}
         self._module_adapters = {}
         self._trainer_adapters = {}
 
         self._counter = 0
+        self._finisher_lock = threading.Lock()
+        self._pipeline: Optional[StationPipeline] = None
+        self._worker_factory: Optional[WorkerFactory] = None
 
-    def run_from_str(self, model: str, module: str, trainer: str, process: str):
+    def set_worker_factory(self, worker_factory: WorkerFactory):
+        """
+        Sets the factory run_many uses to build the adapters of a run in a worker process.
+
+        :param worker_factory: Maps a RunSpec to a picklable function and its arguments, the function builds a
+        RunInitializer holding the adapters of the spec.
+        """
+        self._worker_factory = worker_factory
+
+    def run_from_str(self, model: str, module: str, trainer: str, process: str,
+                     force: bool = False) -> Optional[VisualizedRun]:
         """
         Initializes and runs a process using string identifiers for the model, module, trainer, and process type.
 
@@ -42,38 +161,254 @@ class RunInitializer:
         :param module: The name of the module adapter.
         :param trainer: The name of the trainer adapter.
         :param process: The process type as a string.
+        :param force: True to execute the run even if an identical run was saved before.
+        :return: The VisualizedRun loaded from an identical saved run, or None if the run was executed.
         """
         model_adapter = self._model_adapters[model]
         module_adapter = self._module_adapters[module]
         trainer_adapter = self._trainer_adapters[trainer]
         process_type = ProcessType(process)
 
-        self.run_from_ref(model_adapter, module_adapter, trainer_adapter, process_type)
+        return self.run_from_ref(model_adapter, module_adapter, trainer_adapter, process_type, force)
 
     def run_from_ref(self, model_adapter: ModelAdapter, module_adapter: ModuleAdapter, trainer_adapter: TrainerAdapter,
-                     process: ProcessType):
+                     process: ProcessType, force: bool = False) -> Optional[VisualizedRun]:
         """
-        Initializes and runs a process using references to the model, module, trainer, and process type.
+        Initializes and runs a process using references to the model, module, trainer, and process type. If an
+        identical run, with the same adapter configurations, database content and split, was saved before, it is
+        loaded from its artifacts instead.
 
         :param model_adapter: An instance of ModelAdapter.
         :param module_adapter: An instance of ModuleAdapter.
         :param trainer_adapter: An instance of TrainerAdapter.
         :param process: The process type as an instance of ProcessType.
+        :param force: True to execute the run even if an identical run was saved before.
+        :return: The VisualizedRun loaded from an identical saved run, or None if the run was executed.
+        :raises BaseException: The first error raised by a station of the pipeline since the last join.
         """
-        process_station = PROCESS_MAPPING[process]()
-        initialization_station = InitializingStation()
-        visualisation_station = VisualisationStation()
-        calculation_station = StatisticCalculation()
+        adapters = (model_adapter, module_adapter, trainer_adapter)
+        if self._pipeline is not None:
+            # Runs still post-processed in the pipeline read their adapters, they are not trained, loaded or set up
+            # again before these runs are finished
+            self._pipeline.wait_for_release(adapters)
+
+        run_key = get_run_key(model_adapter, module_adapter, trainer_adapter, process)
+        if run_key is not None and not force:
+            cached_run = self._finish_cached(run_key, model_adapter, module_adapter, trainer_adapter)
+            if cached_run is not None:
+                return cached_run
 
-        stations = [initialization_station, process_station, visualisation_station, calculation_station,
-                    self.run_finisher]
+        run = self.build_run(model_adapter, module_adapter, trainer_adapter, process)
+        self._counter += 1
+
+        if self._pipeline is None:
+            run.next_step()
+            return None
+
+        packet = run
+        for _ in range(PIPELINE_INLINE_STATIONS):
+            packet = packet.step()
+        self._pipeline.submit(packet, adapters)
+        return None
+
+    def build_run(self, model_adapter: ModelAdapter, module_adapter: ModuleAdapter, trainer_adapter: TrainerAdapter,
+                  process: ProcessType, end_station=None) -> StartRun:
+        """
+        Builds the StartRun of a run with its stations and run key, without executing it. The run is executed by
+        next_step, or station by station with step.
+
+        :param model_adapter: An instance of ModelAdapter.
+        :param module_adapter: An instance of ModuleAdapter.
+        :param trainer_adapter: An instance of TrainerAdapter.
+        :param process: The process type as an instance of ProcessType.
+        :param end_station: The station that receives the finished run, None uses the RunFinisher.
+        :return: The StartRun of the run.
+        """
+        stations = self._build_stations(process, self.run_finisher if end_station is None else end_station)
 
         run = StartRun(model_adapter, module_adapter, trainer_adapter)
         run.update_stations(stations)
+        run_key = get_run_key(model_adapter, module_adapter, trainer_adapter, process)
+        if run_key is not None:
+            run.annotate(PacketAnnotation.RUN_KEY, run_key)
+        return run
 
-        self._counter += 1
+    def start_pipeline(self, queue_size: int = DEF_QUEUE_SIZE):
+        """
+        Switches to pipelined execution. Afterwards runs return as soon as their process station finished, the
+        visualisation, calculation and finishing stations are executed by one worker per station. A run waits until
+        the earlier runs using one of its adapters left the pipeline, errors of the stations are raised by the next
+        run.
+
+        :param queue_size: The maximum number of runs waiting in front of each post-processing station.
+        """
+        if self._pipeline is not None:
+            return
+        number_of_stages = len(self._build_stations(ProcessType.TRAIN, self.run_finisher)) - PIPELINE_INLINE_STATIONS
+        self._pipeline = StationPipeline(number_of_stages, queue_size)
+
+    def join_pipeline(self):
+        """
+        Waits until every run submitted to the pipeline is finished.
+        """
+        if self._pipeline is not None:
+            self._pipeline.join()
+
+    def close_pipeline(self):
+        """
+        Waits until every run submitted to the pipeline is finished and switches back to inline execution.
+        """
+        if self._pipeline is None:
+            return
+        pipeline = self._pipeline
+        self._pipeline = None
+        pipeline.close()
 
+    def run_many(self, specs: List[RunSpec], max_workers: int = DEF_MAX_WORKERS,
+                 threads_per_worker: Optional[int] = None, force: bool = False) -> List[RunHandle]:
+        """
+        Runs several processes at the same time in a process pool. Every worker executes the stations up to the
+        calculation station, the finished runs are handed to the RunFinisher of this process. Runs identical to a
+        saved run are loaded from its artifacts and not submitted. The weights trained by a worker are loaded into
+        the model of this process. Runs of one batch execute at the same time, so a model trained by a run can not
+        be used by another run of the same batch.
+
+        The workers are spawned and build the adapters of their run with the worker factory, the model is loaded with
+        the current weights of the model of this process. Scripts calling run_many must guard their entry point with
+        if __name__ == "__main__", spawned workers import the main module.
+
+        :param specs: A list of RunSpec instances describing the runs.
+        :param max_workers: The number of worker processes.
+        :param threads_per_worker: The number of torch threads per worker, by default the cores are split evenly.
+        :param force: True to execute the runs even if identical runs were saved before.
+        :return: A list of RunHandle instances, one per spec and in the same order.
+        :raises ValueError: If a model trained by a run is used by another run of the batch.
+        :raises RuntimeError: If no worker factory was set.
+        """
+        if self._worker_factory is None:
+            raise RuntimeError(NO_WORKER_FACTORY_MSG)
+        trained_models = [spec.model for spec in specs if spec.process_type is ProcessType.TRAIN]
+        for model in set(trained_models):
+            if sum(spec.model == model for spec in specs) > 1:
+                raise ValueError(SHARED_TRAINED_MODEL_MSG.format(model=model))
+
+        if threads_per_worker is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // max_workers)
+
+        executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context(WORKER_START_METHOD),
+                                       initializer=_init_worker, initargs=(threads_per_worker,))
+        handles = []
+        for spec in specs:
+            handle = RunHandle(spec)
+            if not force:
+                cached_run = self._finish_cached_spec(spec)
+                if cached_run is not None:
+                    handle.set_result(cached_run)
+                    handles.append(handle)
+                    continue
+            build_run_initializer, build_args = self._worker_factory(spec)
+            model_adapter = self._model_adapters[spec.model]
+            future = executor.submit(_execute_in_worker, spec, build_run_initializer, build_args,
+                                     model_adapter.get_weights(), model_adapter.config_hash)
+            future.add_done_callback(partial(self._finish_from_worker, handle))
+            handles.append(handle)
+            self._counter += 1
+        executor.shutdown(wait=False)
+        return handles
+
+    def collect_from_spec(self, spec: RunSpec) -> VisualizedRun:
+        """
+        Executes the run described by the spec and returns it instead of handing it to the RunFinisher.
+
+        :param spec: The specification of the run.
+        :return: The collected VisualizedRun.
+        """
+        collector = RunCollector()
+        run = self.build_run(self._model_adapters[spec.model], self._module_adapters[spec.module],
+                             self._trainer_adapters[spec.trainer], spec.process_type, collector)
         run.next_step()
+        return collector.run
+
+    def _finish_cached_spec(self, spec: RunSpec) -> Optional[VisualizedRun]:
+        """
+        Finishes the run described by the spec from an identical saved run.
+
+        :param spec: The specification of the run.
+        :return: The loaded VisualizedRun, or None if the run has no key or no identical run was saved.
+        """
+        model_adapter = self._model_adapters[spec.model]
+        module_adapter = self._module_adapters[spec.module]
+        trainer_adapter = self._trainer_adapters[spec.trainer]
+        run_key = get_run_key(model_adapter, module_adapter, trainer_adapter, spec.process_type)
+        if run_key is None:
+            return None
+        return self._finish_cached(run_key, model_adapter, module_adapter, trainer_adapter)
+
+    def _finish_cached(self, run_key: str, model_adapter: ModelAdapter, module_adapter: ModuleAdapter,
+                       trainer_adapter: TrainerAdapter) -> Optional[VisualizedRun]:
+        """
+        Finishes a run from the saved artifacts of an identical run. For train runs the trained weights are restored
+        into the model, so following runs with the model see the same model as after training.
+
+        :param run_key: The run key of the run.
+        :param model_adapter: The model adapter of the run.
+        :param module_adapter: The module adapter of the run.
+        :param trainer_adapter: The trainer adapter of the run.
+        :return: The loaded VisualizedRun, or None if no identical run was saved.
+        """
+        with self._finisher_lock:
+            run = self.run_finisher.finish_cached(run_key, model_adapter, module_adapter, trainer_adapter)
+        if run is None:
+            return None
+        if run.process_type is ProcessType.TRAIN:
+            model_adapter.load_weights(run.get_annotation(PacketAnnotation.CHECKPOINT))
+            model_adapter.record_training(run_key)
+        log_event(LOGGER, logging.INFO, "run_cache_hit", run_key=run_key,
+                  run_dir=run.get_annotation(PacketAnnotation.CACHED_RUN_DIR))
+        return run
+
+    def _finish_from_worker(self, handle: RunHandle, future: Future):
+        """
+        Rebuilds the VisualizedRun returned by a worker with the adapters of this process and finishes it. The
+        weights trained by the worker are loaded into the model adapter of this process.
+
+        :param handle: The RunHandle of the run.
+        :param future: The future of the worker task.
+        """
+        try:
+            run_data = future.result()
+            annotations = run_data.pop(WORKER_ANNOTATIONS_KEY)
+            weights = run_data.pop(WORKER_WEIGHTS_KEY, None)
+            config_hash = run_data.pop(WORKER_CONFIG_HASH_KEY, None)
+            spec = handle.spec
+            model_adapter = self._model_adapters[spec.model]
+            if weights is not None:
+                model_adapter.set_weights(weights)
+                model_adapter.config_hash = config_hash
+            run = VisualizedRun(model_adapter, self._module_adapters[spec.module],
+                                self._trainer_adapters[spec.trainer], **run_data)
+            run.inherit_annotations(annotations)
+            with self._finisher_lock:
+                self.run_finisher.process(run)
+        except BaseException as error:
+            handle.set_exception(error)
+            return
+        handle.set_result(run)
+
+    def _build_stations(self, process: ProcessType, end_station) -> list:
+        """
+        Builds the sequence of stations for a run.
+
+        :param process: The process type as an instance of ProcessType.
+        :param end_station: The station that receives the finished run.
+        :return: A list of stations.
+        """
+        process_station = self._process_mapping[process]()
+        initialization_station = InitializingStation()
+        visualisation_station = VisualisationStation()
+        calculation_station = StatisticCalculation()
+
+        return [initialization_station, process_station, visualisation_station, calculation_station, end_station]
 
     def add_module(self, module_adapter: ModuleAdapter):
         """
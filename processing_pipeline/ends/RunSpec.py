@@ -0,0 +1,65 @@
+from processing_pipeline.description_enums import ProcessType
+
+
+class RunSpec:
+    """
+    RunSpec describes one run by the names of its model, module and trainer adapters and its process type.
+    """
+
+    def __init__(self, model: str, module: str, trainer: str, process: str):
+        """
+        Initializes the RunSpec with the given adapter names and process type.
+
+        :param model: The name of the model adapter.
+        :param module: The name of the module adapter.
+        :param trainer: The name of the trainer adapter.
+        :param process: The process type as a string.
+        """
+        self._model = model
+        self._module = module
+        self._trainer = trainer
+        self._process_type = ProcessType(process)
+
+    @property
+    def model(self) -> str:
+        """
+        Returns the name of the model adapter.
+
+        :return: The name of the model adapter.
+        """
+        return self._model
+
+    @property
+    def module(self) -> str:
+        """
+        Returns the name of the module adapter.
+
+        :return: The name of the module adapter.
+        """
+        return self._module
+
+    @property
+    def trainer(self) -> str:
+        """
+        Returns the name of the trainer adapter.
+
+        :return: The name of the trainer adapter.
+        """
+        return self._trainer
+
+    @property
+    def process_type(self) -> ProcessType:
+        """
+        Returns the process type of the run.
+
+        :return: The process type.
+        """
+        return self._process_type
+
+    def __repr__(self):
+        """
+        Get the string representation of the RunSpec.
+
+        :return: The string representation of the RunSpec.
+        """
+        return f"RunSpec({self._model}, {self._module}, {self._trainer}, {self._process_type.value})"
@@ -0,0 +1,145 @@
+import itertools
+import queue
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from processing_pipeline.packets.AbstractPacket import AbstractPacket
+
+DEF_QUEUE_SIZE = 2
+STAGE_THREAD_NAME = "station-stage-{stage}"
+
+PIPELINE_CLOSED_MSG = "The station pipeline is already closed."
+
+_STOP = object()
+
+
+class StationPipeline:
+    """
+    StationPipeline executes the trailing stations of packets in stages. Every stage has its own worker thread and a
+    bounded queue, so the caller can start the next run while earlier runs are still post-processed. Packets are
+    submitted with the objects their stations use, e.g. their adapters, callers wait until the objects are released
+    before they use them for another packet. Once a station raised, submitting and waiting raise the error.
+    """
+
+    def __init__(self, number_of_stages: int, queue_size: int = DEF_QUEUE_SIZE):
+        """
+        Initializes the StationPipeline and starts one worker per stage.
+
+        :param number_of_stages: The number of stations that are executed in the pipeline.
+        :param queue_size: The maximum number of packets waiting in front of each stage.
+        """
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=queue_size) for _ in range(number_of_stages)]
+        self._errors: List[BaseException] = []
+        # Guards the errors and the in flight packets, notified when a packet leaves the pipeline or a station raised
+        self._condition = threading.Condition()
+        self._in_flight: Dict[int, Tuple[object, ...]] = {}
+        self._tokens = itertools.count()
+        self._closed = False
+
+        self._workers = [threading.Thread(target=self._work, args=(stage,), daemon=True,
+                                          name=STAGE_THREAD_NAME.format(stage=stage))
+                         for stage in range(number_of_stages)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, packet: AbstractPacket, resources: Iterable[object] = ()):
+        """
+        Hands a packet to the first stage. Blocks while the queue of the first stage is full.
+
+        :param packet: The packet whose remaining stations are executed in the pipeline.
+        :param resources: The objects used by the remaining stations, they are held until the packet left the
+        pipeline.
+        :raises RuntimeError: If the pipeline is already closed.
+        :raises BaseException: The first error raised by a station since the last join, the packet is not submitted.
+        """
+        if self._closed:
+            raise RuntimeError(PIPELINE_CLOSED_MSG)
+        self._raise_errors()
+        token = next(self._tokens)
+        with self._condition:
+            self._in_flight[token] = tuple(resources)
+        self._queues[0].put((token, packet))
+
+    def wait_for_release(self, resources: Iterable[object]):
+        """
+        Waits until no packet in the pipeline holds one of the given objects.
+
+        :param resources: The objects, compared by identity.
+        :raises BaseException: The first error raised by a station since the last join.
+        """
+        resource_ids = {id(resource) for resource in resources}
+        with self._condition:
+            self._condition.wait_for(lambda: self._errors or not any(
+                id(held) in resource_ids for held_resources in self._in_flight.values() for held in held_resources))
+        self._raise_errors()
+
+    def join(self):
+        """
+        Waits until all submitted packets passed every stage.
+
+        :raises BaseException: The first error raised by a station since the last join.
+        """
+        for stage_queue in self._queues:
+            stage_queue.join()
+        self._raise_errors()
+
+    def close(self):
+        """
+        Waits for all submitted packets and stops the workers.
+
+        :raises BaseException: The first error raised by a station since the last join.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queues[0].put(_STOP)
+        for worker in self._workers:
+            worker.join()
+        self._raise_errors()
+
+    def _work(self, stage: int):
+        """
+        Processes packets of one stage until the stop signal arrives.
+
+        :param stage: The index of the stage.
+        """
+        stage_queue = self._queues[stage]
+        is_last_stage = stage == len(self._queues) - 1
+        while True:
+            item = stage_queue.get()
+            if item is _STOP:
+                if not is_last_stage:
+                    self._queues[stage + 1].put(_STOP)
+                stage_queue.task_done()
+                return
+
+            token, packet = item
+            forwarded = False
+            try:
+                next_packet = packet.step()
+                if next_packet is not None and next_packet.has_next_step():
+                    if is_last_stage:
+                        next_packet.next_step()
+                    else:
+                        self._queues[stage + 1].put((token, next_packet))
+                        forwarded = True
+            except BaseException as error:
+                with self._condition:
+                    self._errors.append(error)
+                    self._condition.notify_all()
+            finally:
+                if not forwarded:
+                    with self._condition:
+                        del self._in_flight[token]
+                        self._condition.notify_all()
+                stage_queue.task_done()
+
+    def _raise_errors(self):
+        """
+        Raises the first collected error and clears the collected errors.
+        """
+        with self._condition:
+            errors = self._errors
+            self._errors = []
+        if errors:
+            raise errors[0]
@@ -1,3 +1,7 @@
+from processing_pipeline.StationProfiling import profile_station
+from processing_pipeline.description_enums import PacketAnnotation
+
+
 class AbstractPacket:
     """
     AbstractPacket is a base class for packets in the processing pipeline, responsible for managing the sequence of
@@ -6,9 +10,10 @@ class AbstractPacket:
 
     def __init__(self):
         """
-        Initializes the AbstractPacket with an empty list of stations.
+        Initializes the AbstractPacket with an empty list of stations and no annotations.
         """
         self._stations = []
+        self._annotations = {}
 
     def next_step(self):
         """
@@ -16,13 +21,45 @@ class AbstractPacket:
 
         If the next station returns a new packet, it updates the stations of the new packet and continues processing.
         """
+        next_packet = self.step()
+        if next_packet is None:
+            return
+        next_packet.next_step()
+
+    def step(self):
+        """
+        Processes only the next station in the sequence. The station is profiled and its profile record is appended
+        to the profile annotation of the returned packet.
+
+        :return: The packet returned by the station with the remaining stations, or None if the sequence ended.
+        """
         # Typing would be also done with generics, in python typing for this phase not possible
         next_station = self._stations.pop(0)
-        next_packet: AbstractPacket = next_station.process(self)
+        with profile_station(type(next_station).__name__) as profile:
+            next_packet: AbstractPacket = next_station.process(self)
         if next_packet is None:
-            return
+            return None
         next_packet.update_stations(self._stations)
-        next_packet.next_step()
+        next_packet.inherit_annotations(self._annotations)
+        next_packet.annotate(PacketAnnotation.PROFILE, [*self.get_annotation(PacketAnnotation.PROFILE, []), profile])
+        return next_packet
+
+    @property
+    def next_station(self):
+        """
+        Returns the station that processes the packet in the next step.
+
+        :return: The next station, or None if the sequence ended.
+        """
+        return self._stations[0] if self._stations else None
+
+    def has_next_step(self) -> bool:
+        """
+        Checks if there are stations left to process.
+
+        :return: True if there is at least one remaining station, False otherwise.
+        """
+        return len(self._stations) > 0
 
     def update_stations(self, stations):
         """
@@ -32,3 +69,39 @@ class AbstractPacket:
         """
         self._stations = stations
         # In Java with generics, here would be the station parse process.
+
+    def annotate(self, key, value):
+        """
+        Attaches a value to the packet, it is carried to the packets of the following stations.
+
+        :param key: The PacketAnnotation of the value.
+        :param value: The value.
+        """
+        self._annotations[key] = value
+
+    def get_annotation(self, key, default=None):
+        """
+        Returns an annotation of the packet.
+
+        :param key: The PacketAnnotation of the value.
+        :param default: The value returned if the packet has no such annotation.
+        :return: The annotated value or the default.
+        """
+        return self._annotations.get(key, default)
+
+    @property
+    def annotations(self) -> dict:
+        """
+        Returns a copy of all annotations of the packet.
+
+        :return: A dictionary mapping PacketAnnotation to values.
+        """
+        return dict(self._annotations)
+
+    def inherit_annotations(self, annotations: dict):
+        """
+        Takes over the annotations of a previous packet, annotations the packet already has take precedence.
+
+        :param annotations: The annotations of the previous packet.
+        """
+        self._annotations = {**annotations, **self._annotations}
@@ -1,8 +1,14 @@
-from processing_pipeline.core_elements.ModelAdapter import ModelAdapter
-from processing_pipeline.core_elements.ModuleAdapter import ModuleAdapter
-from processing_pipeline.core_elements.TrainerAdapter import TrainerAdapter
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from processing_pipeline.packets.AbstractPacket import AbstractPacket
 
+if TYPE_CHECKING:
+    from processing_pipeline.core_elements.ModelAdapter import ModelAdapter
+    from processing_pipeline.core_elements.ModuleAdapter import ModuleAdapter
+    from processing_pipeline.core_elements.TrainerAdapter import TrainerAdapter
+
 
 class RunAdapterGetProxy:
     """
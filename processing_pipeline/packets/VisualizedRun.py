@@ -1,6 +1,6 @@
-import matplotlib.pyplot as plt
 import pandas as pd
 
+from processing_pipeline.FigureSpecs import FigureSpec
 from processing_pipeline.RunDatasetKeys import FigKey, DFKey
 from processing_pipeline.packets.AbstractPacket import AbstractPacket
 from processing_pipeline.packets.InitializedRun import RunMetadataGetProxy
@@ -13,20 +13,20 @@ class RunFigureGetProxy:
     A proxy class to handle retrieval of figures in a run.
     """
 
-    def __init__(self, figures: dict[FigKey, plt]):
+    def __init__(self, figures: dict[FigKey, FigureSpec]):
         """
         Initialize the RunFigureGetProxy with a dictionary of figures.
 
-        :param figures: A dictionary mapping FigKey to matplotlib figures.
+        :param figures: A dictionary mapping FigKey to figure specs.
         """
-        self._figures: dict[FigKey, plt.Figure] = figures
+        self._figures: dict[FigKey, FigureSpec] = figures
 
-    def get_figure(self, key: FigKey) -> plt.Figure:
+    def get_figure(self, key: FigKey) -> FigureSpec:
         """
         Retrieve a figure by its key.
 
         :param key: The key corresponding to the figure.
-        :return: The matplotlib figure associated with the key.
+        :return: The figure spec associated with the key, it is rendered with its render method.
         """
         return self._figures[key]
 
@@ -46,7 +46,8 @@ class VisualizedRun(AbstractPacket, RunAdapterGetProxy, RunMetadataGetProxy, Run
     """
 
     def __init__(self, model_adapter, module_adapter, trainer_adapter,
-                 model_metadata, module_metadata, trainer_metadata, process_type, data_dfs, figures: dict[FigKey, plt]):
+                 model_metadata, module_metadata, trainer_metadata, process_type, data_dfs,
+                 figures: dict[FigKey, FigureSpec]):
         """
         Initialize the VisualizedRun with various adapters, metadata, data frames, and figures.
 
@@ -58,13 +59,14 @@ class VisualizedRun(AbstractPacket, RunAdapterGetProxy, RunMetadataGetProxy, Run
         :param trainer_metadata: Metadata for the trainer.
         :param process_type: The type of process.
         :param data_dfs: A dictionary mapping DFKey to pandas DataFrames.
-        :param figures: A dictionary mapping FigKey to matplotlib figures.
+        :param figures: A dictionary mapping FigKey to figure specs.
         """
         super().__init__()
         RunAdapterGetProxy.__init__(self, model_adapter, module_adapter, trainer_adapter)
         RunMetadataGetProxy.__init__(self, model_metadata, module_metadata, trainer_metadata)
         RunLoggingDataGetProxy.__init__(self, data_dfs, process_type)
         RunFigureGetProxy.__init__(self, figures)
+        self._write_reports = []
 
     def add_data_df(self, key: DFKey, data_df: pd.DataFrame):
         """
@@ -75,11 +77,37 @@ class VisualizedRun(AbstractPacket, RunAdapterGetProxy, RunMetadataGetProxy, Run
         """
         self._data_dfs[key] = data_df
 
-    def add_figure(self, key: FigKey, figure: plt.Figure):
+    def add_figure(self, key: FigKey, figure: FigureSpec):
         """
         Add a figure to the run.
 
         :param key: The key corresponding to the figure.
-        :param figure: The matplotlib figure to add.
+        :param figure: The figure spec to add.
         """
         self._figures[key] = figure
+
+    def add_write_report(self, report):
+        """
+        Add the report of an artifact write of this run.
+
+        :param report: The ArtifactWriteReport of the write.
+        """
+        self._write_reports.append(report)
+
+    @property
+    def write_reports(self) -> list:
+        """
+        Get the reports of all artifact writes of this run.
+
+        :return: A list of ArtifactWriteReport instances.
+        """
+        return list(self._write_reports)
+
+    @property
+    def write_errors(self) -> list:
+        """
+        Get the errors raised while writing the artifacts of this run.
+
+        :return: A list of the errors of failed writes.
+        """
+        return [report.error for report in self._write_reports if report.error is not None]
@@ -1,13 +1,27 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-import seaborn as sns
 
+from processing_pipeline.DensityEstimation import DEF_GRID_SIZE, binned_kde, subsample
+from processing_pipeline.FigureSpecs import DensityCurvePlotSpec, DensityPlotSpec, FigureSpec
 from processing_pipeline.RunDatasetKeys import DFKey, FigKey
 from processing_pipeline.description_enums import Column, DataOrigin, AbstractionLevel, ProcessPhase
 from processing_pipeline.packets.VisualizedRun import VisualizedRun
 
+KDE_DENSITY = "kde"
+BINNED_DENSITY = "binned"
+DENSITY_MODES = (KDE_DENSITY, BINNED_DENSITY)
+DEF_SAMPLE_BUDGET = 100_000
+
+UNKNOWN_DENSITY_MODE_MSG = "Unknown density mode {density_mode}, supported modes are {modes}."
+
+DENSITY_LABELS = ('True Values', 'Predicted Values')
+DENSITY_X_LABEL = 'Value'
+DENSITY_Y_LABEL = 'Density'
+DENSITY_TITLE = 'Density Plot of True and Predicted Values'
+
 
 class CalculationStation(ABC):
     """
@@ -30,6 +44,24 @@ class StatisticCalculation(CalculationStation):
     A calculation station that performs statistical calculations on a VisualizedRun.
     """
 
+    def __init__(self, density_mode: str = BINNED_DENSITY, sample_budget: Optional[int] = DEF_SAMPLE_BUDGET,
+                 grid_size: int = DEF_GRID_SIZE):
+        """
+        Initialize the StatisticCalculation.
+
+        :param density_mode: BINNED_DENSITY estimates the densities on a grid by FFT, which scales linearly with the
+        number of instances, KDE_DENSITY plots seaborn kernel density estimates of the samples.
+        :param sample_budget: The maximum number of instances passed to seaborn in KDE_DENSITY mode, None passes
+        all instances.
+        :param grid_size: The number of grid points of the densities in BINNED_DENSITY mode.
+        :raises ValueError: If the density mode is not supported.
+        """
+        if density_mode not in DENSITY_MODES:
+            raise ValueError(UNKNOWN_DENSITY_MODE_MSG.format(density_mode=density_mode, modes=DENSITY_MODES))
+        self._density_mode = density_mode
+        self._sample_budget = sample_budget
+        self._grid_size = grid_size
+
     def process(self, run: VisualizedRun) -> VisualizedRun:
         """
         Process the given VisualizedRun by performing statistical calculations.
@@ -40,7 +72,7 @@ class StatisticCalculation(CalculationStation):
         assert isinstance(run, VisualizedRun)
 
         for process_phase in ProcessPhase:
-            model_logger_key = DFKey(DataOrigin.CALCULATOR, AbstractionLevel.INSTANCE, process_phase)
+            model_logger_key = DFKey(DataOrigin.MODEL, AbstractionLevel.INSTANCE, process_phase)
             if model_logger_key in run.get_df_keys():
                 self.show_distribution(run, model_logger_key)
 
@@ -55,29 +87,42 @@ class StatisticCalculation(CalculationStation):
         """
         model_logger_sample_data = run.get_df(model_logger_key)
 
-        targets: pd.Series = model_logger_sample_data[Column.TARGET]
-        predictions: pd.Series = model_logger_sample_data[Column.PREDICTED]
-        total_error: pd.DataFrame = abs(targets - predictions).to_frame(name=Column.TOTAL_ERROR)
-        predicted_distribution = self.scatter_plot(targets, predictions)
-
-        run.add_data_df(DFKey(DataOrigin.CALCULATOR, AbstractionLevel.INSTANCE, ProcessPhase.VALIDATION), total_error)
+        targets = model_logger_sample_data[Column.TARGET].to_numpy()
+        predictions = model_logger_sample_data[Column.PREDICTED].to_numpy()
+        total_error = pd.DataFrame({Column.TOTAL_ERROR: np.abs(targets - predictions)},
+                                   index=model_logger_sample_data.index, copy=False)
+        if Column.INSTANCE_ID in model_logger_sample_data.columns:
+            total_error.insert(0, Column.INSTANCE_ID, model_logger_sample_data[Column.INSTANCE_ID].to_numpy())
+        if self._density_mode == BINNED_DENSITY:
+            predicted_distribution = self.density_plot(targets, predictions)
+        else:
+            predicted_distribution = self.scatter_plot(subsample(targets, self._sample_budget),
+                                                       subsample(predictions, self._sample_budget))
+
+        run.add_data_df(DFKey(DataOrigin.CALCULATOR, AbstractionLevel.INSTANCE, model_logger_key.phase), total_error)
         run.add_figure(FigKey(DataOrigin.CALCULATOR, AbstractionLevel.INSTANCE,
                               Column.DISTRIBUTION_COMPARISON, model_logger_key.phase), predicted_distribution)
 
+    def density_plot(self, target, predicted) -> FigureSpec:
+        """
+        Describe a density plot comparing the target and predicted values, with densities estimated on a grid.
+
+        :param target: The true values.
+        :param predicted: The predicted values.
+        :return: The spec of the density plot.
+        """
+        curves = {label: binned_kde(values, self._grid_size) for label, values in zip(DENSITY_LABELS,
+                                                                                      (target, predicted))}
+        return DensityCurvePlotSpec(curves, DENSITY_X_LABEL, DENSITY_Y_LABEL, DENSITY_TITLE)
+
     @staticmethod
-    def scatter_plot(target, predicted):
+    def scatter_plot(target, predicted) -> FigureSpec:
         """
-        Create a scatter plot comparing the target and predicted values.
+        Describe a kernel density plot comparing the target and predicted values.
 
         :param target: The true values.
         :param predicted: The predicted values.
-        :return: The matplotlib figure containing the scatter plot.
+        :return: The spec of the density plot.
         """
-        plt.figure()
-        sns.kdeplot(target, label='True Values', fill=True, alpha=0.5)
-        sns.kdeplot(predicted, label='Predicted Values', fill=True, alpha=0.5)
-        plt.xlabel('Value')
-        plt.ylabel('Density')
-        plt.title('Density Plot of True and Predicted Values')
-        plt.legend()
-        return plt.gcf()
+        return DensityPlotSpec(dict(zip(DENSITY_LABELS, (target, predicted))), DENSITY_X_LABEL, DENSITY_Y_LABEL,
+                               DENSITY_TITLE)
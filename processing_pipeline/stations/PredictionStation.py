@@ -0,0 +1,272 @@
+import json
+import os
+from typing import Dict, Optional, TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from processing_pipeline.FileLock import write_atomic
+from processing_pipeline.RunDatasetKeys import DFKey
+from processing_pipeline.description_enums import AbstractionLevel, Column, DataOrigin, ProcessPhase, ProcessType
+from processing_pipeline.packets.InitializedRun import InitializedRun
+from processing_pipeline.packets.ProcessedRun import ProcessedRun
+from processing_pipeline.stations.ProcessStation import ProcessStation
+
+if TYPE_CHECKING:
+    from processing_pipeline.core_elements.ModelAdapter import ModelAdapter
+    from processing_pipeline.core_elements.ModuleAdapter import ModuleAdapter
+    from processing_pipeline.core_elements.TrainerAdapter import TrainerAdapter
+
+DEF_PREDICTION_ROOT = "data/predictions"
+DEF_PREDICTION_BATCH_SIZE = 512
+DEF_PREDICTION_WORKERS = 4
+DEF_CHUNK_SIZE = 1_000_000
+PREDICTION_DTYPE = np.float32
+
+PREDICTION_DIR_FORMAT = "{model}_{module}"
+CHUNK_FILE_FORMAT = "{output}_{index:06d}.npy"
+CHUNK_PATTERN_FORMAT = "{output}_*.npy"
+TEMPORARY_FILE_FORMAT = "{path}.tmp.npy"
+MANIFEST_FILE = "manifest.json"
+
+MANIFEST_LENGTH = "length"
+MANIFEST_CHUNK_SIZE = "chunk_size"
+MANIFEST_MODEL_FINGERPRINT = "model_fingerprint"
+MANIFEST_DATASET_HASH = "dataset_hash"
+MANIFEST_CHUNKS = "chunks"
+CHUNK_START = "start"
+CHUNK_END = "end"
+CHUNK_STATS = "stats"
+STAT_COUNT = "count"
+STAT_SUM = "sum"
+STAT_SQUARED_SUM = "squared_sum"
+STAT_MIN = "min"
+STAT_MAX = "max"
+
+RESUME_MISMATCH_MSG = ("Predictions in {path} were started for {length} samples in chunks of {chunk_size}, remove the "
+                       "directory to predict a different dataset or chunk size.")
+MODEL_MISMATCH_MSG = ("Predictions in {path} were started with other model weights, remove the directory to predict "
+                      "with the current model.")
+DATASET_MISMATCH_MSG = ("Predictions in {path} were started for another database content, remove the directory to "
+                        "predict the current database.")
+
+
+def _chunk_stats(values: np.ndarray) -> dict:
+    """
+    Computes the statistics of one chunk of predictions, they are merged into the summary of all chunks.
+
+    :param values: The predictions of the chunk.
+    :return: The count, sum, squared sum, minimum and maximum of the predictions.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.size == 0:
+        return {STAT_COUNT: 0, STAT_SUM: 0.0, STAT_SQUARED_SUM: 0.0, STAT_MIN: None, STAT_MAX: None}
+    return {STAT_COUNT: int(values.size), STAT_SUM: float(values.sum()),
+            STAT_SQUARED_SUM: float(np.square(values).sum()), STAT_MIN: float(values.min()),
+            STAT_MAX: float(values.max())}
+
+
+def summarize_predictions(manifest: dict, output_dir: str) -> pd.DataFrame:
+    """
+    Merges the statistics of all chunks into one row per output.
+
+    :param manifest: The manifest of the predictions.
+    :param output_dir: The directory of the prediction chunks.
+    :return: A DataFrame with the columns OUTPUT, COUNT, MEAN, STD, MIN, MAX and PATH, the path is the glob pattern
+    of the chunk files of the output in chunk order.
+    """
+    merged: Dict[str, dict] = {}
+    for chunk in manifest[MANIFEST_CHUNKS].values():
+        for output, stats in chunk[CHUNK_STATS].items():
+            total = merged.setdefault(output, {STAT_COUNT: 0, STAT_SUM: 0.0, STAT_SQUARED_SUM: 0.0,
+                                               STAT_MIN: [], STAT_MAX: []})
+            total[STAT_COUNT] += stats[STAT_COUNT]
+            total[STAT_SUM] += stats[STAT_SUM]
+            total[STAT_SQUARED_SUM] += stats[STAT_SQUARED_SUM]
+            if stats[STAT_COUNT]:
+                total[STAT_MIN].append(stats[STAT_MIN])
+                total[STAT_MAX].append(stats[STAT_MAX])
+
+    rows = []
+    for output, total in merged.items():
+        count = total[STAT_COUNT]
+        mean = total[STAT_SUM] / count if count else np.nan
+        variance = total[STAT_SQUARED_SUM] / count - mean ** 2 if count else np.nan
+        rows.append({Column.OUTPUT: output, Column.COUNT: count, Column.MEAN: mean,
+                     Column.STD: float(np.sqrt(max(variance, 0.0))) if count else np.nan,
+                     Column.MIN: min(total[STAT_MIN], default=np.nan), Column.MAX: max(total[STAT_MAX], default=np.nan),
+                     Column.PATH: os.path.join(output_dir, CHUNK_PATTERN_FORMAT.format(output=output))})
+    return pd.DataFrame(rows, columns=[Column.OUTPUT, Column.COUNT, Column.MEAN, Column.STD, Column.MIN, Column.MAX,
+                                       Column.PATH])
+
+
+class PredictionStation(ProcessStation):
+    """
+    A process station that streams the whole dataset of a module through a trained model without labels. The
+    predictions of every output with one row per sample are written to memory-mapped .npy chunks of chunk_size
+    samples. Finished chunks are recorded in a manifest, an interrupted prediction resumes with the first unfinished
+    chunk. The manifest records a hash of the model weights and the content hash of the database, a prediction is only
+    resumed with the same weights and database content.
+    """
+
+    def __init__(self, prediction_root: str = DEF_PREDICTION_ROOT, batch_size: int = DEF_PREDICTION_BATCH_SIZE,
+                 num_workers: int = DEF_PREDICTION_WORKERS, chunk_size: int = DEF_CHUNK_SIZE):
+        """
+        Initialize the PredictionStation with the process type set to PREDICT.
+
+        :param prediction_root: The directory the predictions of every model and module pair are written to.
+        :param batch_size: The number of samples per batch.
+        :param num_workers: The number of DataLoader workers.
+        :param chunk_size: The number of samples per chunk, the granularity of resuming.
+        """
+        self._process_type: ProcessType = ProcessType.PREDICT
+        self._prediction_root = prediction_root
+        self._batch_size = batch_size
+        self._num_workers = num_workers
+        self._chunk_size = chunk_size
+
+    def process(self, run: InitializedRun) -> ProcessedRun:
+        """
+        Process the given InitializedRun by predicting all samples of the module's dataset.
+
+        :param run: The InitializedRun to process.
+        :return: The resulting ProcessedRun holding a summary of the predictions.
+        """
+        assert isinstance(run, InitializedRun)
+
+        model_adapter: ModelAdapter = run.model_adapter
+        module_adapter: ModuleAdapter = run.module_adapter
+        trainer_adapter: TrainerAdapter = run.trainer_adapter
+
+        output_dir = os.path.join(self._prediction_root, PREDICTION_DIR_FORMAT.format(model=model_adapter.name,
+                                                                                      module=module_adapter.name))
+        summary = self.predict(model_adapter.model, module_adapter.module, output_dir, model_adapter.weights_hash(),
+                               module_adapter.dataset_hash)
+        data = {DFKey(DataOrigin.MODEL, AbstractionLevel.GENERAL, ProcessPhase.PREDICTION): summary}
+
+        return ProcessedRun(model_adapter, module_adapter, trainer_adapter,
+                            run.model_metadata, run.module_metadata, run.trainer_metadata,
+                            self._process_type, data)
+
+    def predict(self, task, datamodule, output_dir: str, model_fingerprint: str,
+                dataset_hash: Optional[str] = None) -> pd.DataFrame:
+        """
+        Predicts all samples of the datamodule's dataset chunk by chunk, skipping chunks finished earlier.
+
+        :param task: The trained LightningModule.
+        :param datamodule: The set up datamodule, its test transforms are applied.
+        :param output_dir: The directory of the chunks and the manifest.
+        :param model_fingerprint: The hash of the model weights, chunks predicted with other weights are not reused.
+        :param dataset_hash: The content hash of the database, chunks predicted for other content are not reused. None
+        if it is not known, the dataset is then only compared by its length.
+        :return: The summary of the predictions.
+        :raises ValueError: If the directory holds predictions of another dataset, chunk size or model.
+        """
+        dataset = datamodule.dataset
+        length = len(dataset)
+        os.makedirs(output_dir, exist_ok=True)
+        manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+        manifest = self._load_manifest(manifest_path, length, model_fingerprint, dataset_hash)
+
+        was_training = task.training
+        task.eval()
+        try:
+            for index, start in enumerate(range(0, length, self._chunk_size)):
+                if str(index) in manifest[MANIFEST_CHUNKS]:
+                    continue
+                end = min(start + self._chunk_size, length)
+                manifest[MANIFEST_CHUNKS][str(index)] = self._predict_chunk(task, datamodule, dataset, index, start,
+                                                                            end, output_dir)
+                write_atomic(manifest_path, json.dumps(manifest))
+        finally:
+            task.train(was_training)
+        return summarize_predictions(manifest, output_dir)
+
+    def _load_manifest(self, manifest_path: str, length: int, model_fingerprint: str,
+                       dataset_hash: Optional[str]) -> dict:
+        """
+        Loads the manifest of an earlier prediction or creates an empty one.
+
+        :param manifest_path: The path of the manifest.
+        :param length: The number of samples of the dataset.
+        :param model_fingerprint: The hash of the model weights.
+        :param dataset_hash: The content hash of the database, None if it is not known.
+        :return: The manifest.
+        :raises ValueError: If the earlier prediction used a different dataset length, database content, chunk size or
+        model.
+        """
+        try:
+            with open(manifest_path) as manifest_file:
+                manifest = json.load(manifest_file)
+        except FileNotFoundError:
+            return {MANIFEST_LENGTH: length, MANIFEST_CHUNK_SIZE: self._chunk_size,
+                    MANIFEST_MODEL_FINGERPRINT: model_fingerprint, MANIFEST_DATASET_HASH: dataset_hash,
+                    MANIFEST_CHUNKS: {}}
+
+        if manifest[MANIFEST_LENGTH] != length or manifest[MANIFEST_CHUNK_SIZE] != self._chunk_size:
+            raise ValueError(RESUME_MISMATCH_MSG.format(path=os.path.dirname(manifest_path),
+                                                        length=manifest[MANIFEST_LENGTH],
+                                                        chunk_size=manifest[MANIFEST_CHUNK_SIZE]))
+        if manifest.get(MANIFEST_MODEL_FINGERPRINT) != model_fingerprint:
+            raise ValueError(MODEL_MISMATCH_MSG.format(path=os.path.dirname(manifest_path)))
+        if manifest.get(MANIFEST_DATASET_HASH) != dataset_hash:
+            raise ValueError(DATASET_MISMATCH_MSG.format(path=os.path.dirname(manifest_path)))
+        return manifest
+
+    def _predict_chunk(self, task, datamodule, dataset, index: int, start: int, end: int, output_dir: str) -> dict:
+        """
+        Predicts the samples of one chunk into temporary memory-mapped files that are renamed when complete.
+
+        :param task: The trained LightningModule.
+        :param datamodule: The datamodule providing the test transforms.
+        :param dataset: The full dataset.
+        :param index: The index of the chunk.
+        :param start: The first sample of the chunk.
+        :param end: The end of the chunk, exclusive.
+        :param output_dir: The directory of the chunks.
+        :return: The manifest entry of the chunk.
+        """
+        import torch
+        from schnetpack import properties
+        from schnetpack.data import AtomsLoader
+
+        subset = dataset.subset(list(range(start, end)))
+        subset.transforms = datamodule.test_transforms
+        loader = AtomsLoader(subset, batch_size=self._batch_size, num_workers=self._num_workers, shuffle=False,
+                             pin_memory=False)
+        output_names = [output.name for output in task.outputs]
+        # Models predicting derivatives, e.g. forces, need autograd, all others run without it
+        if getattr(task.model, "required_derivatives", None):
+            context = torch.enable_grad()
+        else:
+            context = torch.inference_mode()
+
+        arrays: Dict[str, np.ndarray] = {}
+        paths: Dict[str, str] = {}
+        position = 0
+        with context:
+            for batch in loader:
+                batch = {key: value.to(task.device) for key, value in batch.items()}
+                outputs = task(batch)
+                samples = len(batch[properties.n_atoms])
+                for name in output_names:
+                    prediction = outputs[name].detach()
+                    # Outputs with one row per atom do not fit the per-sample chunks and are skipped
+                    if prediction.shape[0] != samples:
+                        continue
+                    values = prediction.reshape(samples, -1).cpu().numpy()
+                    if name not in arrays:
+                        paths[name] = os.path.join(output_dir, CHUNK_FILE_FORMAT.format(output=name, index=index))
+                        arrays[name] = np.lib.format.open_memmap(TEMPORARY_FILE_FORMAT.format(path=paths[name]),
+                                                                 "w+", PREDICTION_DTYPE, (end - start, values.shape[1]))
+                    arrays[name][position:position + samples] = values
+                position += samples
+
+        stats = {}
+        for name, array in arrays.items():
+            array.flush()
+            stats[name] = _chunk_stats(array)
+        arrays.clear()
+        for name, path in paths.items():
+            os.replace(TEMPORARY_FILE_FORMAT.format(path=path), path)
+        return {CHUNK_START: start, CHUNK_END: end, CHUNK_STATS: stats}
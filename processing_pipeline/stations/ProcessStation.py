@@ -1,17 +1,45 @@
+import logging
 from abc import abstractmethod, ABC
-from typing import Dict
+from typing import Dict, TYPE_CHECKING
 
 import pandas as pd
 
 from processing_pipeline.RunDatasetKeys import DFKey
+from processing_pipeline.StructuredLogging import get_logger, log_event
 from processing_pipeline.core_elements.AdapterDataKeys import AdapterDataKey
-from processing_pipeline.core_elements.ModelAdapter import ModelAdapter
-from processing_pipeline.core_elements.ModuleAdapter import ModuleAdapter
-from processing_pipeline.core_elements.TrainerAdapter import TrainerAdapter
-from processing_pipeline.description_enums import ProcessType, DataOrigin
+from processing_pipeline.description_enums import ProcessType, DataOrigin, PacketAnnotation
 from processing_pipeline.packets.InitializedRun import InitializedRun
 from processing_pipeline.packets.ProcessedRun import ProcessedRun
 
+if TYPE_CHECKING:
+    from processing_pipeline.core_elements.ModelAdapter import ModelAdapter
+    from processing_pipeline.core_elements.ModuleAdapter import ModuleAdapter
+    from processing_pipeline.core_elements.TrainerAdapter import TrainerAdapter
+
+RUN_NAME_FORMAT = "{model}_{module}_{trainer}"
+KEYED_RUN_NAME_FORMAT = "{name}_{run_key}"
+# The prefix of the run key in run names, long enough to tell configurations apart
+RUN_KEY_NAME_LENGTH = 16
+
+LOGGER = get_logger("process_station")
+
+
+def get_run_name(run: InitializedRun) -> str:
+    """
+    Generates the name that identifies a run across processes, e.g. to find the checkpoints of an interrupted run.
+    The name contains the run key if the run has one, so runs rebuilt with other configurations under the same
+    adapter names get other names.
+
+    :param run: The InitializedRun.
+    :return: The name of the run.
+    """
+    name = RUN_NAME_FORMAT.format(model=run.model_adapter.name, module=run.module_adapter.name,
+                                  trainer=run.trainer_adapter.name)
+    run_key = run.get_annotation(PacketAnnotation.RUN_KEY)
+    if run_key is None:
+        return name
+    return KEYED_RUN_NAME_FORMAT.format(name=name, run_key=run_key[:RUN_KEY_NAME_LENGTH])
+
 
 def switch_key(data_dict: Dict[AdapterDataKey, pd.DataFrame], origin):
     """
@@ -46,11 +74,16 @@ class TrainingStation(ProcessStation):
     A process station that handles the training phase of the pipeline.
     """
 
-    def __init__(self):
+    def __init__(self, resume: bool = True):
         """
         Initialize the TrainingStation with the process type set to TRAIN.
+
+        :param resume: True to resume an interrupted run from its last checkpoint, False to always train from
+        scratch. Runs without a run key are never resumed, their checkpoints can not be told apart from checkpoints
+        of other configurations with the same adapter names.
         """
         self._process_type: ProcessType = ProcessType.TRAIN
+        self._resume = resume
 
     def process(self, run: InitializedRun) -> ProcessedRun:
         """
@@ -65,7 +98,18 @@ class TrainingStation(ProcessStation):
         module_adapter: ModuleAdapter = run.module_adapter
         trainer_adapter: TrainerAdapter = run.trainer_adapter
 
-        trainer_adapter.train(model_adapter.model, module_adapter.module)
+        run_key = run.get_annotation(PacketAnnotation.RUN_KEY)
+        run_name = get_run_name(run)
+        ckpt_path = trainer_adapter.prepare_checkpoints(run_name)
+        if not self._resume or run_key is None:
+            ckpt_path = None
+        if ckpt_path is not None:
+            log_event(LOGGER, logging.INFO, "run_resumed", run=run_name, checkpoint=ckpt_path)
+
+        trainer_adapter.train(model_adapter.model, module_adapter.module, ckpt_path)
+        final_checkpoint = trainer_adapter.complete_checkpoints(run_key)
+        if run_key is not None:
+            model_adapter.record_training(run_key)
 
         trainer_adapter.finalize()
         trainer_logging = trainer_adapter.last_logs
@@ -84,9 +128,12 @@ class TrainingStation(ProcessStation):
 
         joined_dict = {**trainer_logging, **model_logging}
 
-        return ProcessedRun(model_adapter, module_adapter, trainer_adapter,
-                            run.model_metadata, run.module_metadata, run.trainer_metadata,
-                            self._process_type, joined_dict)
+        processed_run = ProcessedRun(model_adapter, module_adapter, trainer_adapter,
+                                     run.model_metadata, run.module_metadata, run.trainer_metadata,
+                                     self._process_type, joined_dict)
+        if final_checkpoint is not None:
+            processed_run.annotate(PacketAnnotation.CHECKPOINT, final_checkpoint)
+        return processed_run
 
 
 class TestingStation(ProcessStation):
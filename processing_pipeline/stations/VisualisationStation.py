@@ -1,6 +1,6 @@
 import pandas as pd
-from matplotlib import pyplot as plt
 
+from processing_pipeline.FigureSpecs import LinePlotSpec
 from processing_pipeline.RunDatasetKeys import FigKey
 from processing_pipeline.description_enums import AbstractionLevel, Column
 from processing_pipeline.packets.ProcessedRun import ProcessedRun
@@ -9,7 +9,8 @@ from processing_pipeline.packets.VisualizedRun import VisualizedRun
 
 class VisualisationStation:
     """
-    A station in the processing pipeline responsible for visualizing data from a processed run.
+    A station in the processing pipeline responsible for visualizing data from a processed run. It only emits figure
+    specs, the figures are rendered when the run is saved.
     """
 
     def __init__(self, visualisation_method: () = None):
@@ -17,16 +18,17 @@ class VisualisationStation:
         Initialize the VisualisationStation with an optional visualization method.
 
         :param visualisation_method: A callable for custom visualization, taking fig, ax, x_axis, and y_axis as
-        parameters.
+        parameters. It is called when the figure is rendered and has to be picklable to be rendered in another
+        process.
         """
         self._visualisation_method = visualisation_method
 
     def process(self, run: ProcessedRun) -> VisualizedRun:
         """
-        Process the given ProcessedRun to produce a VisualizedRun with generated figures.
+        Process the given ProcessedRun to produce a VisualizedRun with figure specs.
 
         :param run: The ProcessedRun to process.
-        :return: The resulting VisualizedRun with data frames and figures.
+        :return: The resulting VisualizedRun with data frames and figure specs.
         """
         assert isinstance(run, ProcessedRun)
 
@@ -39,7 +41,7 @@ class VisualisationStation:
         for key in epoch_keys:
             epoch_data_df = run.get_df(key)
             new_figures = self.plot_epoch_data(epoch_data_df)
-            key_figures: dict[FigKey, plt] = {FigKey(key.data_origin, key.abstraction_level,
+            key_figures: dict[FigKey, LinePlotSpec] = {FigKey(key.data_origin, key.abstraction_level,
                                                      column, key.phase): figure
                                               for column, figure in new_figures.items()}
             figures.update(key_figures)
@@ -50,32 +52,21 @@ class VisualisationStation:
 
     def plot_epoch_data(self, epoch_data: pd.DataFrame):
         """
-        Plot the data for each epoch and return the generated figures.
+        Describe a plot of the data for each epoch column.
 
         :param epoch_data: The data frame containing epoch data.
-        :return: A dictionary mapping columns to matplotlib figures.
+        :return: A dictionary mapping columns to line plot specs.
         """
         figures = {}
         for epoch_column in epoch_data.columns:
             if epoch_column is Column.EPOCH:
                 continue
 
-            x_axis = epoch_data[Column.EPOCH]
-            y_axis = epoch_data[epoch_column]
+            x_axis = epoch_data[Column.EPOCH].to_numpy()
+            y_axis = epoch_data[epoch_column].to_numpy()
 
-            fig, ax = plt.subplots()
-
-            if self._visualisation_method is not None:
-                self._visualisation_method(fig, ax, x_axis, y_axis)
-
-            # Plot
-            ax.plot(x_axis, y_axis, label=epoch_column.value)
-            ax.set_xlabel(AbstractionLevel.EPOCH)
-            ax.set_ylabel(epoch_column.value)
-            ax.set_title(f'{epoch_column.value} vs {AbstractionLevel.EPOCH}')
-
-            ax.legend()
-            ax.grid(True)
-
-            figures[epoch_column] = fig
+            figures[epoch_column] = LinePlotSpec(x_axis, y_axis, epoch_column.value, AbstractionLevel.EPOCH.value,
+                                                 epoch_column.value,
+                                                 f'{epoch_column.value} vs {AbstractionLevel.EPOCH.value}',
+                                                 self._visualisation_method)
         return figures
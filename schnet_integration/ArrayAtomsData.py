@@ -0,0 +1,385 @@
+import json
+import os
+import shutil
+import warnings
+from typing import Dict, List, Optional
+
+import numpy as np
+import torch
+from ase.db import connect
+from schnetpack import properties
+from schnetpack.data import ASEAtomsData, AtomsDataModule, BaseAtomsData
+
+from processing_pipeline.ContentHash import canonical_hash
+from processing_pipeline.FileLock import FileLock
+from processing_pipeline.SharedArrayRegistry import get_registry
+
+ARRAY_DIR_FORMAT = "{db_path}.arrays"
+LOCK_FILE_NAME = ".lock"
+TEMPORARY_SUFFIX = ".tmp"
+MANIFEST_FILE = "manifest.json"
+ARRAY_FILE_FORMAT = "{name}.npy"
+PTR_FILE_FORMAT = "{name}.ptr.npy"
+
+ATOMS_PTR = "_atoms_ptr"
+STRUCTURE_ARRAYS = (properties.Z, properties.R, properties.cell, properties.pbc)
+
+MANIFEST_LENGTH = "length"
+MANIFEST_PROPERTIES = "properties"
+MANIFEST_UNITS = "units"
+MANIFEST_DISTANCE_UNIT = "distance_unit"
+MANIFEST_METADATA = "metadata"
+
+# Copy-on-write mappings give writable arrays, so served tensors need no copy. In-place writes never reach the files,
+# but they stay visible in the writing process
+MMAP_MODE = "c"
+
+READ_ONLY_MSG = ("ArrayAtomsData is converted from a database and is read only, update the metadata of the database "
+                 "and convert it again.")
+
+
+def as_tensor(array: np.ndarray) -> torch.Tensor:
+    """
+    Wraps an array in a tensor without copying. Shared arrays are read only, torch's warning about non-writable
+    arrays is suppressed for them.
+
+    :param array: The array to wrap.
+    :return: A tensor sharing the memory of the array.
+    """
+    if array.flags.writeable:
+        return torch.from_numpy(array)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        return torch.from_numpy(array)
+
+
+def convert_db_to_arrays(db_path: str, array_dir: str, distance_unit: str, property_units: Dict[str, str]):
+    """
+    Converts a database once into contiguous arrays: atomic numbers and positions of all atoms, cells, pbc and every
+    property, each with a pointer array giving the rows of every sample. Units are converted while converting. The
+    arrays are written to a temporary directory that is renamed when complete.
+
+    :param db_path: The path of the ASE database.
+    :param array_dir: The directory of the arrays.
+    :param distance_unit: The distance unit positions and cells are converted to.
+    :param property_units: A dictionary mapping property names to the units they are converted to, None converts
+    all properties in their database units.
+    """
+    # The first pass only reads the atom counts, so the structure arrays are preallocated on disk
+    connection = connect(db_path)
+    n_atoms = np.array([row.natoms for row in connection.select(include_data=False)], dtype=np.int64)
+    length = len(n_atoms)
+    atoms_ptr = np.zeros(length + 1, dtype=np.int64)
+    np.cumsum(n_atoms, out=atoms_ptr[1:])
+
+    temporary_dir = array_dir + TEMPORARY_SUFFIX
+    shutil.rmtree(temporary_dir, ignore_errors=True)
+    os.makedirs(temporary_dir)
+
+    def array_path(name):
+        return os.path.join(temporary_dir, ARRAY_FILE_FORMAT.format(name=name))
+
+    total_atoms = int(atoms_ptr[-1])
+    numbers = np.lib.format.open_memmap(array_path(properties.Z), "w+", np.int64, (total_atoms,))
+    positions = np.lib.format.open_memmap(array_path(properties.R), "w+", np.float64, (total_atoms, 3))
+    cells = np.lib.format.open_memmap(array_path(properties.cell), "w+", np.float64, (length, 3, 3))
+    pbc = np.lib.format.open_memmap(array_path(properties.pbc), "w+", np.bool_, (length, 3))
+
+    dataset = ASEAtomsData(db_path, distance_unit=distance_unit, property_units=property_units)
+    property_names = list(property_units.keys()) if property_units else list(dataset.available_properties)
+    units = {name: (property_units or {}).get(name, dataset.units[name]) for name in property_names}
+    property_rows: Dict[str, List[np.ndarray]] = {name: [] for name in property_names}
+    for idx in range(length):
+        sample = dataset[idx]
+        start, end = atoms_ptr[idx], atoms_ptr[idx + 1]
+        numbers[start:end] = sample[properties.Z].numpy()
+        positions[start:end] = sample[properties.R].numpy()
+        cells[idx] = sample[properties.cell].numpy().reshape(3, 3)
+        pbc[idx] = sample[properties.pbc].numpy()
+        for name in property_names:
+            property_rows[name].append(np.atleast_1d(sample[name].numpy()))
+
+    for array in (numbers, positions, cells, pbc):
+        array.flush()
+    np.save(array_path(ATOMS_PTR), atoms_ptr)
+    for name, rows in property_rows.items():
+        ptr = np.zeros(length + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=ptr[1:])
+        np.save(array_path(name), np.concatenate(rows) if rows else np.empty(0))
+        np.save(os.path.join(temporary_dir, PTR_FILE_FORMAT.format(name=name)), ptr)
+
+    manifest = {MANIFEST_LENGTH: length, MANIFEST_PROPERTIES: property_names, MANIFEST_UNITS: units,
+                MANIFEST_DISTANCE_UNIT: distance_unit, MANIFEST_METADATA: dataset.metadata}
+    with open(os.path.join(temporary_dir, MANIFEST_FILE), "w") as manifest_file:
+        json.dump(manifest, manifest_file)
+    os.replace(temporary_dir, array_dir)
+
+
+def get_or_convert_arrays(db_path: str, db_hash: str, distance_unit: str, property_units: Dict[str, str]) -> str:
+    """
+    Returns the array directory of a database in the given units, converting the database once if it does not exist.
+
+    :param db_path: The path of the ASE database.
+    :param db_hash: The content hash of the database.
+    :param distance_unit: The distance unit positions and cells are converted to.
+    :param property_units: A dictionary mapping property names to the units they are converted to.
+    :return: The array directory.
+    """
+    array_root = ARRAY_DIR_FORMAT.format(db_path=db_path)
+    os.makedirs(array_root, exist_ok=True)
+    key = canonical_hash({"db": db_hash, "distance_unit": distance_unit, "property_units": property_units})
+    array_dir = os.path.join(array_root, key)
+    if os.path.isdir(array_dir):
+        return array_dir
+
+    with FileLock(os.path.join(array_root, LOCK_FILE_NAME)):
+        if not os.path.isdir(array_dir):
+            convert_db_to_arrays(db_path, array_dir, distance_unit, property_units)
+    return array_dir
+
+
+class ArrayAtomsData(BaseAtomsData):
+    """
+    A schnetpack dataset serving samples from memory-mapped arrays converted from a database. Atomic numbers and
+    positions are served as zero-copy slices, the small per-sample properties are copied, so transforms modifying
+    them in place, like RemoveOffsets, do not change the arrays. Transforms modifying positions in place must run
+    after a transform creating new tensors, like CastTo32. The dataset is read only, writing metadata or atomrefs
+    raises PermissionError.
+    """
+
+    def __init__(self, array_dir: str, load_properties: Optional[List[str]] = None, load_structure: bool = True,
+                 transforms=None, subset_idx: Optional[List[int]] = None, shared: bool = False):
+        """
+        Initializes the ArrayAtomsData.
+
+        :param array_dir: The directory of the arrays created by convert_db_to_arrays.
+        :param load_properties: The properties to load, None loads all properties.
+        :param load_structure: True loads atomic numbers, positions, cell and pbc.
+        :param transforms: The transforms applied to every sample.
+        :param subset_idx: The indices of the samples of this subset.
+        :param shared: True attaches to one shared memory copy of the arrays per host instead of mapping the files,
+        so DataLoader workers and parallel runs share one copy in RAM.
+        """
+        self.array_dir = array_dir
+        self.shared = shared
+        with open(os.path.join(array_dir, MANIFEST_FILE)) as manifest_file:
+            self._manifest = json.load(manifest_file)
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+        super().__init__(load_properties=load_properties, load_structure=load_structure, transforms=transforms,
+                         subset_idx=subset_idx)
+
+    def __getstate__(self):
+        """
+        Drops the arrays when the dataset is sent to DataLoader workers, they map or attach the arrays themselves.
+
+        :return: The state of the dataset.
+        """
+        state = self.__dict__.copy()
+        state["_arrays"] = None
+        return state
+
+    def _get_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Memory maps or attaches the arrays on first use.
+
+        :return: A dictionary mapping array names to arrays.
+        """
+        if self._arrays is None:
+            self._arrays = {name: self._load_array(file_name) for name, file_name in self._array_files().items()}
+        return self._arrays
+
+    def _array_files(self) -> Dict[str, str]:
+        """
+        Lists the array files of the dataset.
+
+        :return: A dictionary mapping array names to file names.
+        """
+        names = [*STRUCTURE_ARRAYS, ATOMS_PTR, *self.available_properties]
+        files = {name: ARRAY_FILE_FORMAT.format(name=name) for name in names}
+        files.update({PTR_FILE_FORMAT.format(name=name): PTR_FILE_FORMAT.format(name=name)
+                      for name in self.available_properties})
+        return files
+
+    def _load_array(self, file_name: str) -> np.ndarray:
+        """
+        Memory maps an array file, or attaches to its shared memory copy.
+
+        :param file_name: The name of the array file.
+        :return: The array.
+        """
+        path = os.path.join(self.array_dir, file_name)
+        if self.shared:
+            return get_registry(self.array_dir).attach(path)
+        return np.load(path, mmap_mode=MMAP_MODE)
+
+    def close(self):
+        """
+        Drops the arrays of this process, shared memory copies are released and unlinked once no process holds them.
+        """
+        self._arrays = None
+        if self.shared:
+            registry = get_registry(self.array_dir)
+            for file_name in self._array_files().values():
+                try:
+                    registry.release(os.path.join(self.array_dir, file_name))
+                except KeyError:
+                    pass
+
+    def __len__(self) -> int:
+        if self.subset_idx is not None:
+            return len(self.subset_idx)
+        return self._manifest[MANIFEST_LENGTH]
+
+    def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
+        if self.subset_idx is not None:
+            idx = self.subset_idx[idx]
+        sample = self._get_properties(idx, self.load_properties, self.load_structure)
+        for transform in self.transforms:
+            sample = transform(sample)
+        return sample
+
+    def _get_properties(self, idx: int, load_properties: List[str], load_structure: bool) -> Dict[str, torch.Tensor]:
+        """
+        Builds the inputs of one sample from the arrays.
+
+        :param idx: The index of the sample in the full dataset.
+        :param load_properties: The properties to load.
+        :param load_structure: True loads atomic numbers, positions, cell and pbc.
+        :return: A dictionary mapping property names to tensors.
+        """
+        arrays = self._get_arrays()
+        start, end = int(arrays[ATOMS_PTR][idx]), int(arrays[ATOMS_PTR][idx + 1])
+        sample = {properties.idx: torch.tensor([idx]), properties.n_atoms: torch.tensor([end - start])}
+        for name in load_properties:
+            ptr = arrays[PTR_FILE_FORMAT.format(name=name)]
+            sample[name] = torch.from_numpy(np.array(arrays[name][ptr[idx]:ptr[idx + 1]]))
+        if load_structure:
+            sample[properties.Z] = as_tensor(arrays[properties.Z][start:end])
+            sample[properties.R] = as_tensor(arrays[properties.R][start:end])
+            sample[properties.cell] = as_tensor(arrays[properties.cell][idx:idx + 1])
+            sample[properties.pbc] = as_tensor(arrays[properties.pbc][idx])
+        return sample
+
+    def iter_properties(self, indices=None, load_properties: Optional[List[str]] = None,
+                        load_structure: Optional[bool] = None):
+        if load_properties is None:
+            load_properties = self.load_properties
+        if load_structure is None:
+            load_structure = self.load_structure
+        if indices is None:
+            indices = range(len(self))
+        elif isinstance(indices, int):
+            indices = [indices]
+        for idx in indices:
+            if self.subset_idx is not None:
+                idx = self.subset_idx[idx]
+            yield self._get_properties(idx, load_properties, load_structure)
+
+    @property
+    def available_properties(self) -> List[str]:
+        return self._manifest[MANIFEST_PROPERTIES]
+
+    @property
+    def units(self) -> Dict[str, str]:
+        return self._manifest[MANIFEST_UNITS]
+
+    @property
+    def distance_unit(self) -> str:
+        return self._manifest[MANIFEST_DISTANCE_UNIT]
+
+    @property
+    def metadata(self) -> dict:
+        return self._manifest[MANIFEST_METADATA]
+
+    @property
+    def atomrefs(self) -> Dict[str, torch.Tensor]:
+        atomrefs = self.metadata.get("atomrefs", {})
+        return {key: torch.tensor(value) for key, value in atomrefs.items()}
+
+    def update_metadata(self, **kwargs):
+        """
+        Rejects metadata updates, the arrays are converted from the database and the metadata is part of them.
+
+        :raises PermissionError: Always, the dataset is read only.
+        """
+        raise PermissionError(READ_ONLY_MSG)
+
+    def _set_metadata(self, val: dict):
+        """
+        Rejects metadata updates, the arrays are converted from the database and the metadata is part of them.
+
+        :raises PermissionError: Always, the dataset is read only.
+        """
+        raise PermissionError(READ_ONLY_MSG)
+
+    def update_atomrefs(self, atomrefs, is_per_atom: bool):
+        """
+        Rejects atomref updates, the arrays are converted from the database and the atomrefs are part of them.
+
+        :raises PermissionError: Always, the dataset is read only.
+        """
+        raise PermissionError(READ_ONLY_MSG)
+
+    @staticmethod
+    def create(*args, **kwargs):
+        """
+        Rejects creating a dataset, array datasets are only converted from a database by get_or_convert_arrays.
+
+        :raises PermissionError: Always, the dataset is read only.
+        """
+        raise PermissionError(READ_ONLY_MSG)
+
+    def add_systems(self, *args, **kwargs):
+        """
+        Rejects adding systems, the arrays are converted from the database.
+
+        :raises PermissionError: Always, the dataset is read only.
+        """
+        raise PermissionError(READ_ONLY_MSG)
+
+    def add_system(self, *args, **kwargs):
+        """
+        Rejects adding a system, the arrays are converted from the database.
+
+        :raises PermissionError: Always, the dataset is read only.
+        """
+        raise PermissionError(READ_ONLY_MSG)
+
+
+class ArrayAtomsDataModule(AtomsDataModule):
+    """
+    An AtomsDataModule loading its dataset from memory-mapped arrays instead of the SQLite rows of the database. The
+    database is converted once, splits, transforms and dataloaders behave like in AtomsDataModule.
+    """
+
+    def __init__(self, datapath: str, db_hash: str, shared: bool = False, **kwargs):
+        """
+        Initializes the ArrayAtomsDataModule.
+
+        :param datapath: The path of the ASE database.
+        :param db_hash: The content hash of the database, it keys the converted arrays.
+        :param shared: True serves the arrays from one shared memory copy per host.
+        :param kwargs: The arguments of AtomsDataModule.
+        """
+        super().__init__(datapath, **kwargs)
+        self._db_hash = db_hash
+        self._shared = shared
+
+    def setup(self, stage: Optional[str] = None):
+        """
+        Loads the dataset from the converted arrays, partitions it and sets up the transforms. AtomsDataModule.setup
+        only partitions a dataset it loaded itself, so its steps are repeated here for the array dataset. The arrays
+        are already local, data_workdir is not used.
+
+        :param stage: The Lightning stage, all partitions are set up for every stage.
+        """
+        if self.dataset is not None:
+            return
+        array_dir = get_or_convert_arrays(self.datapath, self._db_hash, self.distance_unit, self.property_units)
+        self.dataset = ArrayAtomsData(array_dir, load_properties=self.load_properties, shared=self._shared)
+        if self.train_idx is None:
+            self._load_partitions()
+        self._train_dataset = self.dataset.subset(self.train_idx)
+        self._val_dataset = self.dataset.subset(self.val_idx)
+        self._test_dataset = self.dataset.subset(self.test_idx)
+        self._setup_transforms()
@@ -0,0 +1,182 @@
+import logging
+import os
+import tempfile
+import threading
+from typing import Optional
+
+import torch
+import torch._dynamo.exc as dynamo_exc
+import torch.nn as nn
+
+from processing_pipeline.StructuredLogging import get_logger, log_event
+
+EAGER_MODE = "eager"
+COMPILE_MODE = "compile"
+SCRIPT_MODE = "script"
+COMPILE_MODES = (EAGER_MODE, COMPILE_MODE, SCRIPT_MODE)
+
+DEF_COMPILE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "ml_pipeline_compile_cache")
+INDUCTOR_CACHE_ENV = "TORCHINDUCTOR_CACHE_DIR"
+
+UNKNOWN_COMPILE_MODE_MSG = "Unknown compile mode {mode}, supported modes are {modes}."
+
+LOGGER = get_logger("compiled_network")
+
+NETWORK_PREFIX = "network."
+
+# Failures of the compilers on code they do not support, any other exception of a compiled call is an error of the
+# network and is raised
+COMPILE_ERRORS = (dynamo_exc.BackendCompilerFailed, dynamo_exc.Unsupported)
+SCRIPT_ERRORS = (torch.jit.frontend.FrontendError, RuntimeError)
+
+_INDUCTOR_CACHE_LOCK = threading.Lock()
+
+
+def set_inductor_cache(cache_dir: str):
+    """
+    Points the inductor cache of torch.compile to the given directory for the rest of the process. Kernels are
+    compiled lazily, the backward graph at the first backward pass and recompilations at later calls, so the cache
+    directory can not be limited to a single call. If the cache directory of the process is already set, it is kept
+    and the networks share it, the cache is keyed by the content of the kernels, so this only affects where they are
+    stored.
+
+    :param cache_dir: The cache directory.
+    """
+    with _INDUCTOR_CACHE_LOCK:
+        current = os.environ.setdefault(INDUCTOR_CACHE_ENV, cache_dir)
+    if current != cache_dir:
+        log_event(LOGGER, logging.INFO, "compile_cache_in_use", cache_dir=current, requested=cache_dir)
+
+
+class CompiledNetwork(nn.Module):
+    """
+    CompiledNetwork runs a network with torch.compile or TorchScript while keeping the eager network as its only
+    submodule. State dicts are saved and loaded without the prefix of the submodule, so checkpoints of the eager and
+    the compiled network are interchangeable. Attributes of the network, e.g. its postprocessors, are forwarded. If
+    the compiler does not support the network, the network falls back to eager execution for the rest of its lifetime,
+    other errors of compiled calls are raised.
+    """
+
+    def __init__(self, network: nn.Module, mode: str = COMPILE_MODE, cache_dir: Optional[str] = None):
+        """
+        Initializes the CompiledNetwork.
+
+        :param network: The eager network.
+        :param mode: COMPILE_MODE uses torch.compile, SCRIPT_MODE uses TorchScript, EAGER_MODE runs the network as is.
+        :param cache_dir: The directory compiled kernels are cached in, keyed by the caller. It is set for the whole
+        process when the network is compiled, see set_inductor_cache. None uses the default inductor cache.
+        :raises ValueError: If the mode is not supported.
+        """
+        if mode not in COMPILE_MODES:
+            raise ValueError(UNKNOWN_COMPILE_MODE_MSG.format(mode=mode, modes=COMPILE_MODES))
+        super().__init__()
+        self.network = network
+        self.mode = mode
+        self.cache_dir = cache_dir
+        # The compiled callable shares the parameters of the network, it is kept out of the submodules so it does not
+        # appear twice in state dicts
+        self.__dict__["_compiled"] = None
+        if mode == SCRIPT_MODE:
+            self._compile()
+
+    def __getattr__(self, name: str):
+        """
+        Forwards attributes that are not parameters, buffers or submodules of the wrapper to the eager network.
+
+        :param name: The name of the attribute.
+        :return: The attribute.
+        """
+        try:
+            return super().__getattr__(name)
+        except AttributeError:
+            return getattr(self._modules["network"], name)
+
+    def __getstate__(self):
+        """
+        Drops the compiled callable when the network is pickled, it is compiled again on first use.
+
+        :return: The state of the network.
+        """
+        state = self.__dict__.copy()
+        state["_compiled"] = None
+        return state
+
+    def state_dict(self, *args, destination=None, prefix: str = "", keep_vars: bool = False):
+        """
+        Returns the state dict of the eager network, the wrapper has no state of its own and adds no prefix.
+
+        :param destination: The dictionary the state is added to, None creates a new one.
+        :param prefix: The prefix of the keys.
+        :param keep_vars: True to return the parameters instead of detached tensors.
+        :return: The state dict.
+        """
+        return self._modules["network"].state_dict(*args, destination=destination, prefix=prefix,
+                                                   keep_vars=keep_vars)
+
+    def _load_from_state_dict(self, state_dict, prefix, local_metadata, strict, missing_keys, unexpected_keys,
+                              error_msgs):
+        """
+        Moves the keys of the eager network below the prefix of the submodule before the submodule loads them. Keys
+        that already carry the prefix, from checkpoints saved by earlier versions of the wrapper, are kept.
+
+        :param state_dict: The state dict being loaded, it is modified in place.
+        :param prefix: The prefix of the keys of the wrapper.
+        :param local_metadata: The metadata of the wrapper.
+        :param strict: True to report missing and unexpected keys.
+        :param missing_keys: The list missing keys are added to.
+        :param unexpected_keys: The list unexpected keys are added to.
+        :param error_msgs: The list error messages are added to.
+        """
+        for key in [key for key in state_dict if key.startswith(prefix)]:
+            if not key.startswith(prefix + NETWORK_PREFIX):
+                state_dict[prefix + NETWORK_PREFIX + key[len(prefix):]] = state_dict.pop(key)
+        super()._load_from_state_dict(state_dict, prefix, local_metadata, strict, missing_keys, unexpected_keys,
+                                      error_msgs)
+
+    def _compile(self):
+        """
+        Compiles the network, falling back to eager execution if TorchScript does not support it. torch.compile
+        compiles at the first call, the cache directory is set before.
+        """
+        if self.mode == SCRIPT_MODE:
+            try:
+                self.__dict__["_compiled"] = torch.jit.script(self.network)
+            except SCRIPT_ERRORS as exception:
+                self._fall_back(exception)
+            return
+        if self.cache_dir is not None:
+            set_inductor_cache(self.cache_dir)
+        self.__dict__["_compiled"] = torch.compile(self.network, dynamic=True)
+
+    def _fall_back(self, exception: Exception):
+        """
+        Switches to eager execution for the rest of the lifetime of the network.
+
+        :param exception: The exception of the compiler.
+        """
+        log_event(LOGGER, logging.WARNING, "compile_fallback", mode=self.mode, error=repr(exception))
+        self.mode = EAGER_MODE
+        self.__dict__["_compiled"] = None
+
+    def forward(self, inputs):
+        """
+        Runs the compiled network, or the eager network if compilation is disabled or failed.
+
+        :param inputs: The inputs of the network.
+        :return: The outputs of the network.
+        """
+        if self.mode == EAGER_MODE:
+            return self.network(inputs)
+        if self._compiled is None:
+            self._compile()
+            if self.mode == EAGER_MODE:
+                return self.network(inputs)
+
+        if self.mode == SCRIPT_MODE:
+            return self._compiled(inputs)
+        try:
+            return self._compiled(inputs)
+        except COMPILE_ERRORS as exception:
+            # torch.compile compiles at the call, graphs the compiler does not support are retried eagerly
+            self._fall_back(exception)
+            return self.network(inputs)
@@ -0,0 +1,96 @@
+import json
+import os
+from typing import Optional
+
+from ase.db import connect
+from schnetpack.data import ASEAtomsData
+
+from processing_pipeline.ContentHash import file_content_hash
+from processing_pipeline.FileLock import FileLock, write_atomic
+
+METADATA_FILE_FORMAT = "{db_path}.meta.json"
+LOCK_FILE_FORMAT = "{db_path}.meta.lock"
+
+METADATA_SIZE = "size"
+METADATA_MTIME = "mtime_ns"
+METADATA_ROWS = "rows"
+METADATA_DISTANCE_UNIT = "distance_unit"
+METADATA_UNITS = "units"
+METADATA_SHAPES = "shapes"
+METADATA_ELEMENTS = "elements"
+METADATA_HASH = "content_hash"
+
+
+def _file_stamp(db_path: str) -> dict:
+    """
+    Returns the size and modification time of the database, they identify the file content the metadata belongs to.
+
+    :param db_path: The path of the database.
+    :return: A dictionary with the size and the modification time in nanoseconds.
+    """
+    stat = os.stat(db_path)
+    return {METADATA_SIZE: stat.st_size, METADATA_MTIME: stat.st_mtime_ns}
+
+
+def collect_metadata(db_path: str) -> dict:
+    """
+    Reads the metadata of a database: row count, units, the shapes of the properties of the first row, the set of
+    elements and the content hash. Only the atomic numbers of the other rows are read.
+
+    :param db_path: The path of the database.
+    :return: The metadata of the database.
+    """
+    stamp = _file_stamp(db_path)
+    dataset = ASEAtomsData(db_path)
+    rows = len(dataset)
+    shapes = {}
+    if rows:
+        example = dataset[0]
+        shapes = {prop: list(example[prop].shape) for prop in dataset.available_properties}
+
+    elements = set()
+    for row in connect(db_path).select(include_data=False):
+        elements.update(int(number) for number in row.numbers)
+
+    return {**stamp, METADATA_ROWS: rows, METADATA_DISTANCE_UNIT: dataset.distance_unit,
+            METADATA_UNITS: dict(dataset.units), METADATA_SHAPES: shapes, METADATA_ELEMENTS: sorted(elements),
+            METADATA_HASH: file_content_hash(db_path)}
+
+
+def read_metadata(db_path: str) -> Optional[dict]:
+    """
+    Reads the metadata sidecar of a database if it is still valid, it is valid if the size and modification time of
+    the database did not change since it was written.
+
+    :param db_path: The path of the database.
+    :return: The metadata, or None if the sidecar does not exist or is outdated.
+    """
+    try:
+        with open(METADATA_FILE_FORMAT.format(db_path=db_path)) as metadata_file:
+            metadata = json.load(metadata_file)
+    except (FileNotFoundError, ValueError):
+        return None
+    stamp = _file_stamp(db_path)
+    if any(metadata.get(key) != value for key, value in stamp.items()):
+        return None
+    return metadata
+
+
+def get_or_create_metadata(db_path: str) -> dict:
+    """
+    Returns the metadata of a database from its sidecar, collecting and writing it once if the sidecar does not exist
+    or is outdated.
+
+    :param db_path: The path of the database.
+    :return: The metadata of the database.
+    """
+    metadata = read_metadata(db_path)
+    if metadata is not None:
+        return metadata
+
+    with FileLock(LOCK_FILE_FORMAT.format(db_path=db_path)):
+        metadata = read_metadata(db_path)
+        if metadata is None:
+            metadata = collect_metadata(db_path)
+            write_atomic(METADATA_FILE_FORMAT.format(db_path=db_path), json.dumps(metadata))
+    return metadata
@@ -0,0 +1,102 @@
+import os
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from processing_pipeline.ContentHash import canonical_hash
+from processing_pipeline.FileLock import FileLock
+
+DEF_SPLIT_SEED = 0
+SPLIT_DTYPE = np.int32
+SPLIT_KEY_LENGTH = 16
+LOCK_SUFFIX = ".lock"
+TEMPORARY_FILE_FORMAT = "{path}.{pid}.tmp.npz"
+
+TRAIN_IDX = "train_idx"
+VAL_IDX = "val_idx"
+TEST_IDX = "test_idx"
+
+SPLIT_TOO_LARGE_MSG = ("The split of {num_train} train, {num_val} validation and {num_test} test samples exceeds the "
+                       "{size} samples.")
+
+
+def get_split_key(db_hash: str, num_train: Union[int, float], num_val: Union[int, float], seed: int,
+                  num_test: Optional[Union[int, float]] = None) -> str:
+    """
+    Computes the key of a split, equal splits of the same database content share one split file.
+
+    :param db_hash: The content hash of the database.
+    :param num_train: The number or fraction of training samples.
+    :param num_val: The number or fraction of validation samples.
+    :param seed: The seed of the permutation.
+    :param num_test: The number or fraction of test samples, None for the remaining samples.
+    :return: The split key.
+    """
+    split = {"db": db_hash, "num_train": num_train, "num_val": num_val, "seed": seed}
+    # Splits with the remaining samples as test split keep the keys they had before num_test was part of the key
+    if num_test is not None:
+        split["num_test"] = num_test
+    return canonical_hash(split)[:SPLIT_KEY_LENGTH]
+
+
+def absolute_size(value: Union[int, float], size: int) -> int:
+    """
+    Converts a split size to a number of samples, fractions are taken of the dataset size like in schnetpack.
+
+    :param value: The number or fraction of samples.
+    :param size: The number of samples of the dataset.
+    :return: The number of samples.
+    """
+    if isinstance(value, float) and value < 1:
+        return int(value * size)
+    return int(value)
+
+
+def create_split(size: int, num_train: Union[int, float], num_val: Union[int, float],
+                 seed: int = DEF_SPLIT_SEED, num_test: Optional[Union[int, float]] = None) -> Dict[str, np.ndarray]:
+    """
+    Partitions the dataset by a seeded permutation.
+
+    :param size: The number of samples of the dataset.
+    :param num_train: The number or fraction of training samples.
+    :param num_val: The number or fraction of validation samples.
+    :param seed: The seed of the permutation.
+    :param num_test: The number or fraction of test samples, None uses the remaining samples.
+    :return: A dictionary with the train, validation and test indices.
+    :raises ValueError: If the splits exceed the dataset.
+    """
+    train_size, val_size = absolute_size(num_train, size), absolute_size(num_val, size)
+    test_size = size - train_size - val_size if num_test is None else absolute_size(num_test, size)
+    if train_size + val_size + max(test_size, 0) > size:
+        raise ValueError(SPLIT_TOO_LARGE_MSG.format(num_train=train_size, num_val=val_size,
+                                                    num_test=max(test_size, 0), size=size))
+
+    permutation = np.random.default_rng(seed).permutation(size).astype(SPLIT_DTYPE)
+    return {TRAIN_IDX: permutation[:train_size],
+            VAL_IDX: permutation[train_size:train_size + val_size],
+            TEST_IDX: permutation[train_size + val_size:train_size + val_size + test_size]}
+
+
+def get_or_create_split_file(path: str, size: int, num_train: Union[int, float], num_val: Union[int, float],
+                             seed: int = DEF_SPLIT_SEED, num_test: Optional[Union[int, float]] = None) -> str:
+    """
+    Writes the split file once if it does not exist. The file is written under a different name and renamed, so
+    concurrent module builds never read a partially written split.
+
+    :param path: The path of the split file, keyed by get_split_key.
+    :param size: The number of samples of the dataset.
+    :param num_train: The number or fraction of training samples.
+    :param num_val: The number or fraction of validation samples.
+    :param seed: The seed of the permutation.
+    :param num_test: The number or fraction of test samples, None uses the remaining samples.
+    :return: The path of the split file.
+    """
+    if os.path.exists(path):
+        return path
+
+    with FileLock(path + LOCK_SUFFIX):
+        if not os.path.exists(path):
+            temporary_path = TEMPORARY_FILE_FORMAT.format(path=path, pid=os.getpid())
+            np.savez(temporary_path, **create_split(size, num_train, num_val, seed, num_test))
+            os.replace(temporary_path, path)
+    return path
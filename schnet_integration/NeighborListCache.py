@@ -0,0 +1,214 @@
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import schnetpack.transform as trn
+import torch
+from schnetpack import properties
+from schnetpack.data import ASEAtomsData
+
+from processing_pipeline.ContentHash import canonical_hash
+from processing_pipeline.FileLock import FileLock
+
+CACHE_DIR_FORMAT = "{db_path}.nbl"
+LOCK_FILE_NAME = ".lock"
+TEMPORARY_SUFFIX = ".tmp"
+
+IDX_I_FILE = "idx_i.npy"
+IDX_J_FILE = "idx_j.npy"
+OFFSETS_FILE = "offsets.npy"
+PTR_FILE = "ptr.npy"
+
+INDEX_DTYPE = np.int32
+OFFSET_DTYPE = np.float32
+PTR_DTYPE = np.int64
+
+DEF_BUILD_WORKERS = os.cpu_count() or 1
+CHUNKS_PER_WORKER = 4
+BUILD_START_METHOD = "spawn"
+
+NOT_IN_CACHE_MSG = "Sample {idx} is not in the neighbor list cache {path}, the cache covers {size} samples."
+
+
+def describe_transforms(transforms: List[trn.Transform]) -> List[dict]:
+    """
+    Describes a transform chain by the class and the plain attributes of every transform, so the description changes
+    whenever the chain changes.
+
+    :param transforms: The transforms to describe.
+    :return: A JSON serializable description of the chain.
+    """
+    descriptions = []
+    for transform in transforms:
+        attributes = {key: value for key, value in vars(transform).items()
+                      if isinstance(value, (bool, int, float, str)) and key != "training"}
+        descriptions.append({"class": type(transform).__name__, "attributes": attributes})
+    return descriptions
+
+
+def get_cache_key(db_hash: str, cutoff: float, distance_unit: str, transforms: List[trn.Transform]) -> str:
+    """
+    Computes the key of a neighbor list cache.
+
+    :param db_hash: The content hash of the database.
+    :param cutoff: The cutoff radius of the neighbor list.
+    :param distance_unit: The distance unit the positions are converted to.
+    :param transforms: The transform chain the neighbor list is part of.
+    :return: The cache key.
+    """
+    return canonical_hash({"db": db_hash, "cutoff": cutoff, "distance_unit": distance_unit,
+                           "transforms": describe_transforms(transforms)})
+
+
+def _build_chunk(db_path: str, distance_unit: str, cutoff: float, start: int,
+                 end: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes the neighbor lists of a range of samples with ASENeighborList, in a worker process.
+
+    :param db_path: The path of the database.
+    :param distance_unit: The distance unit the positions are converted to.
+    :param cutoff: The cutoff radius of the neighbor list.
+    :param start: The first sample of the range.
+    :param end: The end of the range, exclusive.
+    :return: The number of pairs of every sample and the concatenated idx_i, idx_j and offsets.
+    """
+    dataset = ASEAtomsData(db_path, load_properties=[], distance_unit=distance_unit,
+                           transforms=[trn.ASENeighborList(cutoff=cutoff)])
+    counts = np.empty(end - start, dtype=PTR_DTYPE)
+    idx_i, idx_j, offsets = [np.empty(0, INDEX_DTYPE)], [np.empty(0, INDEX_DTYPE)], [np.empty((0, 3), OFFSET_DTYPE)]
+    for position, idx in enumerate(range(start, end)):
+        inputs = dataset[idx]
+        counts[position] = len(inputs[properties.idx_i])
+        idx_i.append(inputs[properties.idx_i].numpy().astype(INDEX_DTYPE))
+        idx_j.append(inputs[properties.idx_j].numpy().astype(INDEX_DTYPE))
+        offsets.append(inputs[properties.offsets].numpy().astype(OFFSET_DTYPE).reshape(-1, 3))
+    return counts, np.concatenate(idx_i), np.concatenate(idx_j), np.concatenate(offsets)
+
+
+def build_neighbor_list_cache(db_path: str, cache_dir: str, cutoff: float, distance_unit: str,
+                              workers: int = DEF_BUILD_WORKERS):
+    """
+    Builds the CSR neighbor list cache of all samples of a database in parallel. The arrays are written to a
+    temporary directory that is renamed when complete, so a cache directory is never partially written.
+
+    :param db_path: The path of the database.
+    :param cache_dir: The directory of the cache.
+    :param cutoff: The cutoff radius of the neighbor list.
+    :param distance_unit: The distance unit the positions are converted to.
+    :param workers: The number of worker processes.
+    """
+    size = len(ASEAtomsData(db_path, load_properties=[]))
+    workers = max(workers, 1)
+    chunk_size = max(1, -(-size // (workers * CHUNKS_PER_WORKER)))
+    starts = list(range(0, size, chunk_size))
+    ends = [min(start + chunk_size, size) for start in starts]
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context(BUILD_START_METHOD)) as executor:
+        chunks = list(executor.map(_build_chunk, repeat(db_path), repeat(distance_unit), repeat(cutoff), starts, ends))
+
+    counts, idx_i, idx_j, offsets = zip(*chunks) if chunks else ([], [], [], [])
+    ptr = np.zeros(size + 1, dtype=PTR_DTYPE)
+    np.cumsum(np.concatenate([np.empty(0, PTR_DTYPE), *counts]), out=ptr[1:])
+    arrays = {IDX_I_FILE: np.concatenate([np.empty(0, INDEX_DTYPE), *idx_i]),
+              IDX_J_FILE: np.concatenate([np.empty(0, INDEX_DTYPE), *idx_j]),
+              OFFSETS_FILE: np.concatenate([np.empty((0, 3), OFFSET_DTYPE), *offsets]),
+              PTR_FILE: ptr}
+
+    temporary_dir = cache_dir + TEMPORARY_SUFFIX
+    shutil.rmtree(temporary_dir, ignore_errors=True)
+    os.makedirs(temporary_dir)
+    for file_name, array in arrays.items():
+        np.save(os.path.join(temporary_dir, file_name), array)
+    os.replace(temporary_dir, cache_dir)
+
+
+def get_or_build_neighbor_list_cache(db_path: str, db_hash: str, cutoff: float, distance_unit: str,
+                                     transforms: List[trn.Transform], workers: int = DEF_BUILD_WORKERS) -> str:
+    """
+    Returns the cache directory for the given database, cutoff and transform chain, building it once if it does not
+    exist. Concurrent callers wait for the first build instead of building the cache themselves.
+
+    :param db_path: The path of the database.
+    :param db_hash: The content hash of the database.
+    :param cutoff: The cutoff radius of the neighbor list.
+    :param distance_unit: The distance unit the positions are converted to.
+    :param transforms: The transform chain the neighbor list is part of.
+    :param workers: The number of worker processes used to build the cache.
+    :return: The cache directory.
+    """
+    cache_root = CACHE_DIR_FORMAT.format(db_path=db_path)
+    os.makedirs(cache_root, exist_ok=True)
+    cache_dir = os.path.join(cache_root, get_cache_key(db_hash, cutoff, distance_unit, transforms))
+    if os.path.isdir(cache_dir):
+        return cache_dir
+
+    with FileLock(os.path.join(cache_root, LOCK_FILE_NAME)):
+        if not os.path.isdir(cache_dir):
+            build_neighbor_list_cache(db_path, cache_dir, cutoff, distance_unit, workers)
+    return cache_dir
+
+
+class CachedCSRNeighborList(trn.Transform):
+    """
+    Serves precomputed neighbor lists from a CSR cache instead of computing them per sample. The pairs of sample idx
+    are idx_i[ptr[idx]:ptr[idx + 1]], the arrays are memory mapped lazily in every DataLoader worker.
+    """
+
+    is_preprocessor: bool = True
+    is_postprocessor: bool = False
+
+    def __init__(self, cache_dir: str):
+        """
+        Initializes the CachedCSRNeighborList.
+
+        :param cache_dir: The directory of the cache built by build_neighbor_list_cache.
+        """
+        super().__init__()
+        self._cache_dir = cache_dir
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+
+    def __getstate__(self):
+        """
+        Drops the memory maps when the transform is sent to DataLoader workers, they map the cache themselves.
+
+        :return: The state of the transform.
+        """
+        state = self.__dict__.copy()
+        state["_arrays"] = None
+        return state
+
+    def _get_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Memory maps the cache arrays on first use.
+
+        :return: A dictionary mapping file names to arrays.
+        """
+        if self._arrays is None:
+            self._arrays = {file_name: np.load(os.path.join(self._cache_dir, file_name), mmap_mode="r")
+                            for file_name in (IDX_I_FILE, IDX_J_FILE, OFFSETS_FILE, PTR_FILE)}
+        return self._arrays
+
+    def forward(self, inputs: Dict[str, torch.Tensor]) -> Dict[str, torch.Tensor]:
+        """
+        Adds the cached neighbor list of the sample to the inputs.
+
+        :param inputs: The inputs of one sample, containing its dataset index.
+        :return: The inputs with idx_i, idx_j and offsets.
+        :raises IndexError: If the sample is not in the cache.
+        """
+        arrays = self._get_arrays()
+        ptr = arrays[PTR_FILE]
+        idx = int(inputs[properties.idx][0])
+        if idx + 1 >= len(ptr):
+            raise IndexError(NOT_IN_CACHE_MSG.format(idx=idx, path=self._cache_dir, size=len(ptr) - 1))
+
+        start, end = int(ptr[idx]), int(ptr[idx + 1])
+        inputs[properties.idx_i] = torch.from_numpy(arrays[IDX_I_FILE][start:end].astype(np.int64))
+        inputs[properties.idx_j] = torch.from_numpy(arrays[IDX_J_FILE][start:end].astype(np.int64))
+        inputs[properties.offsets] = torch.from_numpy(np.array(arrays[OFFSETS_FILE][start:end])).to(
+            inputs[properties.R].dtype)
+        return inputs
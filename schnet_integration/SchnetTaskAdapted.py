@@ -1,6 +1,7 @@
 from typing import List, Optional, Any, Type, Dict
 
 import torch
+from schnetpack import properties
 from schnetpack.model import AtomisticModel
 from schnetpack.task import AtomisticTask, ModelOutput
 
@@ -11,6 +12,8 @@ SUBSET_PHASE_MAPPING = {"train": ProcessPhase.TRAIN,
                         "val": ProcessPhase.VALIDATION,
                         "test": ProcessPhase.TEST}
 
+LOGGING_STATE_KEY = "model_logging_state"
+
 
 class SchnetTaskAdapted(AtomisticTask):
 
@@ -29,8 +32,30 @@ class SchnetTaskAdapted(AtomisticTask):
         super().__init__(model, outputs, optimizer_cls, optimizer_args,
                          scheduler_cls, scheduler_args, scheduler_monitor, warmup_steps)
         self._model_logging_connector = model_logging_connector
+        self._instance_ids: Optional[torch.Tensor] = None
+
+    def on_train_batch_start(self, batch, batch_idx):
+        self._instance_ids = batch.get(properties.idx)
+        return super().on_train_batch_start(batch, batch_idx)
+
+    def on_validation_batch_start(self, batch, batch_idx, dataloader_idx=0):
+        self._instance_ids = batch.get(properties.idx)
+        super().on_validation_batch_start(batch, batch_idx, dataloader_idx)
+
+    def on_test_batch_start(self, batch, batch_idx, dataloader_idx=0):
+        self._instance_ids = batch.get(properties.idx)
+        super().on_test_batch_start(batch, batch_idx, dataloader_idx)
 
     def log_metrics(self, pred, targets, subset):
 
         phase = SUBSET_PHASE_MAPPING[subset]
-        self._model_logging_connector.batch_start(targets, pred, phase)
+        self._model_logging_connector.batch_start(targets, pred, phase, instance_ids=self._instance_ids)
+
+    def on_save_checkpoint(self, checkpoint: Dict[str, Any]):
+        super().on_save_checkpoint(checkpoint)
+        checkpoint[LOGGING_STATE_KEY] = self._model_logging_connector.state_dict()
+
+    def on_load_checkpoint(self, checkpoint: Dict[str, Any]):
+        super().on_load_checkpoint(checkpoint)
+        if LOGGING_STATE_KEY in checkpoint:
+            self._model_logging_connector.load_state_dict(checkpoint[LOGGING_STATE_KEY])
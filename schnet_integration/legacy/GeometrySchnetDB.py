@@ -1,11 +1,20 @@
+import logging
 import os
 from typing import List, Optional
 
 import numpy as np
+import schnetpack.transform as trn
 from ase import Atoms
 from schnetpack.data import ASEAtomsData
 from schnetpack.data import AtomsDataModule
 
+from processing_pipeline.ContentHash import file_content_hash
+from processing_pipeline.StructuredLogging import get_logger, log_event
+from schnet_integration.DatasetMetadata import (METADATA_DISTANCE_UNIT, METADATA_HASH, METADATA_ROWS,
+                                                METADATA_SHAPES, METADATA_UNITS, get_or_create_metadata)
+from schnet_integration.DatasetSplit import get_or_create_split_file
+from schnet_integration.ArrayAtomsData import ArrayAtomsDataModule
+from schnet_integration.NeighborListCache import CachedCSRNeighborList, get_or_build_neighbor_list_cache
 from schnet_integration.legacy.MolProperty import MolProperty
 from schnet_integration.legacy.Units import Units
 
@@ -13,10 +22,24 @@ DB_NAME_TEMPLATE = "{}"
 DB_SPLIT_TEMPLATE = "schnet_split_{}.npz"
 DB_PATH = "data/schnet_data/"
 
+DEF_NUM_TRAIN = 6
+DEF_NUM_VAL = 4
+
 NO_GEO_OBJECTS_MSG = "No geometry objects to convert, therefore not possible to infer the units and properties."
 UNITS_NOT_MATCHING = "Geometry units or property units of the different geometry objects do not match."
 FILE_EXISTS_MSG = "Database {path} already exists, set overwrite_db to True to overwrite it."
 
+ASE_BACKEND = "ase"
+ARRAY_BACKEND = "arrays"
+SHARED_ARRAY_BACKEND = "shared_arrays"
+DATASET_BACKENDS = (ASE_BACKEND, ARRAY_BACKEND, SHARED_ARRAY_BACKEND)
+UNKNOWN_BACKEND_MSG = "Unknown dataset backend {backend}, supported backends are {backends}."
+
+# Attribute of schnetpack's neighbor list transforms holding the cutoff radius
+NEIGHBOR_LIST_CUTOFF_ATTRIBUTE = "_cutoff"
+
+LOGGER = get_logger("geometry_schnet_db")
+
 
 class GeometrySchnetDB:
 
@@ -57,14 +80,43 @@ class GeometrySchnetDB:
         self.geometry_unit = None
         self.prop_units = None
 
-        self.schnet_db = None
+        self._schnet_db = None
         self.schnet_data_module: Optional[AtomsDataModule] = None
+        self._content_hash: Optional[str] = None
+        self._metadata: Optional[dict] = None
+
+    @property
+    def schnet_db(self):
+        """
+        Returns the schnet database, it is only opened on first access.
+
+        :return: The ASEAtomsData of the database.
+        """
+        if self._schnet_db is None:
+            self._schnet_db = ASEAtomsData(self.path)
+        return self._schnet_db
+
+    @schnet_db.setter
+    def schnet_db(self, schnet_db):
+        """
+        Sets the schnet database.
+
+        :param schnet_db: The ASEAtomsData of the database.
+        """
+        self._schnet_db = schnet_db
 
     def _load_existing_db(self):
-        print(self.path)
-        self.schnet_db = ASEAtomsData(self.path)
-        self._load_units_from_db()
-        print("constructor", self.__str__())
+        """
+        Loads the units of an existing database from its metadata sidecar, the database itself is opened lazily.
+        """
+        self._metadata = get_or_create_metadata(self.path)
+        self._content_hash = self._metadata[METADATA_HASH]
+        self.prop_units = {MolProperty(prop): Units(unit) for prop, unit in self._metadata[METADATA_UNITS].items()}
+        self.geometry_unit = Units(self._metadata[METADATA_DISTANCE_UNIT])
+        log_event(LOGGER, logging.INFO, "db_loaded", db_name=self.db_name, path=self.path)
+        # The description reads from the database, so it is only built when debug logging is enabled
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            log_event(LOGGER, logging.DEBUG, "db_description", description=str(self))
 
     def _create_not_existing_db(self, geo_unit, prop_units):
         """
@@ -134,13 +186,54 @@ class GeometrySchnetDB:
     def get_schnet_db(self):
         return self.schnet_db
 
-    def create_schnet_module(self, selected_properties=None, batch_size=2, num_train=6, num_val=4,
-                             transforms=None, num_workers=4, pin_memory=True, split_path=None):
+    def get_content_hash(self):
+        if self._content_hash is None:
+            self._content_hash = file_content_hash(self.path)
+        return self._content_hash
+
+    def with_cached_neighbor_lists(self, transforms):
+        """
+        Replaces every ASENeighborList in the transform chain by a CachedCSRNeighborList, building the cache of the
+        database, cutoff and chain once if it does not exist yet.
+
+        :param transforms: The transform chain of a module.
+        :return: The transform chain reading neighbor lists from the cache.
+        """
+        cached_transforms = []
+        for transform in transforms:
+            if isinstance(transform, trn.ASENeighborList):
+                cutoff = getattr(transform, NEIGHBOR_LIST_CUTOFF_ATTRIBUTE)
+                cache_dir = get_or_build_neighbor_list_cache(self.path, self.get_content_hash(), cutoff,
+                                                             self.geometry_unit.value, transforms)
+                transform = CachedCSRNeighborList(cache_dir)
+            cached_transforms.append(transform)
+        return cached_transforms
+
+    def create_schnet_module(self, selected_properties=None, batch_size=2, num_train=DEF_NUM_TRAIN,
+                             num_val=DEF_NUM_VAL, transforms=None, num_workers=4, pin_memory=True, split_path=None,
+                             neighbor_list_cache=False, dataset_backend=ASE_BACKEND, split_seed=None, num_test=None):
+        """
+        Creates a data module of the database.
+
+        :param neighbor_list_cache: True reads neighbor lists from an on-disk cache instead of computing them.
+        :param dataset_backend: ASE_BACKEND reads samples from the database rows, ARRAY_BACKEND converts the database
+        once into memory-mapped arrays and serves samples from them, SHARED_ARRAY_BACKEND serves them from one shared
+        memory copy per host that all DataLoader workers and parallel runs attach to.
+        :param split_seed: The seed of a reproducible split written to split_path if it does not exist yet, an existing
+        split file is reused as is. None lets the data module partition the dataset randomly.
+        :param num_test: The number or fraction of test samples, None uses the remaining samples.
+        """
+        if dataset_backend not in DATASET_BACKENDS:
+            raise ValueError(UNKNOWN_BACKEND_MSG.format(backend=dataset_backend, backends=DATASET_BACKENDS))
         if transforms is None:
             transforms = []
+        if neighbor_list_cache:
+            transforms = self.with_cached_neighbor_lists(transforms)
 
         if split_path is None:
             split_path = self.split_path
+        if split_seed is not None:
+            get_or_create_split_file(split_path, len(self), num_train, num_val, split_seed, num_test)
 
         # Only use selected properties and convert them from enums to strings
         # TODO Add check if selected properties are in available properties
@@ -149,19 +242,40 @@ class GeometrySchnetDB:
         else:
             selected_unit_dict = {prop.value: self.prop_units[prop].value for prop in selected_properties}
 
-        new_data_module = AtomsDataModule(self.path,
-                                          distance_unit=self.geometry_unit.value,
-                                          property_units=selected_unit_dict,
-                                          load_properties=list(selected_unit_dict.keys()),
-                                          batch_size=batch_size, num_train=num_train, num_val=num_val,
-                                          transforms=transforms, num_workers=num_workers, pin_memory=pin_memory,
-                                          split_file=split_path)
+        module_kwargs = dict(distance_unit=self.geometry_unit.value,
+                             property_units=selected_unit_dict,
+                             load_properties=list(selected_unit_dict.keys()),
+                             batch_size=batch_size, num_train=num_train, num_val=num_val, num_test=num_test,
+                             transforms=transforms, num_workers=num_workers, pin_memory=pin_memory,
+                             split_file=split_path)
+        if dataset_backend in (ARRAY_BACKEND, SHARED_ARRAY_BACKEND):
+            new_data_module = ArrayAtomsDataModule(self.path, self.get_content_hash(),
+                                                   dataset_backend == SHARED_ARRAY_BACKEND, **module_kwargs)
+        else:
+            new_data_module = AtomsDataModule(self.path, **module_kwargs)
         new_data_module.prepare_data()
         new_data_module.setup()
         self.schnet_data_module = new_data_module
         return new_data_module
 
+    def __len__(self):
+        """
+        Returns the number of rows of the database.
+
+        :return: The number of rows.
+        """
+        if self._metadata is not None:
+            return self._metadata[METADATA_ROWS]
+        return len(self.schnet_db)
+
     def get_attribute_dimensions(self):
+        """
+        Returns the shapes of the properties of one row.
+
+        :return: A dictionary mapping properties to their shapes.
+        """
+        if self._metadata is not None:
+            return {MolProperty(prop): tuple(shape) for prop, shape in self._metadata[METADATA_SHAPES].items()}
         example_molecule_props = self.schnet_db[0]
         return {MolProperty(prop): example_molecule_props[prop].shape for prop in self.schnet_db.available_properties}
 
@@ -180,7 +294,7 @@ class GeometrySchnetDB:
         print_str += geo_str
         print_str += f"Total number of geometries: {total_length}\n"
 
-        if self.schnet_db is not None:
+        if self._schnet_db is not None:
             print_str += "\nSchnetDB:\n"
             print_str += f"Number of entries: {len(self.schnet_db)}\n"
             print_str += f"Available properties: {self.schnet_db.available_properties}\n"
@@ -1,3 +1,4 @@
+import os
 from typing import Any
 
 import schnetpack as spk
@@ -7,7 +8,9 @@ import torch.nn as nn
 import torchmetrics
 from schnetpack.atomistic import Atomwise
 
+from processing_pipeline.ContentHash import canonical_hash
 from processing_pipeline.description_enums import Column
+from schnet_integration.CompiledNetwork import CompiledNetwork, DEF_COMPILE_CACHE_DIR, EAGER_MODE
 from schnet_integration.SchnetTaskAdapted import SchnetTaskAdapted
 from schnet_integration.legacy import SchnetNNDefaultValue as NNDefaultValue, SchnetAdapterStrings
 from schnet_integration.legacy.MolProperty import MolProperty
@@ -70,6 +73,30 @@ class SchnetNN:
             output_modules=self.output_modules,
             postprocessors=self.postprocessors
         )
+        if self.compile_mode != EAGER_MODE:
+            cache_dir = os.path.join(self.compile_cache_dir, self.get_hyperparameter_key())
+            self.network = CompiledNetwork(self.network, self.compile_mode, cache_dir)
+
+    def get_hyperparameters(self):
+        """
+        Returns the hyperparameters that determine the structure of the network.
+
+        :return: A JSON serializable dictionary of the hyperparameters.
+        """
+        return {"additional_input_keys": self.properties_in,
+                "prediction_keys": {key.value: size for key, size in self.predictions_out.items()},
+                "atom_basis_size": self.atom_basis_size, "num_of_interactions": self.num_of_interactions,
+                "rbf_basis_size": self.rbf_basis_size, "cut_off": self.cut_off}
+
+    def get_hyperparameter_key(self):
+        """
+        Returns the key compiled graphs of the network are cached under, it changes with the hyperparameters and the
+        torch version.
+
+        :return: The hyperparameter key.
+        """
+        return canonical_hash({"hyperparameters": self.get_hyperparameters(), "mode": self.compile_mode,
+                               "torch": torch.__version__})
 
     def build_output_heads(self):
         self.output_heads = []
@@ -113,7 +140,12 @@ class SchnetNN:
     def __init__(self, additional_input_keys: dict[MolProperty, Any], prediction_keys: dict[MolProperty, Any],
                  atom_basis_size=DEF_ATOM_BASIS_SIZE,
                  num_of_interactions=DEF_NUM_OF_INTERACTIONS, rbf_basis_size=DEF_RBF_BASIS_SIZE, cut_off=DEF_CUTOFF,
-                 learning_rate=DEF_LEARNING_RATE):
+                 learning_rate=DEF_LEARNING_RATE, compile_mode=EAGER_MODE, compile_cache_dir=DEF_COMPILE_CACHE_DIR):
+        """
+        :param compile_mode: EAGER_MODE runs the network eagerly, COMPILE_MODE with torch.compile and SCRIPT_MODE with
+        TorchScript, falling back to eager execution if compilation fails.
+        :param compile_cache_dir: The directory compiled kernels are cached in, one subdirectory per hyperparameter key.
+        """
         self.additional_input_keys = additional_input_keys
         self.prediction_keys = prediction_keys
 
@@ -122,6 +154,8 @@ class SchnetNN:
         self.rbf_basis_size = rbf_basis_size
         self.cut_off = cut_off
         self.learning_rate = learning_rate
+        self.compile_mode = compile_mode
+        self.compile_cache_dir = compile_cache_dir
 
         # Dict contains the dimensions of the different properties and properties as Strings not the properties as enums
         self.properties_in = None
@@ -4,7 +4,6 @@ DEF_ATOM_BASIS_SIZE = 15
 DEF_NUM_OF_INTERACTIONS = 5
 DEF_RBF_BASIS_SIZE = 20
 DEF_LEARNING_RATE = 1e-4
-print(DEF_LEARNING_RATE)
 
 DEF_LOG_SAVE_INTERVAL = 40
 DEF_DIRECTORY_BREAK = 1000
@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip("schnetpack")
+
+import schnetpack.transform as trn
+import torch
+from schnetpack import properties
+
+from benchmarks.synthetic_db import create_synthetic_db
+from processing_pipeline.ContentHash import file_content_hash
+from schnet_integration.ArrayAtomsData import ArrayAtomsDataModule
+
+MOLECULES = 20
+NUM_TRAIN = 10
+NUM_VAL = 5
+ENERGY = "total_energy"
+
+
+def test_array_module_setup_partitions_dataset(tmp_path, monkeypatch):
+    # schnetpack creates its splitting lock in the working directory
+    monkeypatch.chdir(tmp_path)
+    db_path = create_synthetic_db(str(tmp_path / "synthetic.db"), MOLECULES, properties=(ENERGY,))
+    module = ArrayAtomsDataModule(db_path, file_content_hash(db_path), batch_size=4, num_train=NUM_TRAIN,
+                                  num_val=NUM_VAL, distance_unit="Ang", property_units={ENERGY: "kcal/mol"},
+                                  load_properties=[ENERGY], transforms=[trn.CastTo32()],
+                                  split_file=str(tmp_path / "split.npz"), num_workers=0)
+    module.prepare_data()
+    module.setup()
+
+    assert len(module.train_dataset) == NUM_TRAIN
+    assert len(module.val_dataset) == NUM_VAL
+    assert len(module.test_dataset) == MOLECULES - NUM_TRAIN - NUM_VAL
+    sample = module.test_dataset[0]
+    assert ENERGY in sample
+    # The transforms are set up on the partitions
+    assert sample[properties.R].dtype == torch.float32